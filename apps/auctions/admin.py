@@ -1,7 +1,106 @@
-from django.contrib import admin
-from .models import *
+from django.contrib import admin, messages
+from django.db import transaction
 
-""" Register your models here."""
+from apps.utils.counting import EstimatedCountPaginator
+from .models import ArchivedBid, Auction, Bid, Category, OutboxEvent, Tag
+from .services import cancel_auctions, end_auctions_now, update_auction
+from .tasks import check_and_close_expired_auctions
 
-admin.site.register(Auction)
-admin.site.register(Bid)
\ No newline at end of file
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'slug']
+    search_fields = ['name', 'slug']
+    prepopulated_fields = {'slug': ['name']}
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'slug']
+    search_fields = ['name', 'slug']
+    prepopulated_fields = {'slug': ['name']}
+
+
+@admin.register(Auction)
+class AuctionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'title', 'owner', 'category', 'status', 'current_price', 'end_time', 'winner']
+    list_filter = ['status', 'category']
+    search_fields = ['title']
+    ordering = ['-id']
+    # One JOIN instead of a query per row for the owner/winner/category columns
+    list_select_related = ['owner', 'winner', 'category']
+    # Plain ID inputs instead of <select>s listing every user
+    raw_id_fields = ['owner', 'winner']
+    autocomplete_fields = ['category', 'tags']
+    readonly_fields = ['current_price', 'created_at', 'updated_at', 'bids_archived_at']
+    actions = ['end_now', 'cancel']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # Locked like API edits, and published to the auction's listeners
+        update_auction(obj, lambda: super(AuctionAdmin, self).save_model(request, obj, form, change))
+
+    @admin.action(description='End selected auctions now')
+    def end_now(self, request, queryset):
+        """
+        Move end_time of the active auctions to now, then let the
+        expired-auction checker close them (winner, notifications)
+        """
+        ended = end_auctions_now(queryset.values_list('id', flat=True))
+        transaction.on_commit(check_and_close_expired_auctions.delay)
+        self.message_user(request, f"Ended {ended} auctions; they will be closed shortly.", messages.SUCCESS)
+
+    @admin.action(description='Cancel selected auctions')
+    def cancel(self, request, queryset):
+        """Cancel the active auctions, bids or not (their bidders are notified)"""
+        cancelled = cancel_auctions(queryset.values_list('id', flat=True))
+        self.message_user(request, f"Cancelled {cancelled} auctions.", messages.SUCCESS)
+
+
+@admin.register(Bid)
+class BidAdmin(admin.ModelAdmin):
+    list_display = ['id', 'auction', 'bidder', 'amount', 'created_at']
+    ordering = ['-created_at']
+    # Bid.__str__ and the columns use both relations
+    list_select_related = ['auction', 'bidder']
+    raw_id_fields = ['bidder']
+    autocomplete_fields = ['auction']
+    search_fields = ['=auction__id', '=bidder__username']
+    # The bids table is too large for COUNT(*) on every page
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ArchivedBid)
+class ArchivedBidAdmin(admin.ModelAdmin):
+    list_display = ['id', 'auction', 'bidder', 'amount', 'created_at']
+    ordering = ['-created_at']
+    list_select_related = ['auction', 'bidder']
+    raw_id_fields = ['auction', 'bidder']
+    search_fields = ['=auction__id', '=bidder__username']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        # Rows are only written by the archive task
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'topic', 'auction', 'created_at', 'published_at', 'attempts']
+    list_filter = ['topic']
+    search_fields = ['=auction__id']
+    ordering = ['-id']
+    raw_id_fields = ['auction']
+
+    def has_add_permission(self, request):
+        # Rows are only written with the changes they publish
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
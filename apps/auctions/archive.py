@@ -0,0 +1,104 @@
+"""
+Bid Archive
+===========
+Move bids of long-closed auctions out of the hot bids table
+
+WHY ARCHIVE:
+- The bids table only grows, and every live bid insert maintains its
+  (auction, -amount), (bidder) and (created_at) indexes
+- Bids of auctions closed weeks ago are almost never read
+- Moving them to bids_archive keeps the hot table (and its indexes)
+  sized to live and recent auctions
+
+HOW IT WORKS:
+- archive_auction_bids() copies one auction's bids to ArchivedBid in
+  chunks, deletes them from Bid and stamps auction.bids_archived_at,
+  all in one transaction
+- Auction.bid_history() and user_bid_history() read from the right tier,
+  so views don't need to know where bids live
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedBid, Auction, Bid
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 2000
+
+
+def archivable_auctions(now=None):
+    """Finished auctions whose bids are old enough to archive"""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=getattr(settings, 'BID_ARCHIVE_AFTER_DAYS', 30))
+    return Auction.objects.filter(
+        status__in=['closed', 'cancelled'],
+        end_time__lt=cutoff,
+        bids_archived_at__isnull=True,
+    ).order_by('end_time')
+
+
+def archive_auction_bids(auction_id):
+    """
+    Move all bids of one auction to the archive table
+
+    Returns the number of archived bids
+    """
+    with transaction.atomic():
+        auction = (
+            Auction.objects
+            .select_for_update()
+            .filter(pk=auction_id, bids_archived_at__isnull=True)
+            .first()
+        )
+        if auction is None:
+            return 0
+
+        bids = Bid.objects.filter(auction=auction)
+        rows = bids.order_by('id').values_list(
+            'id', 'bidder_id', 'amount', 'created_at'
+        ).iterator(chunk_size=COPY_CHUNK_SIZE)
+
+        archived = 0
+        batch = []
+        for bid_id, bidder_id, amount, created_at in rows:
+            batch.append(ArchivedBid(
+                id=bid_id,
+                auction_id=auction.id,
+                bidder_id=bidder_id,
+                amount=amount,
+                created_at=created_at,
+            ))
+            if len(batch) >= COPY_CHUNK_SIZE:
+                ArchivedBid.objects.bulk_create(batch)
+                archived += len(batch)
+                batch = []
+        if batch:
+            ArchivedBid.objects.bulk_create(batch)
+            archived += len(batch)
+
+        bids.delete()
+
+        auction.bids_archived_at = timezone.now()
+        auction.save(update_fields=['bids_archived_at', 'updated_at'])
+
+    logger.info(f"Archived {archived} bids of auction {auction_id}")
+    return archived
+
+
+def user_bid_history(user):
+    """
+    All bids of a user across the hot and archive tables, newest first
+
+    Returns Bid instances; select_related is not available on a union,
+    so prefetch relations on the page instead
+    """
+    return Bid.objects.filter(bidder=user).order_by().union(
+        ArchivedBid.objects.filter(bidder=user).order_by(),
+        all=True,
+    ).order_by('-created_at')
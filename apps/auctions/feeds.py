@@ -0,0 +1,127 @@
+"""
+Discovery Feeds
+===============
+"Ending soon" and "trending" auctions for the homepage
+
+WHY:
+- The auction list is ordered by -id; clients built these feeds by
+  pulling active auctions and sorting them, a scan of every live auction
+
+HOW IT WORKS:
+- Ending soon: active auctions by (end_time, id), read straight from the
+  (status, end_time) index with a keyset cursor, so any page costs an
+  index seek plus the page. It is not cached: the index is already
+  O(log n + page) and a cache would only show ended auctions
+- Trending: bids per auction over the last TRENDING_WINDOW_MINUTES,
+  summed from the per-minute activity rollup (apps/bidding/activity.py)
+  in one grouped query over the (resolution, bucket_start) index. The
+  top TRENDING_FEED_SIZE are ranked by warm_feeds() (periodic task) and
+  kept in the cache, so requests only slice the ranking and load the page.
+  The worker writes it and the web processes read it, so this needs the
+  shared cache (CACHE_URL, Redis by default): with a per-process cache
+  every web process would rank on its own, on the request path
+- Pages are hydrated by primary key and re-checked for being active, so
+  auctions closed since the ranking was built drop out at once
+
+The ranking follows compacted minutes: a burst of bids shows up within
+about two minutes (compaction, then warming).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import Auction
+
+logger = logging.getLogger(__name__)
+
+TRENDING_CACHE_KEY = 'feed:trending'
+
+
+def active_auctions(now=None):
+    """Auctions open for bidding, ready for AuctionListSerializer"""
+    now = now or timezone.now()
+    return (
+        Auction.objects.filter(status='active', start_time__lte=now, end_time__gt=now)
+        .select_related('owner', 'category')
+        .with_total_bids()
+    )
+
+
+def ending_soon(limit, after=None, now=None):
+    """
+    Up to limit active auctions ending next, after the (end_time, id)
+    cursor of the previous page's last auction
+    """
+    queryset = active_auctions(now).order_by('end_time', 'id')
+    if after is not None:
+        end_time, auction_id = after
+        queryset = queryset.filter(
+            Q(end_time__gt=end_time) | Q(end_time=end_time, id__gt=auction_id)
+        )
+    return list(queryset[:limit])
+
+
+def rank_trending(now=None):
+    """[(auction_id, bids in the window), ...] of the most bid-on active auctions"""
+    from apps.bidding.models import BidActivityBucket
+
+    now = now or timezone.now()
+    window = timedelta(minutes=getattr(settings, 'TRENDING_WINDOW_MINUTES', 15))
+    size = getattr(settings, 'TRENDING_FEED_SIZE', 100)
+    rows = (
+        BidActivityBucket.objects.filter(
+            resolution=BidActivityBucket.RESOLUTION_MINUTE,
+            bucket_start__gte=now - window,
+            auction__status='active',
+            auction__end_time__gt=now,
+        )
+        .values('auction_id')
+        .annotate(score=Sum('bid_count'))
+        .order_by('-score', 'auction_id')
+        .values_list('auction_id', 'score')[:size]
+    )
+    return [tuple(row) for row in rows]
+
+
+def warm_feeds(now=None):
+    """Rebuild the cached trending ranking; returns its length"""
+    ranking = rank_trending(now)
+    cache.set(TRENDING_CACHE_KEY, ranking, getattr(settings, 'FEED_CACHE_TTL', 300))
+    logger.info(f"Warmed trending feed ({len(ranking)} auctions)")
+    return len(ranking)
+
+
+def trending_ranking():
+    """The cached trending ranking, built on the spot after a cache loss"""
+    ranking = cache.get(TRENDING_CACHE_KEY)
+    if ranking is None:
+        ranking = rank_trending()
+        # add: never replaces a ranking warm_feeds() stored meanwhile
+        cache.add(TRENDING_CACHE_KEY, ranking, getattr(settings, 'FEED_CACHE_TTL', 300))
+    return ranking
+
+
+def trending(offset, limit, now=None):
+    """
+    One page of the trending feed
+
+    Returns (auctions in rank order with a recent_bids attribute, whether
+    the ranking has more entries)
+    """
+    ranking = trending_ranking()
+    page = ranking[offset:offset + limit]
+    scores = dict(page)
+    auctions = active_auctions(now).in_bulk(list(scores))
+
+    results = []
+    for auction_id, score in page:
+        auction = auctions.get(auction_id)
+        if auction is not None:
+            auction.recent_bids = score
+            results.append(auction)
+    return results, offset + limit < len(ranking)
@@ -0,0 +1,251 @@
+"""
+Auction Filters
+===============
+Declarative query-param filters for the auction list, and facet counts
+
+HOW IT WORKS:
+- A FilterSet declares one Filter per query param as class attributes
+- FilterSet(params).filter_queryset(qs) parses every present param first
+  and raises one ValidationError listing all bad params, then applies them
+- count_cache_key() names the filter combination for the list count cache
+  (apps/utils/counting.py). Only the common, low-cardinality params
+  (status, active, category, tags) are cacheable; free-form values
+  (search, prices, end times, seller) disable it, so they cannot fill the
+  cache with one entry per distinct query string
+- acategory_facets() counts the matches per category in one grouped query,
+  with every filter applied except category itself (so the counts show
+  what picking another category would return), cached like list counts
+
+INDEXES (Auction.Meta, verified by AuctionFilterQueryPlanTests in tests.py):
+- category (+ active, + end-time window): (category, status, end_time)
+- price range (+ status/active): (status, current_price)
+- seller (+ active): (owner, status, end_time)
+- active / end-time window: (status, end_time)
+- tags: the tag side of the auction_tags unique index, as a subquery
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Auction
+
+
+class Filter:
+    """
+    One query param: parse() validates the raw value, apply() filters
+
+    Args:
+        field: Model field path, with the lookup (e.g. 'current_price__gte')
+        cacheable: Whether list counts may be cached per value; only for
+            params taking a few common values
+    """
+
+    cacheable = False
+
+    def __init__(self, field=None, cacheable=None):
+        self.field = field
+        if cacheable is not None:
+            self.cacheable = cacheable
+
+    def parse(self, value):
+        return value
+
+    def apply(self, queryset, value):
+        return queryset.filter(**{self.field: value})
+
+
+class CharFilter(Filter):
+    pass
+
+
+class ChoiceFilter(Filter):
+    cacheable = True
+
+    def __init__(self, field, choices, **kwargs):
+        super().__init__(field, **kwargs)
+        self.choices = [choice for choice, _ in choices]
+
+    def parse(self, value):
+        if value not in self.choices:
+            raise ValueError(f"Must be one of: {', '.join(self.choices)}")
+        return value
+
+
+class DecimalFilter(Filter):
+    def parse(self, value):
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise ValueError("Must be a number")
+
+
+class DateTimeFilter(Filter):
+    def parse(self, value):
+        # '+' of a UTC offset arrives as a space when not URL-encoded
+        parsed = parse_datetime(value.replace(' ', '+'))
+        if parsed is None:
+            raise ValueError("Must be an ISO 8601 datetime")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+
+class SlugListFilter(Filter):
+    """Comma-separated slugs, matching any of them"""
+
+    cacheable = True
+
+    def parse(self, value):
+        slugs = sorted({slug.strip() for slug in value.split(',') if slug.strip()})
+        if not slugs:
+            raise ValueError("Must be one or more comma-separated slugs")
+        return slugs
+
+    def apply(self, queryset, value):
+        return queryset.filter(**{f'{self.field}__in': value})
+
+
+class TagFilter(SlugListFilter):
+    """Auctions with any of the tags, without duplicate rows"""
+
+    def apply(self, queryset, value):
+        tagged = Auction.tags.through.objects.filter(tag__slug__in=value).values('auction_id')
+        return queryset.filter(id__in=tagged)
+
+
+class ActiveFilter(Filter):
+    """active=true: open for bidding now"""
+
+    cacheable = True
+
+    def parse(self, value):
+        return value.lower() == 'true'
+
+    def apply(self, queryset, value):
+        if not value:
+            return queryset
+        now = timezone.now()
+        return queryset.filter(status='active', start_time__lte=now, end_time__gt=now)
+
+
+class SearchFilter(Filter):
+    """Substring match on any of the fields"""
+
+    def __init__(self, fields, **kwargs):
+        super().__init__(**kwargs)
+        self.fields = fields
+
+    def apply(self, queryset, value):
+        condition = Q()
+        for field in self.fields:
+            condition |= Q(**{f'{field}__icontains': value})
+        return queryset.filter(condition)
+
+
+class FilterSet:
+    """Base class: declare Filter attributes named after their query params"""
+
+    filters = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.filters = {
+            **cls.filters,
+            **{name: value for name, value in vars(cls).items() if isinstance(value, Filter)},
+        }
+
+    def __init__(self, params):
+        self.params = params
+        self._cleaned = None
+
+    @property
+    def cleaned(self):
+        """{param: parsed value} of the present params; raises ValidationError"""
+        if self._cleaned is None:
+            cleaned, errors = {}, {}
+            for name, filter_ in self.filters.items():
+                value = self.params.get(name)
+                if value in (None, ''):
+                    continue
+                try:
+                    cleaned[name] = filter_.parse(value)
+                except ValueError as e:
+                    errors[name] = str(e)
+            if errors:
+                raise ValidationError(errors)
+            self._cleaned = cleaned
+        return self._cleaned
+
+    def filter_queryset(self, queryset, exclude=()):
+        for name, value in self.cleaned.items():
+            if name not in exclude:
+                queryset = self.filters[name].apply(queryset, value)
+        return queryset
+
+    def count_cache_key(self, prefix, exclude=()):
+        """Cache key of this filter combination, or None when uncacheable"""
+        parts = []
+        for name, value in sorted(self.cleaned.items()):
+            if name in exclude:
+                continue
+            if not self.filters[name].cacheable:
+                return None
+            value = ','.join(value) if isinstance(value, list) else value
+            parts.append(f'{name}={value}')
+        return ':'.join([prefix, *parts])
+
+
+class AuctionFilterSet(FilterSet):
+    """Query params of the auction list"""
+
+    status = ChoiceFilter('status', Auction.STATUS_CHOICES)
+    active = ActiveFilter()
+    category = SlugListFilter('category__slug')
+    tags = TagFilter()
+    min_price = DecimalFilter('current_price__gte')
+    max_price = DecimalFilter('current_price__lte')
+    ends_after = DateTimeFilter('end_time__gte')
+    ends_before = DateTimeFilter('end_time__lt')
+    seller = CharFilter('owner__username')
+    search = SearchFilter(['title', 'description'])
+
+    def count_cache_key(self, prefix='auctions', exclude=()):
+        return super().count_cache_key(prefix, exclude)
+
+
+def _facet_key(filterset):
+    return filterset.count_cache_key('auction-facets', exclude=('category',))
+
+
+def _facet_queryset(filterset):
+    """(slug, name, count) rows: one GROUP BY over the filtered auctions"""
+    queryset = filterset.filter_queryset(Auction.objects.all(), exclude=('category',))
+    return (
+        queryset.order_by()
+        .values_list('category__slug', 'category__name')
+        .annotate(count=Count('id'))
+        .order_by('-count', 'category__name')
+    )
+
+
+async def acategory_facets(filterset):
+    """
+    [{'slug', 'name', 'count'}, ...] of the auctions matching every filter
+    but category, per category (slug None for uncategorized)
+    """
+    key = _facet_key(filterset)
+    facets = await cache.aget(key) if key else None
+    if facets is None:
+        facets = [
+            {'slug': slug, 'name': name, 'count': count}
+            async for slug, name, count in _facet_queryset(filterset)
+        ]
+        if key:
+            await cache.aset(key, facets, getattr(settings, 'LIST_COUNT_CACHE_TTL', 60))
+    return facets
@@ -0,0 +1,68 @@
+"""
+Auction Images
+==============
+Keep Auction.media, the denormalized image list, in step with AuctionImage
+
+WHY:
+- List and detail responses show images; reading them per auction (or
+  even one prefetch per page) adds queries to the hottest endpoints
+- Image URLs only change when an image is added, removed or its
+  thumbnails become ready, so they are precomputed at those moments
+
+HOW IT WORKS:
+- refresh_auction_media(ids) rebuilds the entries of the auctions in one
+  read (images with their blobs) and one bulk update, bumping updated_at
+  so conditional GETs see the change
+- Upload and delete (views) and blob_ready (signals.py, thumbnails done)
+  call it
+- Serializers read auction.media as is: cover_image on lists, images on
+  details
+
+Entry: {'id', 'url', 'width', 'height', 'thumbnails': {name: url}};
+width/height are None and thumbnails empty until the blob is processed.
+"""
+
+from collections import defaultdict
+
+from django.utils import timezone
+
+from apps.media.storage import media_url
+
+from .models import Auction, AuctionImage
+
+
+def media_entry(image):
+    """Serialized image of an AuctionImage with its blob loaded"""
+    blob = image.blob
+    return {
+        'id': image.id,
+        'url': media_url(blob.key),
+        'width': blob.width,
+        'height': blob.height,
+        'thumbnails': {
+            name: media_url(thumbnail['key'])
+            for name, thumbnail in blob.thumbnails.items()
+        },
+    }
+
+
+def refresh_auction_media(auction_ids):
+    """Rebuild Auction.media of the given auctions"""
+    auction_ids = set(auction_ids)
+    if not auction_ids:
+        return
+    entries = defaultdict(list)
+    images = (
+        AuctionImage.objects.filter(auction_id__in=auction_ids)
+        .select_related('blob')
+        .order_by('position', 'id')
+    )
+    for image in images:
+        entries[image.auction_id].append(media_entry(image))
+
+    now = timezone.now()
+    Auction.objects.bulk_update(
+        [Auction(id=auction_id, media=entries[auction_id], updated_at=now) for auction_id in auction_ids],
+        ['media', 'updated_at'],
+        batch_size=500,
+    )
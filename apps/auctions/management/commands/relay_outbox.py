@@ -0,0 +1,58 @@
+"""
+Run the outbox relay as a dedicated worker
+
+Publishes committed auction events (see apps/auctions/outbox.py) as soon
+as they appear, polling every OUTBOX_POLL_INTERVAL seconds when idle.
+Running several is safe (they take turns on the oldest rows) but one is
+enough; set OUTBOX_RELAY_ON_COMMIT=False when it runs.
+
+Usage:
+    python manage.py relay_outbox
+    python manage.py relay_outbox --once
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.auctions.outbox import relay_pending
+
+
+class Command(BaseCommand):
+    help = 'Publish outbox events to the channel layer, Celery and notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Publish what is pending and exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Events claimed and published per batch (default: OUTBOX_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            published = relay_pending(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Published {published} events"))
+            return
+
+        interval = getattr(settings, 'OUTBOX_POLL_INTERVAL', 0.05)
+        self.stdout.write(f"Relaying outbox events (idle poll every {interval}s)")
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    published = relay_pending(options['batch_size'])
+                except Exception as e:
+                    self.stderr.write(f"Relay failed: {e}")
+                    published = 0
+                if not published:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
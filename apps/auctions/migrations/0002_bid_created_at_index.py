@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['created_at'], name='bids_created_ec08db_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0002_bid_created_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='bids_archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedBid',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField()),
+                ('auction', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_bids', to='auctions.auction')),
+                ('bidder', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_bids', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'bids_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['auction', 'created_at'], name='bids_archiv_auction_c6f98d_idx'), models.Index(fields=['bidder', 'created_at'], name='bids_archiv_bidder__046ce5_idx')],
+            },
+        ),
+    ]
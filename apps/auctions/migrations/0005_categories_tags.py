@@ -0,0 +1,63 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0004_watchlistitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+                'db_table': 'categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('slug', models.SlugField(unique=True)),
+            ],
+            options={
+                'db_table': 'tags',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='category',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='auctions', to='auctions.category'),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='auctions', to='auctions.tag'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['category', 'status', 'end_time'], name='auction_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['status', 'current_price'], name='auction_status_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['owner', 'status', 'end_time'], name='auction_seller_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0005_categories_tags'),
+        ('media', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='media',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='AuctionImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='auctions.auction')),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='auction_images', to='media.mediablob')),
+            ],
+            options={
+                'db_table': 'auction_images',
+                'ordering': ['position', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('auction', 'blob'), name='unique_auction_image')],
+            },
+        ),
+    ]
@@ -1,8 +1,65 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+
+class AuctionQuerySet(models.QuerySet):
+    def with_total_bids(self):
+        """
+        Annotate total_bids from the bid analytics rollup
+        (apps.bidding.AuctionBidAnalytics): one LEFT JOIN instead of a
+        COUNT query per auction
+        """
+        return self.annotate(total_bids=Coalesce(F('bid_analytics__total_bids'), 0))
+
+    def with_leader(self):
+        """
+        Annotate leader: username of the current highest bidder (None
+        without bids), from the participant rollup holding current_price
+        """
+        from apps.bidding.models import AuctionParticipant
+
+        return self.annotate(leader=Subquery(
+            AuctionParticipant.objects.filter(
+                auction=OuterRef('pk'), highest_bid=OuterRef('current_price')
+            ).values('bidder__username')[:1]
+        ))
+
+
+class Category(models.Model):
+    """
+    Auction category (one per auction)
+    """
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+
+    class Meta:
+        db_table = 'categories'
+        ordering = ['name']
+        verbose_name_plural = 'categories'
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(models.Model):
+    """
+    Free-form auction label (many per auction)
+    """
+    name = models.CharField(max_length=50)
+    slug = models.SlugField(max_length=50, unique=True)
+
+    class Meta:
+        db_table = 'tags'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 class Auction(models.Model):
     """
     Auction Model
@@ -58,12 +115,40 @@ class Auction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Set once this auction's bids have been moved to the archive table
+    bids_archived_at = models.DateTimeField(null=True, blank=True)
+    
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='auctions',
+        # auction_category_idx (category, status, end_time) covers it
+        db_index=False
+    )
+    tags = models.ManyToManyField(Tag, blank=True, related_name='auctions')
+    
+    # Image entries (URLs, sizes, thumbnail URLs) in display order, rebuilt
+    # by images.refresh_auction_media(): lists and details need no join
+    media = models.JSONField(default=list, blank=True)
+    
+    objects = AuctionQuerySet.as_manager()
+    
     class Meta:
         db_table = 'auctions'
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'end_time']),
             models.Index(fields=['owner']),
+            # Composite indexes for the list filters (filters.py), checked
+            # by AuctionFilterQueryPlanTests (tests.py):
+            # category browsing, optionally narrowed to live auctions
+            models.Index(fields=['category', 'status', 'end_time'], name='auction_category_idx'),
+            # price range among live (or closed) auctions
+            models.Index(fields=['status', 'current_price'], name='auction_status_price_idx'),
+            # a seller's live auctions
+            models.Index(fields=['owner', 'status', 'end_time'], name='auction_seller_idx'),
         ]
 
     def __str__(self):
@@ -79,8 +164,28 @@ class Auction(models.Model):
     
     @property
     def total_bids(self):
-        """Get total number of bids"""
-        return self.bids.count()
+        """
+        Get total number of bids
+
+        Uses a precomputed value when one was set (an annotation from
+        with_total_bids(), or an async view's acount()), else counts
+        """
+        if hasattr(self, '_total_bids'):
+            return self._total_bids
+        return self.bid_history().count()
+
+    @total_bids.setter
+    def total_bids(self, value):
+        self._total_bids = value
+    
+    def bid_history(self):
+        """
+        Get this auction's bids from whichever table holds them
+        (bids, or bids_archive once the auction has been archived)
+        """
+        if self.bids_archived_at:
+            return self.archived_bids.all()
+        return self.bids.all()
     
 class Bid(models.Model):
     """
@@ -111,7 +216,151 @@ class Bid(models.Model):
         indexes = [
             models.Index(fields=['auction', '-amount']),
             models.Index(fields=['bidder']),
+            # Time-range scans (activity compaction, exports)
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.bidder.username} bid ${self.amount} on {self.auction.title}"
+
+
+class ArchivedBid(models.Model):
+    """
+    Archived Bid Model
+    
+    Cold storage for bids of auctions closed long ago (see archive.py)
+    Columns mirror Bid in the same order, so the two tables can be
+    combined with QuerySet.union() and read back as Bid instances
+    """
+    
+    id = models.BigIntegerField(primary_key=True)  # Original Bid.id
+    auction = models.ForeignKey(
+        Auction,
+        on_delete=models.CASCADE,
+        related_name='archived_bids',
+        db_index=False
+    )
+    bidder = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_bids',
+        db_index=False
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'bids_archive'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['auction', 'created_at']),
+            models.Index(fields=['bidder', 'created_at']),
         ]
     
     def __str__(self):
-        return f"{self.bidder.username} bid ${self.amount} on {self.auction.title}"
\ No newline at end of file
+        return f"Archived bid {self.id} on auction {self.auction_id}"
+
+
+class AuctionImage(models.Model):
+    """
+    An image of an auction; the bytes are a shared MediaBlob
+    """
+    auction = models.ForeignKey(
+        Auction,
+        on_delete=models.CASCADE,
+        related_name='images'
+    )
+    blob = models.ForeignKey(
+        'media.MediaBlob',
+        on_delete=models.PROTECT,
+        related_name='auction_images'
+    )
+    position = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'auction_images'
+        ordering = ['position', 'id']
+        constraints = [
+            # Also the index for an auction's images
+            models.UniqueConstraint(fields=['auction', 'blob'], name='unique_auction_image'),
+        ]
+
+    def __str__(self):
+        return f"Image {self.position} of auction {self.auction_id}"
+
+
+class WatchlistItem(models.Model):
+    """
+    An auction on a user's watchlist
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='watchlist'
+    )
+    auction = models.ForeignKey(
+        Auction,
+        on_delete=models.CASCADE,
+        related_name='watchlist_items'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'watchlist_items'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'auction'],
+                name='unique_watchlist_item'
+            ),
+        ]
+        indexes = [
+            # The feed, newest first
+            models.Index(fields=['user', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} watches auction {self.auction_id}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Transactional outbox: a state change to publish once its transaction
+    has committed
+
+    Written in the same transaction as the change, then claimed, published
+    (channel layer, Celery) and marked by the relay in outbox.py
+    """
+
+    topic = models.CharField(max_length=50)
+    auction = models.ForeignKey(
+        Auction,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    # Lease of the relay publishing it; other relays wait until it expires
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'outbox_events'
+        ordering = ['id']
+        indexes = [
+            # The relay's scan: unpublished events in commit order
+            models.Index(
+                fields=['id'],
+                condition=models.Q(published_at__isnull=True),
+                name='outbox_pending_idx'
+            ),
+            # Pruning of published events
+            models.Index(fields=['published_at'], name='outbox_published_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} of auction {self.auction_id}"
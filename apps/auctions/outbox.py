@@ -0,0 +1,315 @@
+"""
+Auction Outbox
+==============
+Publish auction state changes once, after they commit (transactional outbox)
+
+WHY:
+- Sending to the channel layer or Celery inside a transaction publishes
+  changes that may still roll back; sending after commit loses them if
+  the process dies in between
+- Each entry point used to broadcast on its own (the WebSocket consumer
+  awaited group_send after every bid), so requests waited on the
+  channel layer and changes made elsewhere reached nobody
+- The event row commits or rolls back with the change itself, so every
+  committed change is published, whatever made it, and nothing else is
+
+HOW IT WORKS:
+- record_event() adds the row in the caller's transaction (services.py)
+  and, with OUTBOX_RELAY_ON_COMMIT, queues a relay_outbox task on commit
+  (at most one queued at a time). The queued flag and the failure
+  backoff are cache keys set in one process and cleared in another, so
+  they need the shared cache (CACHE_URL, Redis by default); with a
+  per-process cache a web process would stop queueing relays after its
+  first one and leave bids to the beat entry
+- relay_pending() works in three steps, so no transaction is open while
+  it talks to the channel layer or the broker (and, on SQLite, the
+  database write lock is not held while bids wait):
+  1. claim: a short transaction locks the oldest unpublished rows and
+     sets their claimed_until lease (OUTBOX_CLAIM_SECONDS). While any of
+     them is leased by another relay it claims nothing: relays take
+     turns on the oldest rows rather than publishing later events first
+  2. publish: runs the topic's publisher for each event and sends the
+     batch's channel-layer messages in one event loop pass
+  3. finish: a second short transaction marks the published rows and
+     releases the lease of the rest
+- An auction's changes hold its row lock until they commit, so its
+  events are committed, and published, in id order
+- `python manage.py relay_outbox` runs the relay in a loop (a dedicated
+  worker); the relay_outbox beat entry retries whatever is left
+- A failing event stops the batch (its successors wait, keeping each
+  auction's events in order) and pauses every relay for 2^attempts
+  seconds (at most a minute); after OUTBOX_MAX_ATTEMPTS it is given up
+  (logged, marked published)
+- A relay that dies after publishing but before finishing leaves its
+  claim to expire, and the batch is published again: messages carry
+  event_id so listeners can drop the repeat, and the Celery and
+  notification side effects are idempotent
+
+TOPICS (payload -> fan-out):
+- auction_created: {'auction': snapshot} -> nothing yet: no client can
+  listen to an auction before it exists
+- bid_placed: the bid_placed message (bidding/events.py)
+  -> auction group (WebSocket, SSE), watchlist push
+- auction_updated: {'auction': snapshot} -> auction_updated to the
+  auction group, watchlist push
+- auction_cancelled: {'auction': snapshot} -> auction_updated to the
+  auction group, watchlist push, auction_cancelled notifications
+- auction_closed: {'auction': {'id', 'status', 'final_price',
+  'winner_id', 'reserve_met'}} -> auction_closed to the auction group,
+  watchlist push, result notifications
+
+Channel-layer messages are pre-encoded (events.with_frame): one JSON
+encoding per event, not one per connected client.
+"""
+
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.bidding.events import auction_group, with_frame
+from apps.notifications.delivery import queue_auction_cancellations, queue_auction_results
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+RELAY_SCHEDULED_KEY = 'outbox-relay-scheduled'
+RELAY_BACKOFF_KEY = 'outbox-relay-backoff'
+
+PUBLISHERS = {}
+
+
+def publisher(topic):
+    """
+    Register the function publishing events of a topic
+
+    It runs the event's side effects and returns the channel-layer
+    messages to send, as [(group, message), ...]
+    """
+    def register(fn):
+        PUBLISHERS[topic] = fn
+        return fn
+    return register
+
+
+def record_event(topic, auction_id, payload):
+    """Add an event to the outbox; must run inside the change's transaction"""
+    event = OutboxEvent.objects.create(topic=topic, auction_id=auction_id, payload=payload)
+    on_recorded()
+    return event
+
+
+def record_events(topic, payloads):
+    """Add one event per {auction_id: payload} in a single insert"""
+    OutboxEvent.objects.bulk_create([
+        OutboxEvent(topic=topic, auction_id=auction_id, payload=payload)
+        for auction_id, payload in payloads.items()
+    ])
+    on_recorded()
+
+
+def on_recorded():
+    if getattr(settings, 'OUTBOX_RELAY_ON_COMMIT', True):
+        transaction.on_commit(schedule_relay)
+
+
+def schedule_relay():
+    """
+    Queue a relay_outbox run unless one is already queued
+
+    The run clears the flag before reading, so events committed after
+    that schedule a new run instead of waiting for the beat entry
+    """
+    from .tasks import relay_outbox
+
+    if cache.add(RELAY_SCHEDULED_KEY, 1, 60):
+        try:
+            relay_outbox.delay()
+        except Exception as e:
+            cache.delete(RELAY_SCHEDULED_KEY)
+            logger.error(f"Failed to queue the outbox relay: {e}")
+
+
+async def send_messages(outgoing):
+    """
+    Send each event's messages, in order
+
+    Returns (number of events sent, exception of the next one or None)
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return len(outgoing), None
+    for index, (event, messages) in enumerate(outgoing):
+        try:
+            for group, message in messages:
+                await channel_layer.group_send(group, message)
+        except Exception as e:
+            return index, e
+    return len(outgoing), None
+
+
+def publish(events):
+    """
+    Publish events in order until one fails
+
+    Returns (ids of the events done, (failed event, error) or None)
+    """
+    outgoing = []
+    failed = None
+    for event in events:
+        try:
+            outgoing.append((event, PUBLISHERS[event.topic](event)))
+        except Exception as e:
+            failed = (event, e)
+            break
+
+    sent, error = async_to_sync(send_messages)(outgoing)
+    done = [event.id for event, _ in outgoing[:sent]]
+    if error is not None:
+        failed = (outgoing[sent][0], error)
+    return done, failed
+
+
+def claim_batch(batch_size):
+    """
+    Lease the oldest unpublished events to this relay, in id order
+
+    Returns [] when there are none, or while another relay's lease on
+    any of them is live
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'OUTBOX_CLAIM_SECONDS', 60))
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update()
+            .filter(published_at__isnull=True)
+            .order_by('id')[:batch_size]
+        )
+        if any(event.claimed_until and event.claimed_until > now for event in events):
+            return []
+        OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+            claimed_until=now + lease
+        )
+    return events
+
+
+def finish_batch(events, done, failed):
+    """
+    Mark the published events and release the claim on the rest
+
+    Returns whether the batch stopped early
+    """
+    with transaction.atomic():
+        if failed is not None:
+            event, error = failed
+            attempts = event.attempts + 1
+            logger.error(
+                f"Failed to publish outbox event {event.id} ({event.topic}), "
+                f"attempt {attempts}: {error}"
+            )
+            if attempts < getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 10):
+                OutboxEvent.objects.filter(id=event.id).update(attempts=attempts)
+                cache.set(RELAY_BACKOFF_KEY, 1, min(2 ** attempts, 60))
+            else:
+                logger.error(f"Giving up on outbox event {event.id}")
+                # Its successors are retried by the next run, in order
+                done = done + [event.id]
+
+        if done:
+            OutboxEvent.objects.filter(id__in=done).update(
+                published_at=timezone.now(), claimed_until=None
+            )
+        released = [event.id for event in events if event.id not in set(done)]
+        if released:
+            OutboxEvent.objects.filter(id__in=released).update(claimed_until=None)
+    return len(done), failed is not None
+
+
+def relay_pending(batch_size=None):
+    """
+    Publish every unpublished event in id order; returns how many
+
+    Does nothing while backing off after a failure, or while another
+    relay holds the oldest events
+    """
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', 200)
+    cache.delete(RELAY_SCHEDULED_KEY)
+    if cache.get(RELAY_BACKOFF_KEY):
+        return 0
+
+    published = 0
+    while True:
+        events = claim_batch(batch_size)
+        if not events:
+            return published
+
+        # Outside any transaction: network I/O to the channel layer and broker
+        done, failed = publish(events)
+        count, stopped = finish_batch(events, done, failed)
+
+        published += count
+        if stopped or len(events) < batch_size:
+            return published
+
+
+def prune_published(hours=None):
+    """Delete events published more than OUTBOX_RETENTION_HOURS ago"""
+    hours = hours or getattr(settings, 'OUTBOX_RETENTION_HOURS', 24)
+    deleted, _ = OutboxEvent.objects.filter(
+        published_at__lt=timezone.now() - timedelta(hours=hours)
+    ).delete()
+    return deleted
+
+
+def auction_message(event, message_type):
+    """[(group, message)] of an event carrying an auction snapshot"""
+    return [(auction_group(event.auction_id), with_frame({
+        'type': message_type,
+        'event_id': event.id,
+        'auction': event.payload['auction'],
+    }))]
+
+
+@publisher('auction_created')
+def publish_auction_created(event):
+    return []
+
+
+@publisher('bid_placed')
+def publish_bid_placed(event):
+    from .watchlist import schedule_watchlist_push
+
+    schedule_watchlist_push(event.auction_id)
+    return [(auction_group(event.auction_id), with_frame({**event.payload, 'event_id': event.id}))]
+
+
+@publisher('auction_updated')
+def publish_auction_updated(event):
+    from .watchlist import schedule_watchlist_push
+
+    schedule_watchlist_push(event.auction_id)
+    return auction_message(event, 'auction_updated')
+
+
+@publisher('auction_cancelled')
+def publish_auction_cancelled(event):
+    from .watchlist import schedule_watchlist_push
+
+    queue_auction_cancellations([event.auction_id])
+    schedule_watchlist_push(event.auction_id)
+    return auction_message(event, 'auction_updated')
+
+
+@publisher('auction_closed')
+def publish_auction_closed(event):
+    from .watchlist import schedule_watchlist_push
+
+    # Delivered in batches with other auctions' results by deliver_notifications
+    queue_auction_results([event.auction_id])
+    schedule_watchlist_push(event.auction_id)
+    return auction_message(event, 'auction_closed')
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.utils import timezone
-from .models import Auction, Bid
+from .models import Auction, Bid, Category, Tag
 from apps.users.serializers import UserSerializer
 
 
@@ -35,6 +35,10 @@ class AuctionListSerializer(serializers.ModelSerializer):
     """
     
     owner_username = serializers.CharField(source='owner.username', read_only=True)
+    # Views select_related('category')
+    category = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    # First entry of the precomputed Auction.media (images.py)
+    cover_image = serializers.SerializerMethodField()
     is_active = serializers.BooleanField(read_only=True)
     total_bids = serializers.IntegerField(read_only=True)
     time_remaining = serializers.DurationField(read_only=True)
@@ -47,6 +51,8 @@ class AuctionListSerializer(serializers.ModelSerializer):
             'starting_price',
             'current_price',
             'owner_username',
+            'category',
+            'cover_image',
             'status',
             'is_active',
             'total_bids',
@@ -56,6 +62,9 @@ class AuctionListSerializer(serializers.ModelSerializer):
             'created_at',
         ]
 
+    def get_cover_image(self, obj):
+        return obj.media[0] if obj.media else None
+
 
 class AuctionDetailSerializer(serializers.ModelSerializer):
     """
@@ -65,6 +74,9 @@ class AuctionDetailSerializer(serializers.ModelSerializer):
     
     owner = UserSerializer(read_only=True)
     winner = UserSerializer(read_only=True)
+    category = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    tags = serializers.SlugRelatedField(slug_field='slug', many=True, read_only=True)
+    images = serializers.JSONField(source='media', read_only=True)
     is_active = serializers.BooleanField(read_only=True)
     total_bids = serializers.IntegerField(read_only=True)
     time_remaining = serializers.DurationField(read_only=True)
@@ -83,6 +95,9 @@ class AuctionDetailSerializer(serializers.ModelSerializer):
             'reserve_price',
             'owner',
             'winner',
+            'category',
+            'tags',
+            'images',
             'status',
             'is_active',
             'total_bids',
@@ -103,8 +118,10 @@ class AuctionDetailSerializer(serializers.ModelSerializer):
         ]
     
     def get_latest_bids(self, obj):
-        """Get 5 most recent bids"""
-        latest_bids = obj.bids.all()[:5]
+        """Get 5 most recent bids (async views pass them in the context)"""
+        latest_bids = self.context.get('latest_bids')
+        if latest_bids is None:
+            latest_bids = obj.bid_history().select_related('bidder')[:5]
         return BidSerializer(latest_bids, many=True).data
 
 
@@ -113,6 +130,19 @@ class AuctionCreateSerializer(serializers.ModelSerializer):
     Serializer for creating auctions
     """
     
+    category = serializers.SlugRelatedField(
+        slug_field='slug',
+        queryset=Category.objects.all(),
+        required=False,
+        allow_null=True
+    )
+    tags = serializers.SlugRelatedField(
+        slug_field='slug',
+        queryset=Tag.objects.all(),
+        many=True,
+        required=False
+    )
+    
     class Meta:
         model = Auction
         fields = [
@@ -121,6 +151,8 @@ class AuctionCreateSerializer(serializers.ModelSerializer):
             'starting_price',
             'reserve_price',
             'end_time',
+            'category',
+            'tags',
         ]
     
     def validate_end_time(self, value):
@@ -144,4 +176,56 @@ class AuctionCreateSerializer(serializers.ModelSerializer):
         """Create auction with current_price set to starting_price"""
         validated_data['current_price'] = validated_data.get('starting_price')
         validated_data['owner'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField looking slugs up in context['preloaded'][model], a
+    {slug: instance} map loaded once for many rows, instead of one query
+    per value
+    """
+    
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        try:
+            return self.context['preloaded'][self.get_queryset().model][data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+
+
+class AuctionImportSerializer(AuctionCreateSerializer):
+    """
+    AuctionCreateSerializer for bulk import rows
+    
+    Category and tag slugs are resolved from preload(rows): two queries per
+    batch of rows instead of one per slug of every row
+    """
+    
+    category = PreloadedSlugRelatedField(
+        slug_field='slug',
+        queryset=Category.objects.all(),
+        required=False,
+        allow_null=True
+    )
+    tags = PreloadedSlugRelatedField(
+        slug_field='slug',
+        queryset=Tag.objects.all(),
+        many=True,
+        required=False
+    )
+    
+    @staticmethod
+    def preload(rows):
+        """Serializer context for a batch of raw rows (dicts)"""
+        categories, tags = set(), set()
+        for data in rows:
+            if isinstance(data.get('category'), str):
+                categories.add(data['category'])
+            if isinstance(data.get('tags'), list):
+                tags.update(slug for slug in data['tags'] if isinstance(slug, str))
+        return {'preloaded': {
+            Category: Category.objects.in_bulk(categories, field_name='slug'),
+            Tag: Tag.objects.in_bulk(tags, field_name='slug'),
+        }}
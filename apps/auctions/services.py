@@ -0,0 +1,248 @@
+"""
+Auction Services
+================
+Auction state changes: creating, placing bids, editing, cancelling and closing
+
+WHY:
+- close_auction read the status without a lock: two overlapping expiry
+  sweeps could both close (and notify) the same auction, and a bid
+  committed between the highest-bid read and the save was ignored
+- Bids were checked against an unlocked read, so two concurrent bids
+  could both pass "higher than current price", or land after the close
+
+HOW IT WORKS:
+- place_bid() and close_auction() lock the auction row
+  (select_for_update; on SQLite, which ignores it, write_atomic takes
+  the database write lock up front) for their whole transaction, so per
+  auction they run one at a time:
+  - a bid commits before the close takes the lock (and is the highest
+    bid it reads), or waits for it and finds the auction closed
+  - a second close waits, finds the auction closed and does nothing
+- Edits and cancels take the same lock, and edits re-read the row under
+  it, so they never overwrite the price a concurrent bid just set (or
+  images refreshed meanwhile), and a cancel cannot race a first bid
+- Every change records an outbox event (outbox.py) in its transaction;
+  the relay publishes it after commit (WebSocket and SSE listeners,
+  watchlist pushes, notifications), so callers never wait on the
+  channel layer
+- The close also commits the winner's statistics (auction_closed
+  receivers); its result notifications are queued by the relay
+
+Every entry point (REST views, WebSocket consumer, admin, Celery tasks)
+goes through these functions.
+"""
+
+import logging
+
+from django.utils import timezone
+
+from apps.bidding.events import bid_placed_event
+from apps.utils.transactions import write_atomic
+from .models import Auction, Bid
+from .outbox import record_event, record_events
+from .signals import auction_closed
+
+logger = logging.getLogger(__name__)
+
+
+class BidRejected(Exception):
+    """The bid is not allowed; the message is shown to the bidder"""
+
+
+class CancelRejected(Exception):
+    """The auction cannot be cancelled; the message is shown to the owner"""
+
+
+def auction_snapshot(auction):
+    """Payload of auction_updated and auction_cancelled events"""
+    return {
+        'id': auction.id,
+        'title': auction.title,
+        'status': auction.status,
+        'current_price': str(auction.current_price),
+        'start_time': auction.start_time.isoformat(),
+        'end_time': auction.end_time.isoformat(),
+    }
+
+
+def validate_bid(auction, user, amount):
+    """Return an error message if the bid is not allowed, else None"""
+    # Validate auction is active
+    if not auction.is_active:
+        return 'Auction is not active'
+
+    # Validate bid amount
+    if amount <= auction.current_price:
+        return f'Bid must be higher than current price (${auction.current_price})'
+
+    # Validate user is not the owner
+    if auction.owner_id == user.id:
+        return 'You cannot bid on your own auction'
+
+    return None
+
+
+def place_bid(auction_id, user, amount):
+    """
+    Validate and create a bid under the auction's row lock
+
+    Signals update the price and rollups in the same transaction; the
+    returned bid's auction is the locked, updated instance.
+    Raises Auction.DoesNotExist or BidRejected
+    """
+    with write_atomic():
+        auction = Auction.objects.select_for_update().get(pk=auction_id)
+        error = validate_bid(auction, user, amount)
+        if error:
+            raise BidRejected(error)
+        bid = Bid.objects.create(auction=auction, bidder=user, amount=amount)
+        record_event('bid_placed', auction.id, bid_placed_event(bid))
+    return bid
+
+
+def create_auction(save):
+    """
+    Save a new auction (save: the callable doing it, e.g. a validated
+    serializer's save) and record its auction_created event
+    """
+    with write_atomic():
+        auction = save()
+        record_event('auction_created', auction.id, {'auction': auction_snapshot(auction)})
+    return auction
+
+
+def create_auctions(auctions):
+    """
+    Insert [(auction, tags), ...] (bulk import) in one transaction, with
+    their tags and auction_created events; returns how many
+    """
+    with write_atomic():
+        created = Auction.objects.bulk_create([auction for auction, _ in auctions])
+        # Tags of the whole batch in one insert
+        Auction.tags.through.objects.bulk_create([
+            Auction.tags.through(auction_id=auction.id, tag_id=tag.id)
+            for auction, (_, tags) in zip(created, auctions)
+            for tag in tags
+        ])
+        record_events('auction_created', {
+            auction.id: {'auction': auction_snapshot(auction)} for auction in created
+        })
+    return len(created)
+
+
+def update_auction(auction, save):
+    """
+    Save edits made to an existing auction (save: the callable doing it,
+    e.g. a validated serializer's save)
+
+    The row is re-read under the lock first: save() writes every field,
+    and the instance may predate a bid, a close, an end_auctions_now() or
+    a refresh_auction_media(); save() then sets only the edited fields
+    """
+    with write_atomic():
+        auction.refresh_from_db(from_queryset=Auction.objects.select_for_update())
+        save()
+        record_event('auction_updated', auction.id, {'auction': auction_snapshot(auction)})
+    return auction
+
+
+def end_auctions_now(auction_ids):
+    """
+    Move end_time of the active auctions among auction_ids to now
+
+    The expired-auction sweep closes them. Returns how many were ended
+    """
+    now = timezone.now()
+    with write_atomic():
+        ids = list(
+            Auction.objects.select_for_update()
+            .filter(id__in=auction_ids, status='active', end_time__gt=now)
+            .values_list('id', flat=True)
+        )
+        Auction.objects.filter(id__in=ids).update(end_time=now, updated_at=now)
+        record_events('auction_updated', {
+            auction.id: {'auction': auction_snapshot(auction)}
+            for auction in Auction.objects.filter(id__in=ids)
+        })
+    return len(ids)
+
+
+def cancel_auctions(auction_ids):
+    """Cancel the active auctions among auction_ids, bids or not; returns how many"""
+    with write_atomic():
+        ids = list(
+            Auction.objects.select_for_update()
+            .filter(id__in=auction_ids, status='active')
+            .values_list('id', flat=True)
+        )
+        Auction.objects.filter(id__in=ids).update(status='cancelled', updated_at=timezone.now())
+        record_events('auction_cancelled', {
+            auction.id: {'auction': auction_snapshot(auction)}
+            for auction in Auction.objects.filter(id__in=ids)
+        })
+    return len(ids)
+
+
+def cancel_auction(auction_id):
+    """
+    Cancel an active auction without bids
+
+    Returns the cancelled auction. Raises Auction.DoesNotExist or
+    CancelRejected
+    """
+    with write_atomic():
+        auction = Auction.objects.select_for_update().get(pk=auction_id)
+        if auction.bids.exists():
+            raise CancelRejected("Cannot delete auction with existing bids")
+        if auction.status != 'active':
+            raise CancelRejected("Can only cancel active auctions")
+        auction.status = 'cancelled'
+        auction.save(update_fields=['status', 'updated_at'])
+        record_event('auction_cancelled', auction.id, {'auction': auction_snapshot(auction)})
+    return auction
+
+
+def close_auction(auction_id):
+    """
+    Close an auction and determine its winner, exactly once
+
+    Returns the closed auction, or None when it was not active (already
+    closed or cancelled). Raises Auction.DoesNotExist
+    """
+    with write_atomic():
+        auction = Auction.objects.select_for_update().get(pk=auction_id)
+        if auction.status != 'active':
+            return None
+
+        # Earliest of equal amounts wins
+        highest_bid = auction.bids.select_related('bidder').order_by('-amount', 'created_at').first()
+
+        reserve_met = not auction.reserve_price or (
+            highest_bid is not None and highest_bid.amount >= auction.reserve_price
+        )
+        # No reserve price, or a highest bid meeting it: the highest bidder wins
+        if highest_bid and reserve_met:
+            auction.winner = highest_bid.bidder
+        auction.status = 'closed'
+        auction.save()
+
+        auction_closed.send(sender=Auction, auction=auction)
+
+        # Result notifications are queued by the relay (outbox.py)
+        record_event('auction_closed', auction.id, {
+            'auction': {
+                'id': auction.id,
+                'status': auction.status,
+                'final_price': str(auction.current_price),
+                'winner_id': auction.winner_id,
+                'reserve_met': reserve_met,
+            },
+        })
+
+    if auction.winner_id:
+        logger.info(f"Auction {auction_id} closed. Winner: {auction.winner.username}")
+    elif highest_bid:
+        logger.info(f"Auction {auction_id} closed. Reserve price not met.")
+    else:
+        logger.info(f"Auction {auction_id} closed with no bids.")
+    return auction
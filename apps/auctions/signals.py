@@ -5,18 +5,23 @@ Automatically trigger actions when certain events occur
 
 SIGNALS IN THIS FILE:
 - When a bid is placed, update auction's current_price
-- When auction ends, trigger closing task
+- When an image's thumbnails are ready, refresh its auctions' media
+- auction_closed: sent by the close_auction task once an auction is closed
 """
 
 from django.db.models.signals import post_save
-from django.dispatch import receiver
-from .models import Bid, Auction
-from .tasks import close_auction
+from django.dispatch import Signal, receiver
+from apps.media.signals import blob_ready
+from .models import Bid, Auction, AuctionImage
 from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sent after close_auction has saved the closed auction
+# Receivers get the closed Auction instance as `auction`
+auction_closed = Signal()
+
 @receiver(post_save, sender=Bid)
 def update_auction_price(sender, instance, created, **kwargs):
     """
@@ -46,5 +51,18 @@ def update_auction_price(sender, instance, created, **kwargs):
             )
 
 
+@receiver(blob_ready)
+def refresh_media_of_blob(sender, blob, **kwargs):
+    """
+    Signal: Thumbnail URLs of a blob are known, put them in Auction.media
+    of every auction showing it (see images.py)
+    """
+    from .images import refresh_auction_media
+
+    refresh_auction_media(
+        AuctionImage.objects.filter(blob=blob).values_list('auction_id', flat=True)
+    )
+
+
 # Note: We could add a signal to automatically close auction when end_time is reached,
 # but we're using Celery Beat for that instead (more reliable for time-based tasks)
@@ -12,12 +12,20 @@ CELERY TASKS:
 TASKS IN THIS FILE:
 1. check_and_close_expired_auctions - Periodic task (runs every minute)
 2. close_auction - Called when auction ends
-3. notify_auction_participants - Send notifications
+3. notify_auction_participants - Queue result notifications
+4. archive_closed_auction_bids - Periodic task (runs daily)
+5. push_watchlist_update - Push an auction's state to its watchers
+6. warm_auction_feeds - Periodic task (runs every minute)
+7. relay_outbox - Publish committed outbox events (queued on commit,
+   and periodically for stragglers)
+8. prune_outbox_events - Periodic task (runs hourly)
 """
 
 from celery import shared_task
 from django.utils import timezone
 from django.db.models import Max
+from apps.notifications.delivery import queue_auction_results
+from . import outbox, services
 from .models import Auction
 
 import logging
@@ -48,7 +56,7 @@ def check_and_close_expired_auctions():
     logger.info(f"Fouond and queued {count} expired auctions for closing.")
     return f"Queued {count} expired auctions for closing."
 
-@shared_task
+@shared_task(acks_late=True, reject_on_worker_lost=True)
 def close_auction(auction_id):
     """
     Close a specific auction and determine winner
@@ -57,53 +65,22 @@ def close_auction(auction_id):
     - Keeps each task focused and small
     - Can be called independently
     - Better error handling
+
+    IDEMPOTENT:
+    - Acknowledged after it runs, so a worker lost mid-close gets the task
+      redelivered (and overlapping sweeps may queue an auction twice)
+    - services.close_auction locks the auction row: the close, the
+      winner's statistics and the outbox event (which queues the result
+      notifications once relayed) commit together, and a repeat finds
+      the auction closed
     
     Args:
         auction_id: ID of the auction to close
     """
     try:
-        auction = Auction.objects.get(id=auction_id)
-
-        # Check if auction is still active
-        if auction.status != 'active':
+        if services.close_auction(auction_id) is None:
             logger.warning(f"Auction {auction_id} is already closed.")
             return f"Auction {auction_id} is already closed."
-        
-        # Get highest bid
-        highest_bid = auction.bids.order_by('-amount').first()
-
-        # Determine winner
-        if highest_bid:
-            # Check if reserve price is met (if set)
-            if auction.reserve_price:
-                if highest_bid.amount >= auction.reserve_price:
-                    auction.winner = highest_bid.bidder
-                    auction.status = 'closed'
-                    logger.info(
-                        f"Auction {auction_id} closed. Winner: {highest_bid.bidder.username}"
-                    )
-                else:
-                    # Reserve price not met
-                    auction.status = 'closed'
-                    logger.info(
-                        f"Auction {auction_id} closed. Reserve price not met."
-                    )
-            else:
-                # No reserve price, highest bidder wins
-                auction.winner = highest_bid.bidder
-                auction.status = 'closed'
-                logger.info(
-                    f"Auction {auction_id} closed. Winner: {highest_bid.bidder.username}"
-                )
-        else:
-            # No bids placed, just close the auction
-            auction.status = 'closed'
-            logger.info(f"Auction {auction_id} closed with no bids.")
-
-        auction.save()
-
-        notify_auction_participants.delay(auction_id)
-
         return f"Auction {auction_id} closed successfully."
     
     except Auction.DoesNotExist:
@@ -116,55 +93,83 @@ def close_auction(auction_id):
 @shared_task
 def notify_auction_participants(auction_id):
     """
-    Send notifications to auction participants
+    Queue the result notifications of a closed auction
+
+    Delivery is batched across auctions by
+    apps.notifications.tasks.deliver_notifications
+
+    Args:
+        auction_id: ID of the auction
+    """
+    count = queue_auction_results([auction_id])
+    return f"Queued {count} notifications for auction {auction_id}"
+
+
+@shared_task
+def archive_closed_auction_bids(batch_size=200):
+    """
+    Move bids of long-finished auctions to the archive table
     
-    In a real app, this would send emails or push notifications
-    For this demo, we'll just log the notifications
+    Runs daily (configured in celery.py). Each auction is archived in
+    its own transaction, so a failure only affects that auction.
     
     Args:
-        auction_id: ID of the auction
+        batch_size: Maximum number of auctions archived per run
     """
-    from .models import Auction
+    from .archive import archivable_auctions, archive_auction_bids
     
-    try:
-        auction = Auction.objects.get(id=auction_id)
-        
-        # Get all unique bidders
-        bidders = auction.bids.values_list('bidder__email', flat=True).distinct()
-        
-        if auction.winner:
-            # Notify winner
-            logger.info(
-                f"📧 NOTIFICATION: {auction.winner.email} - "
-                f"Congratulations! You won '{auction.title}' for ${auction.current_price}"
-            )
-            
-            # Notify other bidders
-            for bidder_email in bidders:
-                if bidder_email != auction.winner.email:
-                    logger.info(
-                        f"📧 NOTIFICATION: {bidder_email} - "
-                        f"Auction '{auction.title}' has ended. You were outbid."
-                    )
-        else:
-            # No winner
-            logger.info(
-                f"📧 NOTIFICATION: {auction.owner.email} - "
-                f"Your auction '{auction.title}' ended with no winner."
-            )
-        
-        # Notify owner
-        if auction.winner and auction.owner.email != auction.winner.email:
-            logger.info(
-                f"📧 NOTIFICATION: {auction.owner.email} - "
-                f"Your auction '{auction.title}' sold for ${auction.current_price}"
-            )
-        
-        return f"Notifications sent for auction {auction_id}"
-        
-    except Auction.DoesNotExist:
-        logger.error(f"Auction {auction_id} not found")
-        return f"Auction {auction_id} not found"
-    except Exception as e:
-        logger.error(f"Error notifying participants for auction {auction_id}: {str(e)}")
-        raise
+    auction_ids = list(archivable_auctions().values_list('id', flat=True)[:batch_size])
+    archived = 0
+    
+    for auction_id in auction_ids:
+        archived += archive_auction_bids(auction_id)
+    
+    logger.info(f"Archived {archived} bids from {len(auction_ids)} auctions.")
+    return f"Archived {archived} bids from {len(auction_ids)} auctions."
+
+
+@shared_task
+def push_watchlist_update(auction_id):
+    """
+    Send an auction's current watchlist entry to its connected watchers
+
+    Queued by schedule_watchlist_push(), at most once per
+    WATCHLIST_PUSH_INTERVAL per auction
+    """
+    from . import watchlist
+
+    count = watchlist.push_watchlist_update(auction_id)
+    return f"Pushed auction {auction_id} to {count} watchers."
+
+
+@shared_task
+def warm_auction_feeds():
+    """
+    Rebuild the cached trending ranking (see feeds.py)
+
+    Scheduled every minute, like the bid activity compaction it reads, so
+    requests never rank auctions themselves
+    """
+    from . import feeds
+
+    count = feeds.warm_feeds()
+    return f"Ranked {count} trending auctions."
+
+
+@shared_task
+def relay_outbox():
+    """
+    Publish the unpublished outbox events (see outbox.py)
+
+    Queued after each commit that records events, and run by beat every
+    few seconds to retry events whose publishing failed
+    """
+    count = outbox.relay_pending()
+    return f"Published {count} outbox events."
+
+
+@shared_task
+def prune_outbox_events():
+    """Delete outbox events published more than OUTBOX_RETENTION_HOURS ago"""
+    count = outbox.prune_published()
+    return f"Deleted {count} published outbox events."
@@ -1,3 +1,644 @@
-from django.test import TestCase
+import json
+import random
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bidding.events import auction_group
+from apps.bidding.models import BidActivityBucket, UserBidStatistics
+from apps.media.models import MediaBlob
+from apps.media.storage import store_upload
+from apps.notifications.presence import amark_connected, user_group
+from apps.users.models import User
+from live_auction_drf.celery import app as celery_app
+from . import feeds, outbox
+from .filters import AuctionFilterSet, _facet_queryset
+from .images import refresh_auction_media
+from .models import Auction, AuctionImage, Category, OutboxEvent, Tag, WatchlistItem
+from .serializers import AuctionCreateSerializer
+from .services import BidRejected, close_auction, place_bid, update_auction
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+class EagerCeleryMixin:
+    """Run Celery tasks inline; eager apply_async still opens a producer"""
+
+    # The app reads the CELERY_ namespace (live_auction_drf/celery.py)
+    CELERY_CONF = {
+        'CELERY_TASK_ALWAYS_EAGER': True,
+        'CELERY_BROKER_URL': 'memory://',
+        'CELERY_RESULT_BACKEND': 'cache+memory://',
+    }
+
+    def setUp(self):
+        super().setUp()
+        previous = {key: celery_app.conf.get(key) for key in self.CELERY_CONF}
+        celery_app.conf.update(self.CELERY_CONF)
+        self.addCleanup(celery_app.conf.update, previous)
+        cache.clear()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, OUTBOX_RELAY_ON_COMMIT=False)
+class OutboxRelayTests(EagerCeleryMixin, TransactionTestCase):
+    """outbox.relay_pending"""
+
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        self.auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+
+    def test_publishes_outside_any_transaction(self):
+        place_bid(self.auction.id, self.bidder, Decimal('20'))
+        in_transaction = []
+        publish = outbox.publish
+
+        def spy(events):
+            in_transaction.append(connection.in_atomic_block)
+            return publish(events)
+
+        with mock.patch.object(outbox, 'publish', spy):
+            self.assertEqual(outbox.relay_pending(), 1)
+
+        self.assertEqual(in_transaction, [False])
+        event = OutboxEvent.objects.get()
+        self.assertIsNotNone(event.published_at)
+        self.assertIsNone(event.claimed_until)
+
+    def test_relay_clears_the_queued_flag(self):
+        with mock.patch('apps.auctions.tasks.relay_outbox.delay') as delay:
+            outbox.schedule_relay()
+            outbox.schedule_relay()
+        # One run queued for both commits
+        delay.assert_called_once_with()
+        self.assertTrue(cache.get(outbox.RELAY_SCHEDULED_KEY))
+
+        outbox.relay_pending()
+        self.assertIsNone(cache.get(outbox.RELAY_SCHEDULED_KEY))
+
+        # The next commit queues a new run instead of waiting for the beat
+        with mock.patch('apps.auctions.tasks.relay_outbox.delay') as delay:
+            outbox.schedule_relay()
+        delay.assert_called_once_with()
+
+    def test_waits_for_another_relays_claim(self):
+        place_bid(self.auction.id, self.bidder, Decimal('20'))
+        OutboxEvent.objects.update(claimed_until=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(outbox.relay_pending(), 0)
+
+        # An expired claim (its relay died) is taken over
+        OutboxEvent.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(outbox.relay_pending(), 1)
+
+    def test_failed_send_releases_claim_and_backs_off(self):
+        place_bid(self.auction.id, self.bidder, Decimal('20'))
+
+        async def group_send(group, message):
+            raise ConnectionError('layer down')
+
+        with mock.patch.object(get_channel_layer(), 'group_send', group_send):
+            self.assertEqual(outbox.relay_pending(), 0)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertIsNone(event.published_at)
+        self.assertIsNone(event.claimed_until)
+        # Backing off: nothing is retried until the pause expires
+        self.assertEqual(outbox.relay_pending(), 0)
+
+        cache.delete(outbox.RELAY_BACKOFF_KEY)
+        sent = []
+
+        async def capture(group, message):
+            sent.append((group, message['type'], message['event_id']))
+
+        with mock.patch.object(get_channel_layer(), 'group_send', capture):
+            self.assertEqual(outbox.relay_pending(), 1)
+        self.assertEqual(sent, [(auction_group(self.auction.id), 'bid_placed', event.id)])
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, OUTBOX_RELAY_ON_COMMIT=False)
+class WatchlistPushTests(EagerCeleryMixin, TransactionTestCase):
+    """Watchers with an open socket get the entry of a watched auction that changed"""
+
+    def test_pushes_changes_to_connected_watchers(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        online = User.objects.create_user('online', 'online@example.com', 'pw')
+        offline = User.objects.create_user('offline', 'offline@example.com', 'pw')
+        auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        for watcher in (online, offline):
+            WatchlistItem.objects.create(user=watcher, auction=auction)
+        async_to_sync(amark_connected)(online.id)
+
+        place_bid(auction.id, bidder, Decimal('20'))
+        sent = []
+
+        async def capture(group, message):
+            sent.append((group, message))
+
+        with mock.patch.object(get_channel_layer(), 'group_send', capture):
+            outbox.relay_pending()
+
+        pushes = [(group, message) for group, message in sent if message['type'] == 'watchlist_update']
+        self.assertEqual([group for group, _ in pushes], [user_group(online.id)])
+        entry = pushes[0][1]['auction']
+        self.assertEqual(
+            (entry['auction_id'], entry['current_price'], entry['total_bids']), (auction.id, '20.00', 1)
+        )
+
+
+class TrendingFeedTests(TestCase):
+    """feeds.warm_feeds and GET /api/v1/auctions/trending/"""
+
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        now = timezone.now()
+        self.lamp, self.vase, self.rug, self.closed = [
+            Auction.objects.create(
+                title=title, description='Lot', starting_price=10, current_price=10,
+                owner=owner, end_time=now + timedelta(hours=1), status=status,
+            )
+            for title, status in [
+                ('Lamp', 'active'), ('Vase', 'active'), ('Rug', 'active'), ('Chair', 'closed'),
+            ]
+        ]
+        minute = now.replace(second=0, microsecond=0)
+        for auction, minutes_ago, bids in [
+            (self.lamp, 2, 5),
+            (self.vase, 1, 4), (self.vase, 3, 5),
+            (self.rug, 5, 1),
+            # Outside the window, and a closed auction: not ranked
+            (self.rug, 60, 100),
+            (self.closed, 1, 100),
+        ]:
+            BidActivityBucket.objects.create(
+                auction=auction, resolution=BidActivityBucket.RESOLUTION_MINUTE,
+                bucket_start=minute - timedelta(minutes=minutes_ago), bid_count=bids,
+            )
+
+    def test_requests_serve_the_warmed_ranking(self):
+        self.assertEqual(feeds.warm_feeds(), 3)
+
+        with mock.patch.object(feeds, 'rank_trending') as rank_trending:
+            response = APIClient().get('/api/v1/auctions/trending/')
+        rank_trending.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(entry['title'], entry['recent_bids']) for entry in response.json()['data']],
+            [('Vase', 9), ('Lamp', 5), ('Rug', 1)],
+        )
+
+    def test_rebuilds_after_a_cache_loss(self):
+        self.assertEqual(
+            feeds.trending_ranking(),
+            [(self.vase.id, 9), (self.lamp.id, 5), (self.rug.id, 1)],
+        )
+        self.assertEqual(cache.get(feeds.TRENDING_CACHE_KEY), feeds.trending_ranking())
+
+
+class CloseAuctionTests(TestCase):
+    """services.close_auction"""
+
+    def setUp(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        self.auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+
+    def test_closes_exactly_once(self):
+        place_bid(self.auction.id, self.bidder, Decimal('20'))
+
+        closed = close_auction(self.auction.id)
+        self.assertEqual(closed.status, 'closed')
+        self.assertEqual(closed.winner, self.bidder)
+        # An overlapping sweep finds it closed: no second event, no second win
+        self.assertIsNone(close_auction(self.auction.id))
+
+        self.assertEqual(OutboxEvent.objects.filter(topic='auction_closed').count(), 1)
+        self.assertEqual(UserBidStatistics.objects.get(user=self.bidder).auctions_won, 1)
+
+    def test_refuses_bids_after_the_close(self):
+        close_auction(self.auction.id)
+        with self.assertRaises(BidRejected):
+            place_bid(self.auction.id, self.bidder, Decimal('20'))
+        self.assertFalse(self.auction.bids.exists())
+
+
+class ConditionalGetTests(TestCase):
+    """ETag / If-None-Match on the auction detail and bid list"""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        cls.auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+
+    def test_not_modified_until_a_bid(self):
+        client = APIClient()
+        for url in (f'/api/v1/auctions/{self.auction.id}/', f'/api/v1/auctions/{self.auction.id}/bids/'):
+            with self.subTest(url=url):
+                etag = client.get(url)['ETag']
+
+                response = client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+                place_bid(self.auction.id, self.bidder, self.auction.current_price + 1)
+                self.auction.refresh_from_db()
+                response = client.get(url, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_pages_of_the_bid_list_have_their_own_tag(self):
+        for amount in range(11, 23):
+            place_bid(self.auction.id, self.bidder, Decimal(amount))
+        client = APIClient()
+        url = f'/api/v1/auctions/{self.auction.id}/bids/'
+        self.assertNotEqual(client.get(url)['ETag'], client.get(url, {'page': 2})['ETag'])
+
+
+class AuctionBulkImportTests(TestCase):
+    """POST /api/v1/auctions/bulk/"""
+
+    url = '/api/v1/auctions/bulk/'
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.end_time = (timezone.now() + timedelta(days=1)).isoformat()
+
+    def row(self, title, **fields):
+        return {
+            'title': title, 'description': 'Lot', 'starting_price': '10.00',
+            'end_time': self.end_time, **fields,
+        }
+
+    def post(self, body, content_type='application/x-ndjson', **extra):
+        return self.client.generic('POST', self.url, body, content_type=content_type, **extra)
+
+    def test_ndjson_reports_bad_rows_and_imports_the_rest(self):
+        body = '\n'.join([
+            json.dumps(self.row('Lamp')),
+            '',
+            '[1, 2]',
+            '{"title": ',
+            '   ',
+            json.dumps({'title': 'No price'}),
+            json.dumps(self.row('Vase')),
+        ])
+
+        response = self.post(body)
+
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()['data']
+        self.assertEqual((summary['created'], summary['failed']), (2, 3))
+        # Blank lines are skipped, not numbered
+        errors = {error['row']: error['errors'] for error in summary['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4])
+        self.assertEqual(errors[2], 'Each line must be a JSON object')
+        self.assertTrue(errors[3].startswith('Invalid JSON'))
+        self.assertIn('starting_price', errors[4])
+
+        self.assertEqual(
+            sorted(Auction.objects.filter(owner=self.owner).values_list('title', flat=True)),
+            ['Lamp', 'Vase'],
+        )
+        self.assertEqual(OutboxEvent.objects.filter(topic='auction_created').count(), 2)
+
+    def test_csv_reports_invalid_rows(self):
+        body = (
+            'title,description,starting_price,reserve_price,end_time\n'
+            f'Lamp,Lot,10.00,,{self.end_time}\n'
+            f'Vase,Lot,10.00,5.00,{self.end_time}\n'
+        )
+
+        response = self.post(body, content_type='text/csv')
+
+        self.assertEqual(response.status_code, 201)
+        summary = response.json()['data']
+        self.assertEqual((summary['created'], summary['failed']), (1, 1))
+        self.assertEqual(summary['errors'][0]['row'], 2)
+        self.assertIn('reserve_price', summary['errors'][0]['errors'])
+
+    def test_refuses_an_import_where_every_row_fails(self):
+        response = self.post('{"title": "No price"}\n')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors']['failed'], 1)
+        self.assertFalse(Auction.objects.exists())
+
+    def test_requires_a_content_length_for_chunked_bodies_under_wsgi(self):
+        # The WSGI handler reads no body without a Content-Length
+        response = self.post(b'', HTTP_TRANSFER_ENCODING='chunked')
+
+        self.assertEqual(response.status_code, 411)
+        self.assertFalse(Auction.objects.exists())
+
+
+class UpdateAuctionTests(TestCase):
+    """services.update_auction"""
+
+    def test_keeps_changes_made_since_the_instance_was_read(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        stale = Auction.objects.get(pk=auction.pk)
+
+        # A bid and a thumbnail refresh land between the PATCH's read and its save
+        place_bid(auction.id, bidder, Decimal('20'))
+        media = [{'id': 1, 'url': '/media/lamp.jpg', 'width': 640, 'height': 480, 'thumbnails': {}}]
+        Auction.objects.filter(pk=auction.pk).update(media=media)
+
+        serializer = AuctionCreateSerializer(stale, data={'title': 'Brass lamp'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        update_auction(stale, serializer.save)
+
+        auction.refresh_from_db()
+        self.assertEqual(auction.title, 'Brass lamp')
+        self.assertEqual(auction.current_price, Decimal('20'))
+        self.assertEqual(auction.media, media)
+
+
+@override_settings(MEDIA_MAX_IMAGES_PER_AUCTION=2)
+class AuctionImageUploadTests(TestCase):
+    """POST /api/v1/auctions/{id}/images/"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+        self.url = f'/api/v1/auctions/{self.auction.id}/images/'
+
+    def upload(self, content):
+        image = SimpleUploadedFile('image.png', b'\x89PNG\r\n\x1a\n' + content, content_type='image/png')
+        return self.client.post(self.url, {'image': image}, format='multipart')
+
+    def test_positions_follow_the_last_image(self):
+        first, second = [self.upload(content).json()['data'] for content in (b'a', b'b')]
+        self.client.delete(f"{self.url}{first['id']}/")
+        third = self.upload(b'c').json()['data']
+
+        self.assertEqual(
+            list(self.auction.images.values_list('id', 'position')),
+            [(second['id'], 1), (third['id'], 2)],
+        )
+
+    def test_limit_is_enforced_under_the_lock(self):
+        self.upload(b'a')
+
+        def concurrent_upload(upload):
+            # Another request attaches an image after the early check
+            blob = MediaBlob.objects.create(sha256='0' * 64, content_type='image/png', size=1)
+            AuctionImage.objects.create(auction=self.auction, blob=blob, position=1)
+            return store_upload(upload)
+
+        with mock.patch('apps.auctions.views.store_upload', side_effect=concurrent_upload):
+            response = self.upload(b'b')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Auctions are limited to 2 images')
+        self.assertEqual(self.auction.images.count(), 2)
+
+
+class AuctionImageDeleteTests(TestCase):
+    """DELETE /api/v1/auctions/{id}/images/{image_id}/"""
+
+    def test_removes_the_image_with_an_empty_204(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        blob = MediaBlob.objects.create(
+            sha256='0' * 64, content_type='image/jpeg', size=1,
+        )
+        image = AuctionImage.objects.create(auction=auction, blob=blob)
+        refresh_auction_media([auction.id])
+
+        client = APIClient()
+        client.force_authenticate(owner)
+        response = client.delete(f'/api/v1/auctions/{auction.id}/images/{image.id}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.content, b'')
+        auction.refresh_from_db()
+        self.assertEqual(auction.media, [])
+
+
+@override_settings(WATCHLIST_MAX_ITEMS=2)
+class WatchlistAddTests(TestCase):
+    """POST /api/v1/auctions/watchlist/"""
+
+    url = '/api/v1/auctions/watchlist/'
+
+    def setUp(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.watcher = User.objects.create_user('watcher', 'watcher@example.com', 'pw')
+        self.auctions = [
+            Auction.objects.create(
+                title=title, description='Lot', starting_price=10, current_price=10,
+                owner=owner, end_time=timezone.now() + timedelta(hours=1),
+            )
+            for title in ('Lamp', 'Vase', 'Clock')
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.watcher)
+
+    def watch(self, auction):
+        return self.client.post(self.url, {'auction_id': auction.id}, format='json')
+
+    def test_refuses_new_auctions_once_full(self):
+        lamp, vase, clock = self.auctions
+        self.assertEqual([self.watch(lamp).status_code, self.watch(vase).status_code], [201, 201])
+
+        response = self.watch(clock)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Watchlist is full (2 auctions)')
+        # Watching one already on the list is still a no-op
+        self.assertEqual(self.watch(lamp).status_code, 200)
+        self.assertEqual(WatchlistItem.objects.filter(user=self.watcher).count(), 2)
+
+    def test_checks_the_limit_under_the_users_row_lock(self):
+        with mock.patch.object(
+            QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update,
+        ) as select_for_update:
+            self.watch(self.auctions[0])
+
+        [(queryset,), _] = select_for_update.call_args
+        self.assertIs(queryset.model, User)
+
+
+class WatchlistItemDeleteTests(TestCase):
+    """DELETE /api/v1/auctions/watchlist/{auction_id}/"""
+
+    def test_stops_watching_with_an_empty_204(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        watcher = User.objects.create_user('watcher', 'watcher@example.com', 'pw')
+        auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        WatchlistItem.objects.create(user=watcher, auction=auction)
+
+        client = APIClient()
+        client.force_authenticate(watcher)
+        response = client.delete(f'/api/v1/auctions/watchlist/{auction.id}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.content, b'')
+        self.assertFalse(WatchlistItem.objects.filter(user=watcher).exists())
+        self.assertEqual(client.delete(f'/api/v1/auctions/watchlist/{auction.id}/').status_code, 404)
+
+
+def full_scan(plan, table):
+    """Whether a plan line reads the whole table (SQLite or PostgreSQL wording)"""
+    for line in plan.splitlines():
+        if f'Seq Scan on {table}' in line:
+            return True
+        words = line.split()
+        if 'SCAN' in words and table in words and 'USING' not in words:
+            return True
+    return False
+
+
+class AuctionFilterQueryPlanTests(TestCase):
+    """
+    The list filters are served by their composite indexes (Auction.Meta)
+
+    Seeds auctions across categories, tags, sellers, prices and end times
+    and runs ANALYZE, so the planner sees realistic selectivity
+    """
+
+    AUCTIONS = 3000
+
+    # (query params, index expected in the list query's plan, or None for any)
+    CASES = [
+        ({'category': 'cat-3'}, 'auction_category_idx'),
+        ({'category': 'cat-3', 'active': 'true'}, 'auction_category_idx'),
+        ({'category': 'cat-3', 'status': 'active', 'ends_before': 6}, 'auction_category_idx'),
+        ({'status': 'active', 'min_price': '100', 'max_price': '120'}, 'auction_status_price_idx'),
+        ({'seller': 'seller-7', 'active': 'true'}, 'auction_seller_idx'),
+        ({'active': 'true'}, None),
+        ({'status': 'active', 'ends_after': 1, 'ends_before': 2}, None),
+        ({'tags': 'tag-5'}, None),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.now = timezone.now()
+        categories = Category.objects.bulk_create(
+            [Category(name=f'Category {i}', slug=f'cat-{i}') for i in range(30)]
+        )
+        tags = Tag.objects.bulk_create([Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(100)])
+        sellers = User.objects.bulk_create(
+            [User(username=f'seller-{i}', email=f'seller-{i}@example.com') for i in range(500)]
+        )
+
+        auctions = []
+        for i in range(cls.AUCTIONS):
+            price = Decimal(rng.randint(1, 5000))
+            status = rng.choices(['active', 'closed', 'cancelled'], [3, 6, 1])[0]
+            ends = cls.now + timedelta(minutes=rng.randint(10, 7 * 24 * 60))
+            if status != 'active':
+                ends = cls.now - timedelta(minutes=rng.randint(10, 90 * 24 * 60))
+            auctions.append(Auction(
+                title=f'Lot {i}', description='Query plan lot',
+                starting_price=price, current_price=price,
+                owner=rng.choice(sellers), category=rng.choice(categories),
+                status=status, start_time=ends - timedelta(days=7), end_time=ends,
+            ))
+        auctions = Auction.objects.bulk_create(auctions, batch_size=2000)
+        Auction.tags.through.objects.bulk_create([
+            Auction.tags.through(auction_id=auction.id, tag_id=tag.id)
+            for auction in auctions
+            for tag in rng.sample(tags, 2)
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def params(self, case_params):
+        # Integer values are end times that many hours from now
+        return {
+            key: (self.now + timedelta(hours=value)).isoformat() if isinstance(value, int) else value
+            for key, value in case_params.items()
+        }
+
+    def test_list_filters_use_their_index(self):
+        for case_params, expected in self.CASES:
+            with self.subTest(**case_params):
+                filterset = AuctionFilterSet(self.params(case_params))
+                plan = filterset.filter_queryset(Auction.objects.order_by('-id'))[:10].explain()
+                self.assertFalse(full_scan(plan, 'auctions'), plan)
+                if expected:
+                    self.assertIn(expected, plan)
+
+    def test_facet_queries_never_scan_auctions(self):
+        # Facets drop the category filter, so any index will do
+        for case_params, _ in self.CASES:
+            with self.subTest(**case_params):
+                plan = _facet_queryset(AuctionFilterSet(self.params(case_params))).explain()
+                self.assertFalse(full_scan(plan, 'auctions'), plan)
+
+
+class CountCacheKeyTests(SimpleTestCase):
+    """AuctionFilterSet.count_cache_key"""
+
+    def test_common_filters_are_cached(self):
+        filterset = AuctionFilterSet({'status': 'active', 'category': 'toys,art', 'active': 'true'})
+        self.assertEqual(
+            filterset.count_cache_key(),
+            'auctions:active=True:category=art,toys:status=active',
+        )
+
+    def test_free_form_filters_are_not_cached(self):
+        for params in (
+            {'search': 'lamp'},
+            {'category': 'art', 'min_price': '10.5'},
+            {'ends_before': '2030-01-01T00:00:00+00:00'},
+            {'status': 'active', 'seller': 'alice'},
+        ):
+            with self.subTest(**params):
+                self.assertIsNone(AuctionFilterSet(params).count_cache_key())
@@ -4,9 +4,18 @@ from . import views
 app_name = 'users'
 
 urlpatterns = [
-    path('', views.AuctionListCreateAPIView.as_view(), name='auction_list_create'),
-    path('<int:pk>/', views.AuctionDetailAPIView.as_view(), name='auction_list_create'),
+    path('', views.AuctionListCreateAsyncAPIView.as_view(), name='auction_list_create'),
+    path('<int:pk>/', views.AuctionDetailAsyncAPIView.as_view(), name='auction_list_create'),
     path('<int:pk>/bids/', views.AuctionBidsAPIView.as_view(), name='auction_bid_list'),
+    path('<int:pk>/bids/export/', views.AuctionBidsExportAPIView.as_view(), name='auction_bid_export'),
+    path('<int:pk>/images/', views.AuctionImagesAPIView.as_view(), name='auction_images'),
+    path('<int:pk>/images/<int:image_id>/', views.AuctionImageAPIView.as_view(), name='auction_image'),
+    path('bulk/', views.AuctionBulkImportAPIView.as_view(), name='auction_bulk_import'),
+    path('export/', views.AuctionExportAPIView.as_view(), name='auction_export'),
+    path('ending-soon/', views.EndingSoonAPIView.as_view(), name='ending_soon'),
+    path('trending/', views.TrendingAPIView.as_view(), name='trending'),
     path('my-auctions/', views.MyAuctionsAPIView.as_view(), name='my_auctions'),
     path('my-bids/', views.MyBidsAPIView.as_view(), name='my_bids'),
+    path('watchlist/', views.WatchlistAPIView.as_view(), name='watchlist'),
+    path('watchlist/<int:auction_id>/', views.WatchlistItemAPIView.as_view(), name='watchlist_item'),
 ]
\ No newline at end of file
@@ -1,100 +1,90 @@
+import heapq
 import logging
 from rest_framework.views import APIView
+from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.settings import api_settings
 from apps.utils.permissions import IsOwnerOrReadOnly
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404, get_object_or_404
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, aprefetch_related_objects, prefetch_related_objects
 
-from .models import Auction, Bid
-from .serializers import AuctionListSerializer, AuctionCreateSerializer, AuctionDetailSerializer, BidSerializer
-from apps.utils.views import APIResponse
+from . import feeds
+from .filters import AuctionFilterSet, acategory_facets
+from .models import ArchivedBid, Auction, AuctionImage, Bid, WatchlistItem
+from .archive import user_bid_history
+from .images import media_entry, refresh_auction_media
+from .watchlist import watchlist_entry, watchlist_feed
+from .serializers import (
+    AuctionCreateSerializer,
+    AuctionDetailSerializer,
+    AuctionImportSerializer,
+    AuctionListSerializer,
+    BidSerializer,
+)
+from .services import CancelRejected, cancel_auction, create_auction, create_auctions, update_auction
+from apps.media.models import MediaBlob
+from apps.media.storage import UploadError, store_upload
+from apps.media.tasks import generate_thumbnails
+from apps.utils.conditional import conditional_response, make_etag, set_validators
+from apps.utils.counting import CountingPageNumberPagination
+from apps.utils.pagination import AsyncPageNumberPagination
+from apps.utils.transactions import write_atomic
+from apps.utils.views import APIResponse, AsyncAPIView, ReplicaReadMixin
+from apps.utils.streaming import (
+    CONTENT_TYPES,
+    IgnoreClientContentNegotiation,
+    body_stream,
+    detect_format,
+    is_chunked,
+    iter_rows,
+    streaming_export_response,
+    wants_gzip,
+)
 
 logger = logging.getLogger(__name__)
 
+User = get_user_model()
 
-class AuctionListCreateAPIView(APIResponse, APIView):
-    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    pagination_class = PageNumberPagination
 
-    def get(self, request):
-        try:
-            queryset = (
-                Auction.objects.select_related("owner", "winner")
-                .all()
-                .order_by("-id")
-            )
-
-            # Filter by status
-            status_filter = request.query_params.get("status")
-            if status_filter:
-                queryset = queryset.filter(status=status_filter)
-
-            # Filter active auctions only
-            active_only = request.query_params.get("active")
-            if active_only and active_only.lower() == "true":
-                now = timezone.now()
-                queryset = queryset.filter(
-                    status="active",
-                    start_time__lte=now,
-                    end_time__gt=now,
-                )
+def wants_facets(request):
+    """?facets=true: add per-category counts of the filtered list to meta"""
+    return (request.query_params.get("facets") or "").lower() == "true"
 
-            # Search by title or description
-            search = request.query_params.get("search")
-            if search:
-                queryset = queryset.filter(
-                    Q(title__icontains=search) |
-                    Q(description__icontains=search)
-                )
 
-            # Pagination
-            paginator = self.pagination_class()
-            page = paginator.paginate_queryset(queryset, request)
+def auction_version(pk):
+    """
+    Cheap version read for conditional GETs: (updated_at, bid sequence)
 
-            if page is not None:
-                serializer = AuctionListSerializer(page, many=True)
+    An accepted bid raises current_price, which bumps updated_at; the
+    rollup's total_bids is the auction's bid sequence
+    """
+    return Auction.objects.filter(pk=pk).values_list("updated_at", "bid_analytics__total_bids")
 
-                now = timezone.now()
 
-                meta = {
-                    "count": paginator.page.paginator.count,
-                    "next": paginator.get_next_link(),
-                    "previous": paginator.get_previous_link(),
-                }
+def auction_validators(pk, version, *parts):
+    """(etag, last_modified) for one auction resource, (None, None) if missing"""
+    if version is None:
+        return None, None
+    updated_at, bid_sequence = version
+    return make_etag("auction", pk, updated_at.isoformat(), bid_sequence or 0, *parts), updated_at
 
-                return self.success_response(
-                    message="Retrieved auction list successfully",
-                    data=serializer.data,
-                    meta=meta,
-                )
-
-            # # No pagination case
-            # serializer = AuctionListSerializer(queryset, many=True)
-            # return self.success_response(
-            #     message="Retrieved auction list successfully",
-            #     data=serializer.data,
-            # )
-
-        except ValidationError as e:
-            logger.warning(f"Validation error in AuctionList API: {e}")
-            return self.error_response(
-                message="Validation error",
-                errors=e.detail,
-                status_code=status.HTTP_400_BAD_REQUEST,
-            )
 
-        except Exception as e:
-            logger.exception("Unexpected error in AuctionList API")
-            return self.error_response(
-                message="Internal server error",
-                errors=str(e),
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+class AuctionListCreateAPIView(APIResponse, APIView):
+    """
+    POST /api/auctions/ - Create auction
 
+    GET is served by AuctionListCreateAsyncAPIView, which falls back to
+    this view for writes
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def post(self, request):
         """Create a New Auction"""
@@ -105,7 +95,7 @@ class AuctionListCreateAPIView(APIResponse, APIView):
             )
 
             if serializer.is_valid():
-                auction = serializer.save()
+                auction = create_auction(serializer.save)
 
                 response_serializer = AuctionDetailSerializer(auction)
 
@@ -137,43 +127,24 @@ class AuctionListCreateAPIView(APIResponse, APIView):
 
 class AuctionDetailAPIView(APIResponse, APIView):
     """
-    GET /api/auctions/{id}/ - Retrieve auction details
-    PUT /api/auctions/{id}/ - Update auction (owner only)
     PATCH /api/auctions/{id}/ - Partial update (owner only)
     DELETE /api/auctions/{id}/ - Cancel auction (owner only, no bids)
+
+    GET is served by AuctionDetailAsyncAPIView, which falls back to this
+    view for writes
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
     def get_object(self, pk):
         """Get auction object or return 404"""
-        auction = get_object_or_404(Auction.objects.select_related('owner', 'winner'), pk=pk)
+        auction = get_object_or_404(
+            Auction.objects.select_related('owner', 'winner', 'category').prefetch_related('tags'),
+            pk=pk
+        )
 
         self.check_object_permissions(self.request, auction)
         return auction
 
-    def get(self, request, pk):
-        """Retrieve detailed auction information"""
-        try:
-            auction = self.get_object(pk)
-            serializer = AuctionDetailSerializer(auction)
-
-            return self.success_response(
-                message='Retrived data successfully',
-                data = serializer.data,
-            )
-        except ValidationError as e:
-            return self.error_response(
-                message="Validation Error",
-                errors=e.detail,
-                status_code=status.HTTP_400_BAD_REQUEST
-            )
-        except Exception as e:
-            return self.error_response(
-                message="Internal Server Error",
-                errors=e.detail,
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
     def patch(self, request, pk):
         """
         Update auction (full update)
@@ -189,7 +160,7 @@ class AuctionDetailAPIView(APIResponse, APIView):
             )
 
             if serializer.is_valid():
-                serializer.save()
+                update_auction(auction, serializer.save)
                 response_serializer = AuctionDetailSerializer(auction)
 
                 return self.success_response(
@@ -213,20 +184,14 @@ class AuctionDetailAPIView(APIResponse, APIView):
         """Cancel auction (owner only, no bids)"""
         try:
             auction = self.get_object(pk)
-            if auction.total_bids > 0:
-                return self.error_response(
-                    message="Cannot delete auction with existing bids",
-                    status_code=status.HTTP_400_BAD_REQUEST
-                )
-            if auction.status == 'active':
-                auction.status = 'cancelled'
-                auction.save()
-                return self.success_response(
-                    message="Auction cancelled successfully",
-                    status_code=status.HTTP_200_OK
-                )
+            cancel_auction(auction.id)
+            return self.success_response(
+                message="Auction cancelled successfully",
+                status_code=status.HTTP_200_OK
+            )
+        except CancelRejected as e:
             return self.error_response(
-                message="Can only cancel active auctions",
+                message=str(e),
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         except Exception as e:
@@ -236,32 +201,138 @@ class AuctionDetailAPIView(APIResponse, APIView):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class AuctionBidsAPIView(APIResponse, APIView):
+class AuctionListCreateAsyncAPIView(AsyncAPIView):
+    """
+    GET /api/auctions/ - List auctions (async ORM, no worker thread held)
+    POST /api/auctions/ - Create auction (served by AuctionListCreateAPIView)
+    
+    Query params (see filters.AuctionFilterSet):
+    - status, active=true, search
+    - category, tags: comma-separated slugs (any of them)
+    - min_price, max_price: current price range
+    - ends_after, ends_before: ISO 8601 end-time window
+    - seller: owner username
+    - facets=true: meta.facets.category, match counts per category
+
+    total_bids comes from the bid analytics rollup instead of a COUNT per row
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = AsyncPageNumberPagination
+    sync_view = AuctionListCreateAPIView
+    replica_reads = True
+
+    async def get(self, request):
+        filterset = AuctionFilterSet(request.query_params)
+        try:
+            queryset = filterset.filter_queryset(
+                Auction.objects.select_related("owner", "category").with_total_bids().order_by("-id"),
+            )
+        except ValidationError as e:
+            return self.error_response(
+                message="Validation error",
+                errors=e.detail,
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(
+            queryset, request,
+            count_cache_key=filterset.count_cache_key(),
+        )
+        serializer = AuctionListSerializer(page, many=True)
+
+        meta = {
+            "count": paginator.count,
+            "count_type": paginator.count_type,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+        }
+        if wants_facets(request):
+            meta["facets"] = {"category": await acategory_facets(filterset)}
+
+        return self.success_response(
+            message="Retrieved auction list successfully",
+            data=serializer.data,
+            meta=meta,
+        )
+
+
+class AuctionDetailAsyncAPIView(AsyncAPIView):
+    """
+    GET /api/auctions/{id}/ - Retrieve auction details (async ORM)
+    PATCH, DELETE /api/auctions/{id}/ - Served by AuctionDetailAPIView
+
+    GET supports conditional requests (ETag, Last-Modified)
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    sync_view = AuctionDetailAPIView
+
+    async def get(self, request, pk):
+        """Retrieve detailed auction information"""
+        etag, last_modified = auction_validators(pk, await auction_version(pk).afirst(), "detail")
+        if etag:
+            not_modified = conditional_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+
+        auction = await aget_object_or_404(
+            Auction.objects.select_related('owner', 'winner', 'category'), pk=pk
+        )
+        self.check_object_permissions(request, auction)
+        await aprefetch_related_objects([auction], 'tags')
+
+        bids = auction.bid_history()
+        auction.total_bids = await bids.acount()
+        latest_bids = [bid async for bid in bids.select_related('bidder')[:5]]
+
+        serializer = AuctionDetailSerializer(auction, context={'latest_bids': latest_bids})
+        response = self.success_response(
+            message='Retrived data successfully',
+            data=serializer.data,
+        )
+        return set_validators(response, etag, last_modified)
+
+
+class AuctionBidsAPIView(ReplicaReadMixin, APIResponse, APIView):
     """
     GET /api/auctions/{id}/bids/ - Get all bids for an auction
+
+    Supports conditional GET (ETag per page, Last-Modified)
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    pagination_class = PageNumberPagination
+    pagination_class = CountingPageNumberPagination
     def get(self, request, pk):
         """Get all bids for a specific auction"""
         try:
+            # Every page gets its own tag; any new bid changes them all
+            paginator = self.pagination_class()
+            etag, last_modified = auction_validators(
+                pk, auction_version(pk).first(), "bids",
+                request.query_params.get(paginator.page_query_param, "1"),
+            )
+            if etag:
+                not_modified = conditional_response(request, etag, last_modified)
+                if not_modified is not None:
+                    return not_modified
+
             auction = get_object_or_404(Auction, pk=pk)
-            bids = auction.bids.select_related('bidder').all()
+            bids = auction.bid_history().select_related('bidder')
             # Pagination
-            paginator = self.pagination_class()
             page = paginator.paginate_queryset(bids, request)
             if page is not None:
                 serializer = BidSerializer(page, many=True)
                 meta = {
                     "count": paginator.page.paginator.count,
+                    "count_type": paginator.count_type,
                     "next": paginator.get_next_link(),
                     "previous": paginator.get_previous_link(),
                 }
-                return self.success_response(
+                response = self.success_response(
                     message="Retrieved bids successfully",
                     data=serializer.data,
                     meta=meta
                 )
+                return set_validators(response, etag, last_modified)
             serializer = BidSerializer(bids, many=True)
             return self.success_response(
                 message="Retrieved bids successfully",
@@ -281,19 +352,19 @@ class AuctionBidsAPIView(APIResponse, APIView):
             )
 
 
-class MyAuctionsAPIView(APIResponse, APIView):
+class MyAuctionsAPIView(ReplicaReadMixin, APIResponse, APIView):
     """
     GET /api/auctions/my-auctions/ - Get auctions created by current user
     """
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = PageNumberPagination
+    pagination_class = CountingPageNumberPagination
 
     def get(self, request):
         """Get all auctions owned by the authenticated user"""
         try:
             auctions = Auction.objects.filter(
                 owner=request.user
-            ).select_related('winner')
+            ).select_related('winner', 'category')
             # Pagination
             paginator = self.pagination_class()
             page = paginator.paginate_queryset(auctions, request)
@@ -301,6 +372,7 @@ class MyAuctionsAPIView(APIResponse, APIView):
                 serializer = AuctionListSerializer(page, many=True)
                 meta = {
                     "count": paginator.page.paginator.count,
+                    "count_type": paginator.count_type,
                     "next": paginator.get_next_link(),
                     "previous": paginator.get_previous_link(),
                 }
@@ -328,26 +400,27 @@ class MyAuctionsAPIView(APIResponse, APIView):
             )
 
 
-class MyBidsAPIView(APIResponse, APIView):
+class MyBidsAPIView(ReplicaReadMixin, APIResponse, APIView):
     """
     GET /api/auctions/my-bids/ - Get bids placed by current user
     """
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = PageNumberPagination
+    pagination_class = CountingPageNumberPagination
 
     def get(self, request):
         """Get all bids placed by the authenticated user"""
         try:
-            bids = Bid.objects.filter(
-                bidder=request.user
-            ).select_related('auction', 'auction__owner')
+            # Hot and archived bids combined
+            bids = user_bid_history(request.user)
             # Pagination
             paginator = self.pagination_class()
             page = paginator.paginate_queryset(bids, request)
             if page is not None:
+                prefetch_related_objects(page, 'bidder')
                 serializer = BidSerializer(page, many=True)
                 meta = {
                     "count": paginator.page.paginator.count,
+                    "count_type": paginator.count_type,
                     "next": paginator.get_next_link(),
                     "previous": paginator.get_previous_link(),
                 }
@@ -372,4 +445,604 @@ class MyBidsAPIView(APIResponse, APIView):
                 message="Internal Server Error",
                 errors=str(e),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+class AuctionImagesAPIView(APIResponse, APIView):
+    """
+    POST /api/auctions/{id}/images/ - Upload an image (multipart field "image")
+
+    Owner only. The file is stored once per distinct content and its
+    thumbnails are generated in the background (apps/media); the response
+    and the auction's images carry the original URL at once and the
+    thumbnail URLs when they are ready
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, pk):
+        auction = get_object_or_404(Auction, pk=pk)
+        self.check_object_permissions(request, auction)
+
+        upload = request.FILES.get('image')
+        if upload is None:
+            return self.error_response(
+                message="Validation Error",
+                errors={'image': 'An image file is required'},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        limit = getattr(settings, 'MEDIA_MAX_IMAGES_PER_AUCTION', 10)
+        # Early refusal before storing the file; re-checked under the lock
+        if auction.images.count() >= limit:
+            return self.limit_response(limit)
+
+        try:
+            blob, _ = store_upload(upload)
+        except UploadError as e:
+            return self.error_response(
+                message="Validation Error",
+                errors={'image': str(e)},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        # The limit and the next position are read under the auction's row
+        # lock: concurrent uploads cannot both pass the check or share a position
+        with write_atomic():
+            auction = Auction.objects.select_for_update().get(pk=auction.pk)
+            images = auction.images.aggregate(count=Count('id'), last=Max('position'))
+            if images['count'] >= limit:
+                return self.limit_response(limit)
+
+            position = 0 if images['last'] is None else images['last'] + 1
+            image, created = AuctionImage.objects.get_or_create(
+                auction=auction, blob=blob, defaults={'position': position}
+            )
+            refresh_auction_media([auction.id])
+            if blob.thumbnail_status == MediaBlob.THUMBNAILS_PENDING:
+                transaction.on_commit(lambda: generate_thumbnails.delay(blob.id))
+
+        image.blob = blob
+        return self.success_response(
+            message="Image uploaded successfully" if created else "Image already attached",
+            data=media_entry(image),
+            status_code=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def limit_response(self, limit):
+        return self.error_response(
+            message=f"Auctions are limited to {limit} images",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+
+
+class AuctionImageAPIView(APIResponse, APIView):
+    """
+    DELETE /api/auctions/{id}/images/{image_id}/ - Remove an image (owner only)
+
+    The stored file stays: other auctions may share it
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+
+    def delete(self, request, pk, image_id):
+        auction = get_object_or_404(Auction, pk=pk)
+        self.check_object_permissions(request, auction)
+
+        deleted, _ = AuctionImage.objects.filter(auction=auction, id=image_id).delete()
+        if not deleted:
+            return self.error_response(
+                message="Image not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        refresh_auction_media([auction.id])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FeedAPIView(ReplicaReadMixin, APIResponse, APIView):
+    """Shared limit handling of the discovery feeds (see feeds.py)"""
+    permission_classes = [permissions.AllowAny]
+    MAX_LIMIT = 100
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', api_settings.PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer'})
+        return max(1, min(limit, self.MAX_LIMIT))
+
+
+class EndingSoonAPIView(FeedAPIView):
+    """
+    GET /api/auctions/ending-soon/ - Active auctions ending next
+
+    Query params:
+    - limit: page size (default PAGE_SIZE, at most 100)
+    - after: meta.next of the previous page ("<end_time>,<id>")
+    """
+
+    def parse_cursor(self, request):
+        value = request.query_params.get('after')
+        if not value:
+            return None
+        end_time, _, auction_id = value.replace(' ', '+').rpartition(',')
+        try:
+            parsed = parse_datetime(end_time)
+            auction_id = int(auction_id)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({'after': 'Must be "<end_time>,<id>" from the previous page'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed, auction_id
+
+    def get(self, request):
+        try:
+            limit = self.get_limit(request)
+            auctions = feeds.ending_soon(limit + 1, after=self.parse_cursor(request))
+        except ValidationError as e:
+            return self.error_response(
+                message="Validation Error",
+                errors=e.detail,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        page = auctions[:limit]
+        next_cursor = None
+        if len(auctions) > limit:
+            last = page[-1]
+            next_cursor = f"{last.end_time.isoformat()},{last.id}"
+        return self.success_response(
+            message="Retrieved ending soon auctions successfully",
+            data=AuctionListSerializer(page, many=True).data,
+            meta={"next": next_cursor}
+        )
+
+
+class TrendingAPIView(FeedAPIView):
+    """
+    GET /api/auctions/trending/ - Active auctions with the most recent bids
+
+    Ranked by bids over the last TRENDING_WINDOW_MINUTES (recent_bids);
+    the ranking is rebuilt every minute and holds TRENDING_FEED_SIZE auctions
+
+    Query params:
+    - limit: page size (default PAGE_SIZE, at most 100)
+    - offset: position in the ranking (meta.next of the previous page)
+    """
+
+    def get(self, request):
+        try:
+            limit = self.get_limit(request)
+            try:
+                offset = max(0, int(request.query_params.get('offset', 0)))
+            except ValueError:
+                raise ValidationError({'offset': 'Must be an integer'})
+        except ValidationError as e:
+            return self.error_response(
+                message="Validation Error",
+                errors=e.detail,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        auctions, has_more = feeds.trending(offset, limit)
+        data = AuctionListSerializer(auctions, many=True).data
+        for entry, auction in zip(data, auctions):
+            entry['recent_bids'] = auction.recent_bids
+        return self.success_response(
+            message="Retrieved trending auctions successfully",
+            data=data,
+            meta={"next": offset + limit if has_more else None}
+        )
+
+
+class WatchlistAPIView(APIResponse, APIView):
+    """
+    GET /api/auctions/watchlist/ - The user's watched auctions, newest first
+    POST /api/auctions/watchlist/ - Watch an auction ({"auction_id": <id>})
+
+    Each entry carries price, bid count, leader and time left, so clients
+    render the list from one page request instead of a detail request per
+    auction. Read from the primary: a just-watched auction must be listed.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CountingPageNumberPagination
+
+    def get(self, request):
+        """List watched auctions (one query per page, plus the count)"""
+        try:
+            feed = watchlist_feed(request.user)
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(feed, request)
+            now = timezone.now()
+            if page is not None:
+                meta = {
+                    "count": paginator.page.paginator.count,
+                    "count_type": paginator.count_type,
+                    "next": paginator.get_next_link(),
+                    "previous": paginator.get_previous_link(),
+                }
+                return self.success_response(
+                    message="Retrieved watchlist successfully",
+                    data=[watchlist_entry(auction, now) for auction in page],
+                    meta=meta
+                )
+            return self.success_response(
+                message="Retrieved watchlist successfully",
+                data=[watchlist_entry(auction, now) for auction in feed],
+            )
+        except ValidationError as e:
+            return self.error_response(
+                message="Validation Error",
+                errors=e.detail,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            logger.exception("Unexpected error in Watchlist API")
+            return self.error_response(
+                message="Internal Server Error",
+                errors=str(e),
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    def post(self, request):
+        """Watch an auction; watching it again is a no-op"""
+        try:
+            auction_id = int(request.data.get('auction_id'))
+        except (TypeError, ValueError):
+            return self.error_response(
+                message="Validation Error",
+                errors={'auction_id': 'A valid auction id is required'},
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        if not Auction.objects.filter(pk=auction_id).exists():
+            return self.error_response(
+                message="Auction not found",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+
+        limit = getattr(settings, 'WATCHLIST_MAX_ITEMS', 5000)
+        # The user's row lock serialises their additions: two concurrent
+        # requests cannot both pass the limit check
+        with write_atomic():
+            User.objects.select_for_update().only('pk').get(pk=request.user.pk)
+            watched = WatchlistItem.objects.filter(user=request.user)
+            if not watched.filter(auction_id=auction_id).exists() and watched.count() >= limit:
+                return self.error_response(
+                    message=f"Watchlist is full ({limit} auctions)",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+
+            _, created = WatchlistItem.objects.get_or_create(user=request.user, auction_id=auction_id)
+        return self.success_response(
+            message="Auction added to watchlist" if created else "Auction already in watchlist",
+            data={'auction_id': auction_id},
+            status_code=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class WatchlistItemAPIView(APIResponse, APIView):
+    """
+    DELETE /api/auctions/watchlist/{auction_id}/ - Stop watching an auction
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request, auction_id):
+        deleted, _ = WatchlistItem.objects.filter(user=request.user, auction_id=auction_id).delete()
+        if not deleted:
+            return self.error_response(
+                message="Auction not in watchlist",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AuctionBulkImportAPIView(APIResponse, APIView):
+    """
+    POST /api/auctions/bulk/ - Create many auctions from an NDJSON or CSV body
+    
+    Body: one auction per line (NDJSON, Content-Type: application/x-ndjson)
+    or a CSV file with a header row (Content-Type: text/csv), using the
+    same fields as auction creation. Rows are validated and inserted in
+    chunks (category and tag slugs resolved once per chunk, one
+    auction_created outbox event per auction); invalid rows are reported
+    without aborting the import. A chunked body without Content-Length is
+    read under ASGI and refused with 411 under WSGI.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    CHUNK_SIZE = 500
+    MAX_REPORTED_ERRORS = 1000
+
+    def post(self, request):
+        """Validate and bulk insert auctions chunk by chunk"""
+        try:
+            input_format = detect_format(request)
+            if input_format not in CONTENT_TYPES:
+                return self.error_response(
+                    message="Unsupported input format (use ndjson or csv)",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+
+            stream = body_stream(request)
+            if stream is None:
+                if is_chunked(request):
+                    return self.error_response(
+                        message="Chunked uploads are not supported here, send a Content-Length",
+                        status_code=status.HTTP_411_LENGTH_REQUIRED
+                    )
+                return self.error_response(
+                    message="The request body is empty",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+
+            created = 0
+            failed = 0
+            errors = []
+            batch = []
+
+            def report(row_number, error):
+                nonlocal failed
+                failed += 1
+                if len(errors) < self.MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'errors': error})
+
+            def import_batch():
+                """Validate a batch (slugs resolved once) and insert its valid rows"""
+                context = AuctionImportSerializer.preload(data for _, data in batch)
+                pending = []
+                for row_number, data in batch:
+                    serializer = AuctionImportSerializer(data=data, context=context)
+                    if not serializer.is_valid():
+                        report(row_number, serializer.errors)
+                        continue
+                    validated = dict(serializer.validated_data)
+                    tags = validated.pop('tags', [])
+                    pending.append((Auction(
+                        **validated,
+                        current_price=validated['starting_price'],
+                        owner=request.user,
+                    ), tags))
+                return create_auctions(pending) if pending else 0
+
+            for row_number, data, error in iter_rows(stream, input_format):
+                if error is not None:
+                    report(row_number, error)
+                    continue
+                batch.append((row_number, data))
+                if len(batch) >= self.CHUNK_SIZE:
+                    created += import_batch()
+                    batch = []
+
+            if batch:
+                created += import_batch()
+            # Parse errors are reported as read, validation errors per batch
+            errors.sort(key=lambda error: error['row'])
+
+            summary = {
+                'created': created,
+                'failed': failed,
+                'errors': errors,
+            }
+
+            if created == 0 and failed:
+                return self.error_response(
+                    message="No auctions were imported",
+                    errors=summary,
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+
+            return self.success_response(
+                message=f"Imported {created} auctions",
+                data=summary,
+                status_code=status.HTTP_201_CREATED
+            )
+
+        except Exception as e:
+            logger.exception("Unexpected error in AuctionBulkImport API")
+            return self.error_response(
+                message="Internal Server Error",
+                errors=str(e),
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AuctionExportAPIView(ReplicaReadMixin, APIResponse, APIView):
+    """
+    GET /api/auctions/export/ - Stream auctions as NDJSON or CSV
+    
+    Query params:
+    - output: ndjson (default) or csv
+    - status: filter by status
+    - mine: true to export only the current user's auctions
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    FIELDS = [
+        'id',
+        'title',
+        'description',
+        'starting_price',
+        'current_price',
+        'reserve_price',
+        'owner_id',
+        'owner_username',
+        'winner_id',
+        'status',
+        'start_time',
+        'end_time',
+        'created_at',
+    ]
+
+    def get(self, request):
+        """Stream every matching auction from a server-side cursor"""
+        output_format = request.query_params.get('output', 'ndjson').lower()
+        if output_format not in CONTENT_TYPES:
+            return self.error_response(
+                message="Unsupported output format (use ndjson or csv)",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = Auction.objects.order_by('id')
+
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+
+        mine = request.query_params.get('mine')
+        if mine and mine.lower() == 'true':
+            queryset = queryset.filter(owner=request.user)
+
+        # Rows are read after the view returns: bind the database now
+        rows = queryset.using(queryset.db).annotate(
+            owner_username=F('owner__username')
+        ).values(*self.FIELDS).iterator(chunk_size=2000)
+
+        return streaming_export_response(
+            request,
+            rows,
+            self.FIELDS,
+            output_format,
+            'auctions',
+            compress=wants_gzip(request),
+        )
+
+
+class BaseBidExportAPIView(ReplicaReadMixin, APIResponse, APIView):
+    """
+    Base view for streaming bid exports
+    
+    Subclasses must set `querysets`, one queryset per storage tier (hot
+    bids, archived bids), and may narrow them per request by overriding
+    get_querysets(request, **kwargs); the sorted streams are merged so
+    the output stays in (created_at, id) order
+    
+    Query params:
+    - output: ndjson (default) or csv
+    - since, until: ISO 8601 bounds on created_at (until is exclusive)
+    - after: resume cursor "<created_at>,<id>" taken from the last row
+      received; rows are ordered by (created_at, id)
+    - gzip: true/false (defaults to the Accept-Encoding header)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    FIELDS = [
+        'id',
+        'auction_id',
+        'bidder_id',
+        'bidder_username',
+        'amount',
+        'created_at',
+    ]
+    CHUNK_SIZE = 2000
+    filename = 'bids'
+    querysets = None
+
+    def get_querysets(self, request, **kwargs):
+        """The storage tiers to export, as fresh querysets"""
+        assert self.querysets is not None, (
+            f"'{self.__class__.__name__}' should include a `querysets` attribute"
+        )
+        return [queryset.all() for queryset in self.querysets]
+
+    def filter_queryset(self, queryset, since, until, cursor):
+        """Apply the time range and resume cursor to one tier"""
+        if since:
+            queryset = queryset.filter(created_at__gte=since)
+        if until:
+            queryset = queryset.filter(created_at__lt=until)
+        if cursor:
+            # Keyset pagination: no OFFSET, resumes exactly after the last row
+            created_at, bid_id = cursor
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) |
+                Q(created_at=created_at, id__gt=bid_id)
+            )
+        # Rows are read after the view returns: bind the database now
+        return queryset.using(queryset.db).order_by('created_at', 'id').annotate(
+            bidder_username=F('bidder__username')
+        ).values(*self.FIELDS)
+
+    def parse_time(self, name):
+        """Parse an ISO datetime query param (None when absent)"""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        # An unencoded "+00:00" offset arrives as " 00:00"
+        value = value.replace(' ', '+')
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Must be an ISO 8601 datetime'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def parse_cursor(self):
+        """Parse ?after=<created_at>,<id> into (datetime, id)"""
+        value = self.request.query_params.get('after')
+        if not value:
+            return None
+        created_at, _, bid_id = value.replace(' ', '+').rpartition(',')
+        try:
+            parsed = parse_datetime(created_at)
+            bid_id = int(bid_id)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({'after': 'Must be "<created_at>,<id>" from the last exported row'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed, bid_id
+
+    def get(self, request, **kwargs):
+        """Stream matching bids from a server-side cursor"""
+        output_format = request.query_params.get('output', 'ndjson').lower()
+        if output_format not in CONTENT_TYPES:
+            return self.error_response(
+                message="Unsupported output format (use ndjson or csv)",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            since = self.parse_time('since')
+            until = self.parse_time('until')
+            cursor = self.parse_cursor()
+        except ValidationError as e:
+            return self.error_response(
+                message="Validation Error",
+                errors=e.detail,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        streams = [
+            self.filter_queryset(queryset, since, until, cursor).iterator(chunk_size=self.CHUNK_SIZE)
+            for queryset in self.get_querysets(request, **kwargs)
+        ]
+        rows = heapq.merge(*streams, key=lambda row: (row['created_at'], row['id']))
+
+        return streaming_export_response(
+            request,
+            rows,
+            self.FIELDS,
+            output_format,
+            self.filename,
+            compress=wants_gzip(request),
+        )
+
+
+class AuctionBidsExportAPIView(BaseBidExportAPIView):
+    """
+    GET /api/auctions/{id}/bids/export/ - Stream all bids of an auction
+    """
+
+    querysets = (Bid.objects.all(), ArchivedBid.objects.all())
+
+    def get_querysets(self, request, pk):
+        auction = get_object_or_404(Auction, pk=pk)
+        self.filename = f'auction-{auction.id}-bids'
+        return [queryset.filter(auction=auction) for queryset in super().get_querysets(request)]
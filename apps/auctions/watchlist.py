@@ -0,0 +1,120 @@
+"""
+Watchlist
+=========
+A user's watched auctions as one feed, kept current over their socket
+
+WHY:
+- Clients rebuilt the watchlist by requesting every auction's detail:
+  N requests, each with its own total_bids COUNT and latest-bids query
+
+HOW IT WORKS:
+- watchlist_feed(user) is a single query for any watchlist size: price
+  and end time from the auction row, bid count from the analytics rollup
+  (with_total_bids) and leader from the participant rollup (with_leader),
+  ordered by the (user, -created_at) index; views paginate it
+- When an auction changes (bid, edit, cancel, close; relayed from the
+  outbox, see outbox.py), schedule_watchlist_push() queues one
+  push task per auction per WATCHLIST_PUSH_INTERVAL seconds (hot auctions
+  are coalesced). The task reads the auction's entry once and sends it to
+  the group of every watcher that is connected (presence), as a
+  watchlist_update message (notification WebSocket and SSE stream)
+- Offline watchers get nothing pushed: their next feed read is current
+- The push throttle and the presence lookup go through the cache, which
+  must be shared by the web and worker processes (CACHE_URL, Redis by
+  default): with a per-process cache the worker sees no watcher online
+"""
+
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Auction, WatchlistItem
+
+logger = logging.getLogger(__name__)
+
+
+def watchlist_feed(user):
+    """Queryset of the user's watched auctions, newest first, feed-ready"""
+    return (
+        Auction.objects.filter(watchlist_items__user=user)
+        .with_total_bids()
+        .with_leader()
+        # Same join as the filter: one row per watched auction
+        .annotate(watched_at=F('watchlist_items__created_at'))
+        .order_by('-watched_at', '-id')
+        .only('id', 'title', 'status', 'current_price', 'start_time', 'end_time')
+    )
+
+
+def watchlist_entry(auction, now=None):
+    """Feed entry of an auction annotated by watchlist_feed() or entry_queryset()"""
+    now = now or timezone.now()
+    entry = {
+        'auction_id': auction.id,
+        'title': auction.title,
+        'status': auction.status,
+        'current_price': str(auction.current_price),
+        'total_bids': auction.total_bids,
+        'leader': auction.leader,
+        'end_time': auction.end_time.isoformat(),
+        'seconds_remaining': max(0, int((auction.end_time - now).total_seconds())),
+        'is_active': auction.status == 'active' and auction.start_time <= now <= auction.end_time,
+    }
+    watched_at = getattr(auction, 'watched_at', None)
+    if watched_at is not None:
+        entry['watched_at'] = watched_at.isoformat()
+    return entry
+
+
+def entry_queryset():
+    """Auctions annotated for watchlist_entry() (pushes)"""
+    return Auction.objects.with_total_bids().with_leader()
+
+
+def schedule_watchlist_push(auction_id):
+    """
+    Queue a push of the auction's entry to its connected watchers
+
+    At most once per WATCHLIST_PUSH_INTERVAL seconds per auction; the
+    push runs after the interval and so carries every change made in it
+    """
+    from .tasks import push_watchlist_update
+
+    interval = getattr(settings, 'WATCHLIST_PUSH_INTERVAL', 1)
+    if cache.add(f'watchlist-push:{auction_id}', 1, interval):
+        push_watchlist_update.apply_async((auction_id,), countdown=interval)
+
+
+def push_watchlist_update(auction_id):
+    """Send the auction's current entry to every connected watcher; returns how many"""
+    from apps.notifications.presence import connected_users, user_group
+
+    watchers = list(
+        WatchlistItem.objects.filter(auction_id=auction_id).values_list('user_id', flat=True)
+    )
+    online = connected_users(watchers)
+    if not online:
+        return 0
+
+    auction = entry_queryset().filter(pk=auction_id).first()
+    if auction is None:
+        return 0
+    message = {'type': 'watchlist_update', 'auction': watchlist_entry(auction)}
+
+    channel_layer = get_channel_layer()
+
+    async def send_all():
+        # One event loop for the whole fan-out
+        for user_id in online:
+            try:
+                await channel_layer.group_send(user_group(user_id), message)
+            except Exception as e:
+                logger.error(f"Watchlist push to user {user_id} failed: {e}")
+
+    async_to_sync(send_all)()
+    return len(online)
@@ -0,0 +1,189 @@
+"""
+Bid Activity Rollups
+====================
+Per-minute and per-hour bid activity buckets for dashboards
+
+HOW IT WORKS:
+- compact_bid_activity() runs every minute (Celery Beat, see tasks.py)
+- It aggregates the bids of every minute that has fully elapsed since the
+  last compacted bucket, for each auction and platform-wide
+- A minute is compacted only BID_ACTIVITY_COMPACTION_LAG_SECONDS after it
+  ends: a bid's created_at is set before its transaction commits, so a
+  minute compacted right away could miss bids still committing; the
+  watermark would then move past them and they would never be counted
+- The platform-wide minute series is dense (empty minutes get a zero
+  bucket), so its latest bucket is the compaction watermark
+- When an hour has fully elapsed it is aggregated from the bids as well,
+  so hourly unique bidder counts are exact
+- prune_bid_activity() applies the retention policy: minute buckets are
+  dropped after a few days, leaving only the hourly series for old data
+
+Each window is rewritten with delete + bulk_create, so re-running a
+compaction over the same window is safe.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.auctions.models import Bid
+from .models import BidActivityBucket
+
+logger = logging.getLogger(__name__)
+
+MINUTE = BidActivityBucket.RESOLUTION_MINUTE
+HOUR = BidActivityBucket.RESOLUTION_HOUR
+
+
+def floor_time(value, resolution):
+    """Truncate a datetime to the start of its minute or hour bucket"""
+    value = value.replace(second=0, microsecond=0)
+    if resolution == HOUR:
+        value = value.replace(minute=0)
+    return value
+
+
+def _aggregate(start, end, resolution):
+    """
+    Aggregate the bids in [start, end) into buckets
+
+    Returns a dict keyed by (auction_id or None, bucket_start)
+    """
+    buckets = {}
+    rows = (
+        Bid.objects
+        .filter(created_at__gte=start, created_at__lt=end)
+        .order_by('created_at', 'id')
+        .values_list('auction_id', 'bidder_id', 'amount', 'created_at')
+    )
+
+    for auction_id, bidder_id, amount, created_at in rows.iterator(chunk_size=2000):
+        bucket_start = floor_time(created_at, resolution)
+        for key in ((auction_id, bucket_start), (None, bucket_start)):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {
+                    'bid_count': 0,
+                    'bidders': set(),
+                    'min_price': amount,
+                    'max_price': amount,
+                    'last_price': amount,
+                }
+            bucket['bid_count'] += 1
+            bucket['bidders'].add(bidder_id)
+            bucket['min_price'] = min(bucket['min_price'], amount)
+            bucket['max_price'] = max(bucket['max_price'], amount)
+            # Rows are ordered by time, so the last one seen is the latest
+            bucket['last_price'] = amount
+
+    return buckets
+
+
+def _write(start, end, resolution, buckets):
+    """Replace all buckets of one resolution in [start, end)"""
+    with transaction.atomic():
+        BidActivityBucket.objects.filter(
+            resolution=resolution,
+            bucket_start__gte=start,
+            bucket_start__lt=end,
+        ).delete()
+        BidActivityBucket.objects.bulk_create([
+            BidActivityBucket(
+                auction_id=auction_id,
+                resolution=resolution,
+                bucket_start=bucket_start,
+                bid_count=bucket['bid_count'],
+                unique_bidders=len(bucket['bidders']),
+                min_price=bucket['min_price'],
+                max_price=bucket['max_price'],
+                last_price=bucket['last_price'],
+            )
+            for (auction_id, bucket_start), bucket in buckets.items()
+        ], batch_size=1000)
+
+
+def compact_bid_activity(now=None):
+    """
+    Roll every minute (and hour) that ended at least
+    BID_ACTIVITY_COMPACTION_LAG_SECONDS ago, since the last run, into buckets
+
+    Returns the number of minute buckets written
+    """
+    now = now or timezone.now()
+    lag = timedelta(seconds=getattr(settings, 'BID_ACTIVITY_COMPACTION_LAG_SECONDS', 60))
+    cutoff = floor_time(now - lag, MINUTE)
+    max_lookback = timedelta(
+        hours=getattr(settings, 'BID_ACTIVITY_MAX_LOOKBACK_HOURS', 24)
+    )
+
+    # Resume after the latest platform-wide minute bucket
+    last_bucket = (
+        BidActivityBucket.objects
+        .filter(auction__isnull=True, resolution=MINUTE)
+        .order_by('-bucket_start')
+        .values_list('bucket_start', flat=True)
+        .first()
+    )
+    start = last_bucket + timedelta(minutes=1) if last_bucket else cutoff - max_lookback
+    start = max(start, cutoff - max_lookback)
+
+    if start >= cutoff:
+        return 0
+
+    minute_buckets = _aggregate(start, cutoff, MINUTE)
+
+    # Fill empty platform-wide minutes so the watermark always advances
+    minute = start
+    while minute < cutoff:
+        minute_buckets.setdefault((None, minute), {
+            'bid_count': 0,
+            'bidders': set(),
+            'min_price': None,
+            'max_price': None,
+            'last_price': None,
+        })
+        minute += timedelta(minutes=1)
+
+    _write(start, cutoff, MINUTE, minute_buckets)
+
+    # Hours that finished inside this window
+    hour_start = floor_time(start, HOUR)
+    hour_end = floor_time(cutoff, HOUR)
+    if hour_start < hour_end:
+        _write(hour_start, hour_end, HOUR, _aggregate(hour_start, hour_end, HOUR))
+
+    logger.info(
+        f"Compacted bid activity from {start.isoformat()} to {cutoff.isoformat()} "
+        f"({len(minute_buckets)} minute buckets)"
+    )
+    return len(minute_buckets)
+
+
+def prune_bid_activity(now=None):
+    """
+    Apply the retention policy
+
+    Minute buckets older than BID_ACTIVITY_MINUTE_RETENTION_DAYS are dropped
+    (the hourly series still covers them); hour buckets are kept for
+    BID_ACTIVITY_HOUR_RETENTION_DAYS
+
+    Returns the number of deleted buckets
+    """
+    now = now or timezone.now()
+    minute_days = getattr(settings, 'BID_ACTIVITY_MINUTE_RETENTION_DAYS', 2)
+    hour_days = getattr(settings, 'BID_ACTIVITY_HOUR_RETENTION_DAYS', 90)
+
+    deleted, _ = BidActivityBucket.objects.filter(
+        resolution=MINUTE,
+        bucket_start__lt=now - timedelta(days=minute_days),
+    ).delete()
+    hour_deleted, _ = BidActivityBucket.objects.filter(
+        resolution=HOUR,
+        bucket_start__lt=now - timedelta(days=hour_days),
+    ).delete()
+
+    logger.info(f"Pruned {deleted} minute and {hour_deleted} hour activity buckets")
+    return deleted + hour_deleted
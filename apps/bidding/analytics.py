@@ -0,0 +1,224 @@
+"""
+Bid Analytics
+=============
+Incremental maintenance and rebuild of the bid rollup tables
+
+HOW IT WORKS:
+- record_bid() is called once per accepted bid (from signals.py)
+- It updates AuctionParticipant, AuctionBidAnalytics and UserBidStatistics
+  in one transaction
+- record_auction_won() credits the winner when an auction closes
+- rebuild_auction_analytics() / rebuild_user_statistics() recompute the
+  rollups from the source tables (rebuild_bid_analytics and
+  rebuild_bid_statistics management commands)
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+
+from apps.auctions.models import ArchivedBid, Auction, Bid
+from apps.auctions.serializers import BidSerializer
+from .models import AuctionBidAnalytics, AuctionParticipant, UserBidStatistics
+
+logger = logging.getLogger(__name__)
+
+
+def _snapshot(bid):
+    """Serialize a bid for the recent_bids list"""
+    return dict(BidSerializer(bid).data)
+
+
+def record_bid(bid):
+    """
+    Fold a newly accepted bid into the rollups
+
+    Args:
+        bid: The Bid instance that was just created
+    """
+    with transaction.atomic():
+        participant, new_bidder = AuctionParticipant.objects.get_or_create(
+            auction_id=bid.auction_id,
+            bidder_id=bid.bidder_id,
+            defaults={
+                'bid_count': 1,
+                'highest_bid': bid.amount,
+                'first_bid_at': bid.created_at,
+                'last_bid_at': bid.created_at,
+            }
+        )
+        if not new_bidder:
+            participant.bid_count += 1
+            participant.highest_bid = max(participant.highest_bid, bid.amount)
+            participant.last_bid_at = bid.created_at
+            participant.save(
+                update_fields=['bid_count', 'highest_bid', 'last_bid_at']
+            )
+
+        # Lock the rollup row so concurrent bids don't lose updates
+        analytics, _ = (
+            AuctionBidAnalytics.objects
+            .select_for_update()
+            .get_or_create(auction_id=bid.auction_id)
+        )
+
+        analytics.total_bids += 1
+        analytics.bid_sum += bid.amount
+        if analytics.lowest_bid is None or bid.amount < analytics.lowest_bid:
+            analytics.lowest_bid = bid.amount
+        if analytics.highest_bid is None or bid.amount > analytics.highest_bid:
+            analytics.highest_bid = bid.amount
+        if new_bidder:
+            analytics.unique_bidders += 1
+
+        recent = [_snapshot(bid)] + list(analytics.recent_bids)
+        analytics.recent_bids = recent[:AuctionBidAnalytics.RECENT_BIDS_LIMIT]
+        analytics.save()
+
+        stats, _ = (
+            UserBidStatistics.objects
+            .select_for_update()
+            .get_or_create(user_id=bid.bidder_id)
+        )
+
+        stats.total_bids += 1
+        stats.bid_sum += bid.amount
+        if stats.highest_bid is None or bid.amount > stats.highest_bid:
+            stats.highest_bid = bid.amount
+        if new_bidder:
+            stats.unique_auctions += 1
+        stats.save()
+
+    return analytics
+
+
+def record_auction_won(auction):
+    """
+    Credit the winner of a closed auction
+
+    Args:
+        auction: The Auction instance that was just closed
+    """
+    if not auction.winner_id:
+        return
+
+    with transaction.atomic():
+        stats, _ = (
+            UserBidStatistics.objects
+            .select_for_update()
+            .get_or_create(user_id=auction.winner_id)
+        )
+        stats.auctions_won += 1
+        stats.save(update_fields=['auctions_won', 'updated_at'])
+
+
+def rebuild_auction_analytics(auction):
+    """
+    Recompute the rollups of one auction from its bids
+
+    Args:
+        auction: Auction instance to rebuild
+    """
+    bids = auction.bid_history()
+
+    with transaction.atomic():
+        AuctionParticipant.objects.filter(auction=auction).delete()
+        AuctionParticipant.objects.bulk_create([
+            AuctionParticipant(
+                auction=auction,
+                bidder_id=row['bidder'],
+                bid_count=row['bid_count'],
+                highest_bid=row['highest_bid'],
+                first_bid_at=row['first_bid_at'],
+                last_bid_at=row['last_bid_at'],
+            )
+            for row in bids.values('bidder').annotate(
+                bid_count=Count('id'),
+                highest_bid=Max('amount'),
+                first_bid_at=Min('created_at'),
+                last_bid_at=Max('created_at'),
+            ).order_by()
+        ])
+
+        totals = bids.aggregate(
+            total_bids=Count('id'),
+            bid_sum=Sum('amount'),
+            lowest_bid=Min('amount'),
+            highest_bid=Max('amount'),
+            unique_bidders=Count('bidder', distinct=True),
+        )
+
+        if not totals['total_bids']:
+            AuctionBidAnalytics.objects.filter(auction=auction).delete()
+            return None
+
+        recent_bids = bids.select_related('bidder').order_by('-created_at', '-id')[
+            :AuctionBidAnalytics.RECENT_BIDS_LIMIT
+        ]
+
+        analytics, _ = AuctionBidAnalytics.objects.update_or_create(
+            auction=auction,
+            defaults={
+                **totals,
+                'recent_bids': [_snapshot(bid) for bid in recent_bids],
+            }
+        )
+
+    logger.info(f"Rebuilt bid analytics for auction {auction.id}")
+    return analytics
+
+
+def rebuild_user_statistics(user_ids):
+    """
+    Recompute UserBidStatistics for a batch of users
+
+    Uses one grouped query per source table for the whole batch,
+    so a full backfill costs a handful of queries per chunk of users
+
+    Args:
+        user_ids: List of user IDs to rebuild
+    """
+    bid_totals = {}
+    # An auction's bids live entirely in one tier, so per-tier totals add up
+    for model in (Bid, ArchivedBid):
+        rows = model.objects.filter(bidder_id__in=user_ids).values('bidder').annotate(
+            total_bids=Count('id'),
+            bid_sum=Sum('amount'),
+            highest_bid=Max('amount'),
+            unique_auctions=Count('auction', distinct=True),
+        ).order_by()
+        for row in rows:
+            totals = bid_totals.get(row['bidder'])
+            if totals is None:
+                bid_totals[row['bidder']] = row
+                continue
+            totals['total_bids'] += row['total_bids']
+            totals['bid_sum'] += row['bid_sum']
+            totals['highest_bid'] = max(totals['highest_bid'], row['highest_bid'])
+            totals['unique_auctions'] += row['unique_auctions']
+    wins = dict(
+        Auction.objects.filter(winner_id__in=user_ids, status='closed')
+        .values('winner').annotate(won=Count('id'))
+        .order_by().values_list('winner', 'won')
+    )
+
+    rows = []
+    for user_id in user_ids:
+        totals = bid_totals.get(user_id)
+        if totals is None and not wins.get(user_id):
+            continue
+        rows.append(UserBidStatistics(
+            user_id=user_id,
+            total_bids=totals['total_bids'] if totals else 0,
+            bid_sum=totals['bid_sum'] if totals else 0,
+            highest_bid=totals['highest_bid'] if totals else None,
+            unique_auctions=totals['unique_auctions'] if totals else 0,
+            auctions_won=wins.get(user_id, 0),
+        ))
+
+    with transaction.atomic():
+        UserBidStatistics.objects.filter(user_id__in=user_ids).delete()
+        UserBidStatistics.objects.bulk_create(rows)
+
+    return len(rows)
@@ -19,18 +19,23 @@ HOW IT WORKS:
 2. Connection added to auction's group
 3. When user places bid:
    - Validate bid
-   - Save to database
-   - Broadcast to all users in auction group
+   - Save to database (with an outbox event)
+   - The outbox relay broadcasts it to all users in auction group
 4. All connected users receive real-time updates
 """
 
 import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from decimal import Decimal
 
+from apps.utils.executors import ServerBusy, run_in_executor
+from apps.utils.ratelimit import RateLimited, acheck_bid_rate
+from .events import auction_group, auction_status
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,12 +57,19 @@ class AuctionConsumer(AsyncWebsocketConsumer):
         4. Accept the connection
         """
         # Get auction ID from URL route
-        self.auction_id = self.scope['url_route']['kwargs']['auction_id']
-        self.auction_group_name = f'auction_{self.auction_id}'
+        # The route only matches digits; as an int, "05" and "5" share a
+        # group and a rate-limit bucket
+        self.auction_id = int(self.scope['url_route']['kwargs']['auction_id'])
+        self.auction_group_name = auction_group(self.auction_id)
         
         # Get user from scope (set by AuthMiddlewareStack)
         self.user = self.scope.get('user', AnonymousUser())
         
+        # Known state of the auction (connect snapshot, then relayed
+        # events): lets bids on an ended auction be refused locally
+        self.auction_state = None
+        self.end_time = None
+        
         # Join auction group (so we can broadcast to all watchers)
         await self.channel_layer.group_add(
             self.auction_group_name,
@@ -73,8 +85,13 @@ class AuctionConsumer(AsyncWebsocketConsumer):
         )
         
         # Send current auction status to the newly connected user
-        auction_data = await self.get_auction_data()
+        try:
+            auction_data = await self.get_auction_data()
+        except ServerBusy as e:
+            await self.send_server_busy(e)
+            return
         if auction_data:
+            self.track_auction(auction_data)
             await self.send(text_data=json.dumps({
                 'type': 'auction_status',
                 'auction': auction_data
@@ -136,9 +153,11 @@ class AuctionConsumer(AsyncWebsocketConsumer):
         
         Steps:
         1. Validate user is authenticated
-        2. Validate bid amount
-        3. Create bid in database
-        4. Broadcast to all users in auction group
+        2. Refuse bids on an auction known to have ended (no database access)
+        3. Apply the bid rate limits (no database access yet)
+        4. Validate bid amount
+        5. Create bid in database
+        6. The outbox relay broadcasts it to the auction group
         """
         # Check authentication
         if not self.user.is_authenticated:
@@ -148,11 +167,36 @@ class AuctionConsumer(AsyncWebsocketConsumer):
             }))
             return
         
+        # Ended (closed, cancelled or past end_time): no database check needed
+        if self.bidding_ended():
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': 'Auction is not active'
+            }))
+            return
+        
+        # Throttle before touching the database
+        client_ip = (self.scope.get('client') or [None])[0]
+        try:
+            await acheck_bid_rate(self.user.id, client_ip, self.auction_id)
+        except RateLimited as e:
+            await self.send(text_data=json.dumps({
+                'type': 'rate_limited',
+                'message': 'Too many bids, please slow down',
+                'scope': e.scope,
+                'retry_after': e.retry_after,
+            }))
+            return
+        
         try:
             amount = Decimal(str(data.get('amount', 0)))
             
             # Validate and create bid
-            bid, error = await self.create_bid(amount)
+            try:
+                bid, error = await self.create_bid(amount)
+            except ServerBusy as e:
+                await self.send_server_busy(e)
+                return
             
             if error:
                 await self.send(text_data=json.dumps({
@@ -161,23 +205,8 @@ class AuctionConsumer(AsyncWebsocketConsumer):
                 }))
                 return
             
-            # Broadcast bid to all users watching this auction
-            await self.channel_layer.group_send(
-                self.auction_group_name,
-                {
-                    'type': 'bid_placed',  # This will call self.bid_placed()
-                    'bid': {
-                        'id': bid.id,
-                        'amount': str(bid.amount),
-                        'bidder': bid.bidder.username,
-                        'created_at': bid.created_at.isoformat(),
-                    },
-                    'auction': {
-                        'id': bid.auction.id,
-                        'current_price': str(bid.auction.current_price),
-                    }
-                }
-            )
+            # No broadcast here: the bid's outbox event is relayed to the
+            # auction group, and self.bid_placed() forwards it to every member
             
         except (ValueError, TypeError):
             await self.send(text_data=json.dumps({
@@ -185,6 +214,36 @@ class AuctionConsumer(AsyncWebsocketConsumer):
                 'message': 'Invalid bid amount'
             }))
     
+    async def send_server_busy(self, error):
+        """
+        Tell the client the server is overloaded
+        
+        Sent instead of queueing the request when a database pool is
+        saturated; the client may retry after `retry_after` seconds
+        """
+        logger.warning(f"Rejected request on auction {self.auction_id}: {error}")
+        await self.send(text_data=json.dumps({
+            'type': 'server_busy',
+            'message': 'Server is busy, please retry',
+            'retry_after': error.retry_after,
+        }))
+    
+    def track_auction(self, auction):
+        """Remember the status and end time of a snapshot or event"""
+        if 'status' in auction:
+            self.auction_state = auction['status']
+        if 'end_time' in auction:
+            self.end_time = parse_datetime(auction['end_time'])
+    
+    def bidding_ended(self):
+        """True once the auction is known to be closed, cancelled or past its end"""
+        if self.auction_state not in (None, 'active'):
+            return True
+        return self.end_time is not None and timezone.now() > self.end_time
+    
+    # Group messages (sent by the outbox relay, see apps/bidding/events.py)
+    # arrive with their JSON frame already encoded: it is sent as is
+    
     async def bid_placed(self, event):
         """
         Called when a bid is broadcast to the group
@@ -192,63 +251,51 @@ class AuctionConsumer(AsyncWebsocketConsumer):
         This method receives the event from group_send
         and sends it to the WebSocket client
         """
-        await self.send(text_data=json.dumps({
-            'type': 'bid_placed',
-            'bid': event['bid'],
-            'auction': event['auction'],
-        }))
+        await self.send(text_data=event['frame'])
+    
+    async def auction_updated(self, event):
+        """
+        Called when the auction was edited (end time may change) or cancelled
+        """
+        self.track_auction(event['auction'])
+        await self.send(text_data=event['frame'])
+    
+    async def auction_closed(self, event):
+        """
+        Called when the auction has closed: final price, winner, reserve met
+        
+        Bids sent from now on are refused without a database check
+        """
+        self.track_auction(event['auction'])
+        await self.send(text_data=event['frame'])
     
     # Database operations (must be sync -> async)
+    # Reads and bid writes run on separate bounded pools (apps/utils/executors.py)
     
-    @database_sync_to_async
+    @run_in_executor('read')
     def get_auction_data(self):
         """Get current auction data"""
         from apps.auctions.models import Auction
         
         try:
-            auction = Auction.objects.get(id=self.auction_id)
-            return {
-                'id': auction.id,
-                'title': auction.title,
-                'current_price': str(auction.current_price),
-                'status': auction.status,
-                'is_active': auction.is_active,
-                'total_bids': auction.total_bids,
-            }
+            return auction_status(Auction.objects.get(id=self.auction_id))
         except Auction.DoesNotExist:
             return None
     
-    @database_sync_to_async
+    @run_in_executor('write')
     def create_bid(self, amount):
         """
-        Create a bid in the database
+        Create a bid in the database (validated under the auction's row
+        lock, see apps/auctions/services.py)
         
         Returns:
             tuple: (bid_object, error_message)
         """
-        from apps.auctions.models import Auction, Bid
+        from apps.auctions.models import Auction
+        from apps.auctions.services import BidRejected, place_bid
         
         try:
-            auction = Auction.objects.get(id=self.auction_id)
-            
-            # Validate auction is active
-            if not auction.is_active:
-                return None, "Auction is not active"
-            
-            # Validate bid amount
-            if amount <= auction.current_price:
-                return None, f"Bid must be higher than current price (${auction.current_price})"
-            
-            # Validate user is not the owner
-            if auction.owner == self.user:
-                return None, "You cannot bid on your own auction"
-            
-            # Create bid
-            bid = Bid.objects.create(
-                auction=auction,
-                bidder=self.user,
-                amount=amount
-            )
+            bid = place_bid(self.auction_id, self.user, amount)
             
             logger.info(
                 f"Bid placed: {self.user.username} bid ${amount} on auction {self.auction_id}"
@@ -258,6 +305,8 @@ class AuctionConsumer(AsyncWebsocketConsumer):
             
         except Auction.DoesNotExist:
             return None, "Auction not found"
+        except BidRejected as e:
+            return None, str(e)
         except Exception as e:
             logger.error(f"Error creating bid: {str(e)}")
             return None, "Failed to place bid"
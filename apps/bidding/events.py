@@ -0,0 +1,65 @@
+"""
+Auction Events
+==============
+Messages sent to an auction's channel-layer group (auction_<id>)
+
+Every listener of an auction gets the same message dicts, built here and
+sent by the auctions outbox relay (apps/auctions/outbox.py) once the
+change has committed:
+- AuctionConsumer forwards them to its WebSocket
+- The SSE stream (sse.py) encodes them as Server-Sent Events
+
+MESSAGES:
+- bid_placed: {'type', 'event_id', 'bid': {...}, 'auction': {'id', 'current_price'}}
+- auction_updated: {'type', 'event_id', 'auction': {'id', 'title',
+  'status', 'current_price', 'start_time', 'end_time'}}, on edits and
+  cancellation
+- auction_closed: {'type', 'event_id', 'auction': {'id', 'status',
+  'final_price', 'winner_id', 'reserve_met'}}
+
+Relayed messages also carry `frame`: the message itself, JSON-encoded
+once by with_frame(), which WebSocket and SSE listeners send as is
+instead of encoding it per connection.
+"""
+
+import json
+
+
+def auction_group(auction_id):
+    """Channel-layer group of an auction's listeners"""
+    return f'auction_{auction_id}'
+
+
+def auction_status(auction):
+    """Snapshot sent to a listener when it connects"""
+    return {
+        'id': auction.id,
+        'title': auction.title,
+        'current_price': str(auction.current_price),
+        'status': auction.status,
+        'is_active': auction.is_active,
+        'end_time': auction.end_time.isoformat(),
+        'total_bids': auction.total_bids,
+    }
+
+
+def with_frame(message):
+    """The message plus its pre-encoded JSON `frame`"""
+    return {**message, 'frame': json.dumps(message, separators=(',', ':'))}
+
+
+def bid_placed_event(bid):
+    """bid_placed message (bid.bidder and bid.auction are read)"""
+    return {
+        'type': 'bid_placed',
+        'bid': {
+            'id': bid.id,
+            'amount': str(bid.amount),
+            'bidder': bid.bidder.username,
+            'created_at': bid.created_at.isoformat(),
+        },
+        'auction': {
+            'id': bid.auction.id,
+            'current_price': str(bid.auction.current_price),
+        }
+    }
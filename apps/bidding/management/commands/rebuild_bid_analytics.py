@@ -0,0 +1,37 @@
+"""
+Rebuild the per-auction bid rollups from the bids table
+
+Usage:
+    python manage.py rebuild_bid_analytics
+    python manage.py rebuild_bid_analytics --auction 12 --auction 15
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.auctions.models import Auction
+from apps.bidding.analytics import rebuild_auction_analytics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-auction bid analytics from the bids table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--auction',
+            action='append',
+            type=int,
+            dest='auction_ids',
+            help='Only rebuild the given auction (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        auctions = Auction.objects.all().order_by('id')
+        if options['auction_ids']:
+            auctions = auctions.filter(id__in=options['auction_ids'])
+
+        count = 0
+        for auction in auctions.iterator(chunk_size=500):
+            rebuild_auction_analytics(auction)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt analytics for {count} auctions"))
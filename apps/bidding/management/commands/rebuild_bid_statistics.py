@@ -0,0 +1,51 @@
+"""
+Backfill / repair the per-user bidding statistics
+
+Usage:
+    python manage.py rebuild_bid_statistics
+    python manage.py rebuild_bid_statistics --user 7 --user 9
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.bidding.analytics import rebuild_user_statistics
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user bidding statistics from bids and closed auctions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            type=int,
+            dest='user_ids',
+            help='Only rebuild the given user (can be repeated)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of users rebuilt per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id').values_list('id', flat=True)
+        if options['user_ids']:
+            users = users.filter(id__in=options['user_ids'])
+
+        chunk_size = options['chunk_size']
+        written = 0
+        batch = []
+        for user_id in users.iterator(chunk_size=chunk_size):
+            batch.append(user_id)
+            if len(batch) >= chunk_size:
+                written += rebuild_user_statistics(batch)
+                batch = []
+        if batch:
+            written += rebuild_user_statistics(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {written} users"))
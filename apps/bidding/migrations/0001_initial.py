@@ -0,0 +1,51 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:05
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auctions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionBidAnalytics',
+            fields=[
+                ('auction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='bid_analytics', serialize=False, to='auctions.auction')),
+                ('total_bids', models.PositiveIntegerField(default=0)),
+                ('bid_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('lowest_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('highest_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('unique_bidders', models.PositiveIntegerField(default=0)),
+                ('recent_bids', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'auction_bid_analytics',
+            },
+        ),
+        migrations.CreateModel(
+            name='AuctionParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('highest_bid', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('first_bid_at', models.DateTimeField()),
+                ('last_bid_at', models.DateTimeField()),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='auctions.auction')),
+                ('bidder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auction_participations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'auction_participants',
+                'constraints': [models.UniqueConstraint(fields=('auction', 'bidder'), name='unique_auction_participant')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:05
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bidding', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserBidStatistics',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='bid_statistics', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_bids', models.PositiveIntegerField(default=0)),
+                ('bid_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('highest_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('unique_auctions', models.PositiveIntegerField(default=0)),
+                ('auctions_won', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_bid_statistics',
+            },
+        ),
+    ]
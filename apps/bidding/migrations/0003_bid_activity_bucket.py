@@ -0,0 +1,35 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0002_bid_created_at_index'),
+        ('bidding', '0002_user_bid_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BidActivityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('unique_bidders', models.PositiveIntegerField(default=0)),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('max_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('last_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('auction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_buckets', to='auctions.auction')),
+            ],
+            options={
+                'db_table': 'bid_activity_buckets',
+                'ordering': ['bucket_start'],
+                'indexes': [models.Index(fields=['resolution', 'bucket_start'], name='bid_activit_resolut_bfe377_idx')],
+                'constraints': [models.UniqueConstraint(fields=('auction', 'resolution', 'bucket_start'), name='unique_auction_activity_bucket'), models.UniqueConstraint(condition=models.Q(('auction__isnull', True)), fields=('resolution', 'bucket_start'), name='unique_global_activity_bucket')],
+            },
+        ),
+    ]
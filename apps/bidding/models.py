@@ -1,3 +1,208 @@
+"""
+Bidding Models
+==============
+Rollup tables maintained incrementally from accepted bids
+
+WHY ROLLUPS:
+- Analytics endpoints used to aggregate over every bid on each request
+- These tables are updated once per accepted bid (see signals.py)
+- Reads become a single primary-key lookup regardless of bid volume
+- analytics.py can rebuild them from the bids table at any time
+- BidActivityBucket is filled by a periodic compaction task (activity.py)
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class AuctionBidAnalytics(models.Model):
+    """
+    Per-auction bid rollup
+    One row per auction that has received at least one bid
+    """
+
+    # Number of bid snapshots kept in recent_bids
+    RECENT_BIDS_LIMIT = 5
+
+    auction = models.OneToOneField(
+        'auctions.Auction',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='bid_analytics'
+    )
+
+    total_bids = models.PositiveIntegerField(default=0)
+    bid_sum = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    lowest_bid = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    highest_bid = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    unique_bidders = models.PositiveIntegerField(default=0)
+
+    # Serialized bids (newest first), same shape as BidSerializer output
+    recent_bids = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'auction_bid_analytics'
+
+    def __str__(self):
+        return f"Analytics for auction {self.auction_id}"
+
+    @property
+    def average_bid(self):
+        """Average bid amount, or None when there are no bids"""
+        if not self.total_bids:
+            return None
+        return self.bid_sum / self.total_bids
+
+
+class AuctionParticipant(models.Model):
+    """
+    One row per (auction, bidder) pair
+
+    Lets us tell whether an accepted bid comes from a new bidder
+    without scanning the bids table
+    """
+
+    auction = models.ForeignKey(
+        'auctions.Auction',
+        on_delete=models.CASCADE,
+        related_name='participants'
+    )
+    bidder = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='auction_participations'
+    )
+
+    bid_count = models.PositiveIntegerField(default=0)
+    highest_bid = models.DecimalField(max_digits=10, decimal_places=2)
+    first_bid_at = models.DateTimeField()
+    last_bid_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'auction_participants'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['auction', 'bidder'],
+                name='unique_auction_participant'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bidder_id} in auction {self.auction_id}"
+
+
+class UserBidStatistics(models.Model):
+    """
+    Per-user bidding rollup
+    Updated on every accepted bid and when an auction closes with a winner
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='bid_statistics'
+    )
+
+    total_bids = models.PositiveIntegerField(default=0)
+    bid_sum = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    highest_bid = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    unique_auctions = models.PositiveIntegerField(default=0)
+    auctions_won = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'user_bid_statistics'
+
+    def __str__(self):
+        return f"Bid statistics for user {self.user_id}"
+
+    @property
+    def average_bid(self):
+        """Average bid amount, or None when the user has not bid"""
+        if not self.total_bids:
+            return None
+        return self.bid_sum / self.total_bids
+
+
+class BidActivityBucket(models.Model):
+    """
+    Bid activity for one time bucket
+    auction is NULL for the platform-wide bucket
+    """
+
+    RESOLUTION_MINUTE = 'minute'
+    RESOLUTION_HOUR = 'hour'
+    RESOLUTION_CHOICES = [
+        (RESOLUTION_MINUTE, 'Minute'),
+        (RESOLUTION_HOUR, 'Hour'),
+    ]
+
+    auction = models.ForeignKey(
+        'auctions.Auction',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='activity_buckets'
+    )
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+
+    bid_count = models.PositiveIntegerField(default=0)
+    unique_bidders = models.PositiveIntegerField(default=0)
+    # NULL for empty platform-wide minutes
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    last_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+
+    class Meta:
+        db_table = 'bid_activity_buckets'
+        ordering = ['bucket_start']
+        constraints = [
+            # Also serve as the range-query indexes for the activity endpoint
+            models.UniqueConstraint(
+                fields=['auction', 'resolution', 'bucket_start'],
+                name='unique_auction_activity_bucket'
+            ),
+            models.UniqueConstraint(
+                fields=['resolution', 'bucket_start'],
+                condition=models.Q(auction__isnull=True),
+                name='unique_global_activity_bucket'
+            ),
+        ]
+        indexes = [
+            # Retention deletes by age across all auctions
+            models.Index(fields=['resolution', 'bucket_start']),
+        ]
+
+    def __str__(self):
+        scope = f"auction {self.auction_id}" if self.auction_id else "platform"
+        return f"{self.resolution} bucket {self.bucket_start:%Y-%m-%d %H:%M} ({scope})"
@@ -0,0 +1,40 @@
+"""
+Bidding Signals
+===============
+Keep the bid rollup tables in sync with accepted bids
+
+SIGNALS IN THIS FILE:
+- When a bid is created, fold it into the per-auction and per-user rollups
+- When an auction closes, credit the winner's statistics
+- After a bid, pin the bidder to the primary database for a few seconds
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.auctions.models import Bid
+from apps.auctions.signals import auction_closed
+from apps.utils.db_router import pin_to_primary
+from .analytics import record_auction_won, record_bid
+
+
+@receiver(post_save, sender=Bid)
+def update_bid_rollups(sender, instance, created, **kwargs):
+    """
+    Signal: When a new bid is created, update the rollup tables
+
+    Runs inside the same transaction as the bid insert when the caller
+    wraps bid creation in transaction.atomic()
+    """
+    if created:
+        record_bid(instance)
+        # Read-your-writes: the bidder's next reads skip the replica
+        pin_to_primary(instance.bidder_id)
+
+
+@receiver(auction_closed)
+def update_winner_statistics(sender, auction, **kwargs):
+    """
+    Signal: When an auction closes, count the win for its winner
+    """
+    record_auction_won(auction)
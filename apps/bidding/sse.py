@@ -0,0 +1,182 @@
+"""
+Server-Sent Events
+==================
+Push auction updates to clients that can't use WebSockets
+
+HOW IT WORKS:
+- The stream is fed by the auction's channel-layer group, so it carries
+  the same messages AuctionConsumer forwards to WebSockets
+- Each process opens one channel-layer subscription per group
+  (GroupFanout), however many clients stream that auction. Each message
+  is encoded once and the bytes are queued to every local subscriber
+- Every message becomes one frame: `event: <message type>`, `data: <json>`,
+  plus `id: <bid id>` on bid_placed frames
+- A reconnecting client sends Last-Event-ID; the view replays what it
+  missed from the database before the live frames. Replayed ids are not
+  sent twice
+- A comment line every SSE_HEARTBEAT_SECONDS keeps proxies from closing
+  idle streams and lets the server notice dead clients
+- A subscriber whose queue fills up (a slow reader) is disconnected;
+  its client reconnects and resumes from Last-Event-ID
+
+Usage:
+    StreamingHttpResponse(event_stream(group, initial), content_type=EVENT_STREAM)
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM = 'text/event-stream'
+HEARTBEAT = b': heartbeat\n\n'
+# Client reconnect delay (ms) announced at the start of every stream
+RETRY_MS = 3000
+
+# Queued in place of a frame to end a subscriber's stream
+_CLOSE = object()
+
+
+def encode_event(message, event_id=None):
+    """SSE frame of a group message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f"event: {message['type']}")
+    # Relayed messages come pre-encoded (events.with_frame)
+    data = message.get('frame') or json.dumps(message, separators=(',', ':'))
+    lines.append(f"data: {data}")
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def message_event_id(message):
+    """SSE id of a group message (the bid id for bid_placed), else None"""
+    if message['type'] == 'bid_placed':
+        return message['bid']['id']
+    return None
+
+
+class GroupFanout:
+    """One channel-layer subscription to a group, shared by local streams"""
+
+    def __init__(self, group):
+        self.group = group
+        self.subscribers = set()
+        self._task = None
+        self._ready = None
+
+    async def subscribe(self):
+        """
+        Register a subscriber queue
+
+        Returns once the group subscription is live, so nothing sent after
+        this returns can be missed
+        """
+        queue = asyncio.Queue(maxsize=getattr(settings, 'SSE_QUEUE_SIZE', 100))
+        self.subscribers.add(queue)
+        if self._task is None:
+            self._ready = asyncio.get_running_loop().create_future()
+            self._task = asyncio.create_task(self._listen())
+        try:
+            await asyncio.shield(self._ready)
+        except Exception:
+            self.unsubscribe(queue)
+            raise
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _evict(self, queue):
+        """Close a subscriber that fell too far behind"""
+        self.subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_CLOSE)
+        logger.warning(f"Disconnected slow SSE subscriber of {self.group}")
+
+    async def _listen(self):
+        channel_layer = get_channel_layer()
+        try:
+            channel = await channel_layer.new_channel('sse.')
+            await channel_layer.group_add(self.group, channel)
+        except Exception as e:
+            self._ready.set_exception(e)
+            self._task = None
+            return
+        self._ready.set_result(None)
+
+        try:
+            while True:
+                message = await channel_layer.receive(channel)
+                event_id = message_event_id(message)
+                # Encoded once for every subscriber
+                item = (event_id, encode_event(message, event_id))
+                for queue in list(self.subscribers):
+                    try:
+                        queue.put_nowait(item)
+                    except asyncio.QueueFull:
+                        self._evict(queue)
+        finally:
+            await channel_layer.group_discard(self.group, channel)
+
+
+# (event loop, group) -> GroupFanout
+_fanouts = {}
+
+
+@asynccontextmanager
+async def subscribe(group):
+    """Queue of (event_id, frame) items for the group's messages"""
+    key = (asyncio.get_running_loop(), group)
+    fanout = _fanouts.get(key)
+    if fanout is None:
+        fanout = _fanouts[key] = GroupFanout(group)
+    queue = await fanout.subscribe()
+    try:
+        yield queue
+    finally:
+        fanout.unsubscribe(queue)
+        if not fanout.subscribers and _fanouts.get(key) is fanout:
+            del _fanouts[key]
+
+
+async def event_stream(group, initial=None):
+    """
+    Async iterator of SSE bytes for a group, until the client disconnects
+
+    Args:
+        initial: Coroutine function returning (event_id, frame) items to send
+            before the live frames (snapshot or replay); it runs once the
+            subscription is live
+    """
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)
+    async with subscribe(group) as queue:
+        yield f'retry: {RETRY_MS}\n\n'.encode()
+
+        replayed = set()
+        for event_id, frame in (await initial() if initial else []):
+            if event_id is not None:
+                replayed.add(event_id)
+            yield frame
+
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+                continue
+            if item is _CLOSE:
+                return
+            event_id, frame = item
+            if event_id is not None and event_id in replayed:
+                continue
+            yield frame
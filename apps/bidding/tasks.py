@@ -0,0 +1,34 @@
+"""
+Celery Tasks
+============
+Background tasks for bidding rollups
+
+TASKS IN THIS FILE:
+1. compact_bid_activity - Periodic task (runs every minute)
+2. prune_bid_activity - Periodic task (runs every hour)
+"""
+
+from celery import shared_task
+
+from . import activity
+
+
+@shared_task
+def compact_bid_activity():
+    """
+    Roll elapsed minutes of bids into activity buckets
+
+    Safe to run concurrently with bidding: only fully elapsed minutes are
+    aggregated, and each window is rewritten idempotently
+    """
+    count = activity.compact_bid_activity()
+    return f"Wrote {count} minute activity buckets."
+
+
+@shared_task
+def prune_bid_activity():
+    """
+    Apply the activity bucket retention policy
+    """
+    count = activity.prune_bid_activity()
+    return f"Pruned {count} activity buckets."
@@ -1,3 +1,461 @@
-from django.test import TestCase
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from channels.layers import get_channel_layer
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.auctions.models import ArchivedBid, Auction, Bid
+from apps.auctions.services import close_auction, place_bid
+from apps.users.models import User
+from apps.utils import ratelimit, streaming
+from . import sse
+from .activity import HOUR, MINUTE, compact_bid_activity, floor_time, prune_bid_activity
+from .analytics import rebuild_auction_analytics, rebuild_user_statistics
+from .consumers import AuctionConsumer
+from .events import auction_group, with_frame
+from .models import AuctionBidAnalytics, BidActivityBucket, UserBidStatistics
+from .views import BidActivityAPIView
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+class BidHistoryExportTests(TestCase):
+    """GET /api/v1/bidding/history/export/"""
+
+    url = '/api/v1/bidding/history/export/'
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        cls.auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        start = timezone.now() - timedelta(days=1)
+        # Archived bids interleave with hot ones in time
+        for i in range(6):
+            created_at = start + timedelta(minutes=i)
+            if i % 2:
+                ArchivedBid.objects.create(
+                    id=1000 + i, auction=cls.auction, bidder=cls.bidder,
+                    amount=11 + i, created_at=created_at,
+                )
+            else:
+                bid = Bid.objects.create(auction=cls.auction, bidder=cls.bidder, amount=11 + i)
+                Bid.objects.filter(pk=bid.pk).update(created_at=created_at)
+
+    def export(self, url=None, user=None, **params):
+        client = APIClient()
+        client.force_authenticate(user or self.bidder)
+        response = client.get(url or self.url, params)
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_merges_hot_and_archived_bids_in_order(self):
+        rows = self.export()
+        self.assertEqual([row['amount'] for row in rows], [f'{11 + i}.00' for i in range(6)])
+
+    def test_resumes_after_cursor(self):
+        rows = self.export()
+        cursor = f"{rows[2]['created_at']},{rows[2]['id']}"
+        self.assertEqual(self.export(after=cursor), rows[3:])
+
+    def test_auction_and_staff_exports_merge_both_tiers(self):
+        staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        history = self.export()
+        for url in (f'/api/v1/auctions/{self.auction.id}/bids/export/', '/api/v1/bidding/export/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.export(url, staff), history)
+
+    async def test_streams_chunks_lazily_under_asgi(self):
+        """Rows are pulled chunk by chunk, not read whole before the first byte"""
+        token = AccessToken.for_user(self.bidder)
+        original = streaming.ROWS_PER_CHUNK
+        streaming.ROWS_PER_CHUNK = 2
+        try:
+            response = await AsyncClient().get(
+                self.url, headers={'Authorization': f'Bearer {token}'}
+            )
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        finally:
+            streaming.ROWS_PER_CHUNK = original
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b''.join(chunks).count(b'\n'), 6)
+
+
+@override_settings(BID_RATE_LIMITS={'auction': {'burst': 2, 'per_second': 0.001}})
+class PlaceBidRateLimitTests(TestCase):
+    """POST /api/v1/bidding/place-bid/ rate limiting"""
+
+    url = '/api/v1/bidding/place-bid/'
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        cls.auction = Auction.objects.create(
+            title='Lamp', description='Brass', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        # A fresh in-memory bucket store per test
+        patcher = mock.patch.object(ratelimit, '_store', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def bid(self, auction_id, amount):
+        token = AccessToken.for_user(self.bidder)
+        return await AsyncClient().post(
+            self.url, {'auction_id': auction_id, 'amount': amount},
+            content_type='application/json', headers={'Authorization': f'Bearer {token}'},
+        )
+
+    async def test_id_spellings_share_the_auction_bucket(self):
+        pk = self.auction.pk
+        self.assertEqual((await self.bid(str(pk), '20')).status_code, 201)
+        self.assertEqual((await self.bid(f'0{pk}', '30')).status_code, 201)
+        response = await self.bid(pk, '40')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['scope'], 'auction')
+
+    async def test_rejects_invalid_auction_id(self):
+        for auction_id in ('5x', '-5', '5.0', 5.5, True):
+            with self.subTest(auction_id=auction_id):
+                response = await self.bid(auction_id, '20')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Invalid auction_id'})
+
+
+class BidActivityTests(TestCase):
+    """GET /api/v1/bidding/activity/"""
+
+    url = '/api/v1/bidding/activity/'
+
+    def test_refuses_ranges_over_the_bucket_cap(self):
+        end = timezone.now()
+        cap = BidActivityAPIView.MAX_BUCKETS
+        client = APIClient()
+
+        response = client.get(self.url, {
+            'start': (end - timedelta(minutes=cap)).isoformat(), 'end': end.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+
+        for resolution, width in (('minute', timedelta(minutes=1)), ('hour', timedelta(hours=1))):
+            with self.subTest(resolution=resolution):
+                response = client.get(self.url, {
+                    'resolution': resolution,
+                    'start': (end - width * (cap + 1)).isoformat(),
+                    'end': end.isoformat(),
+                })
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(f'{cap + 1} {resolution} buckets', response.json()['error'])
+
+
+@override_settings(BID_ACTIVITY_COMPACTION_LAG_SECONDS=60, BID_ACTIVITY_MAX_LOOKBACK_HOURS=2)
+class BidActivityCompactionTests(TestCase):
+    """activity.compact_bid_activity and prune_bid_activity"""
+
+    def setUp(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        self.lamp = Auction.objects.create(
+            title='Lamp', description='Lot', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        self.hour = floor_time(timezone.now(), HOUR) - timedelta(days=1)
+
+    def bid(self, bidder, amount, created_at):
+        bid = place_bid(self.lamp.id, bidder, Decimal(amount))
+        Bid.objects.filter(pk=bid.pk).update(created_at=created_at)
+
+    def bucket(self, resolution, bucket_start, auction=None):
+        return BidActivityBucket.objects.get(
+            resolution=resolution, bucket_start=bucket_start, auction=auction,
+        )
+
+    def test_compacts_minutes_for_the_auction_and_platform(self):
+        minute = self.hour + timedelta(minutes=10)
+        self.bid(self.alice, 20, minute + timedelta(seconds=5))
+        self.bid(self.bob, 25, minute + timedelta(seconds=40))
+
+        compact_bid_activity(now=minute + timedelta(minutes=2))
+
+        for auction in (self.lamp, None):
+            with self.subTest(auction=auction):
+                bucket = self.bucket(MINUTE, minute, auction)
+                self.assertEqual(
+                    [bucket.bid_count, bucket.unique_bidders, bucket.min_price,
+                     bucket.max_price, bucket.last_price],
+                    [2, 2, Decimal('20'), Decimal('25'), Decimal('25')],
+                )
+        # Empty platform-wide minutes are filled; the next minute waits for the lag
+        self.assertEqual(self.bucket(MINUTE, minute - timedelta(minutes=1)).bid_count, 0)
+        self.assertFalse(BidActivityBucket.objects.filter(
+            resolution=MINUTE, bucket_start=minute + timedelta(minutes=1),
+        ).exists())
+
+    def test_waits_for_late_commits_before_compacting_a_minute(self):
+        minute = self.hour + timedelta(minutes=10)
+
+        # 10 seconds after the minute ends it is not compacted yet
+        compact_bid_activity(now=minute + timedelta(seconds=70))
+        self.assertFalse(
+            BidActivityBucket.objects.filter(resolution=MINUTE, bucket_start=minute).exists()
+        )
+
+        # A bid of that minute whose transaction commits late
+        self.bid(self.alice, 20, minute + timedelta(seconds=55))
+        compact_bid_activity(now=minute + timedelta(seconds=130))
+
+        self.assertEqual(self.bucket(MINUTE, minute, self.lamp).bid_count, 1)
+        self.assertEqual(self.bucket(MINUTE, minute).bid_count, 1)
+
+    def test_rolls_an_elapsed_hour_up_from_the_bids(self):
+        self.bid(self.alice, 20, self.hour + timedelta(minutes=10))
+        self.bid(self.bob, 25, self.hour + timedelta(minutes=50))
+        self.bid(self.alice, 30, self.hour + timedelta(minutes=59, seconds=30))
+
+        # Still inside the lag: the hour is not rolled up
+        compact_bid_activity(now=self.hour + timedelta(minutes=60, seconds=30))
+        self.assertFalse(BidActivityBucket.objects.filter(resolution=HOUR).exists())
+
+        compact_bid_activity(now=self.hour + timedelta(minutes=61, seconds=30))
+        for auction in (self.lamp, None):
+            with self.subTest(auction=auction):
+                bucket = self.bucket(HOUR, self.hour, auction)
+                self.assertEqual(
+                    [bucket.bid_count, bucket.unique_bidders, bucket.min_price,
+                     bucket.max_price, bucket.last_price],
+                    [3, 2, Decimal('20'), Decimal('30'), Decimal('30')],
+                )
+
+    @override_settings(BID_ACTIVITY_MINUTE_RETENTION_DAYS=2, BID_ACTIVITY_HOUR_RETENTION_DAYS=90)
+    def test_prunes_minutes_before_hours(self):
+        now = timezone.now()
+        for resolution, age in [
+            (MINUTE, timedelta(days=3)),
+            (MINUTE, timedelta(days=1)),
+            (HOUR, timedelta(days=91)),
+            (HOUR, timedelta(days=3)),
+        ]:
+            BidActivityBucket.objects.create(
+                auction=self.lamp, resolution=resolution,
+                bucket_start=floor_time(now - age, resolution),
+            )
+
+        self.assertEqual(prune_bid_activity(now=now), 2)
+
+        remaining = BidActivityBucket.objects.order_by('resolution', 'bucket_start')
+        self.assertEqual(
+            [(bucket.resolution, bucket.bucket_start) for bucket in remaining],
+            [
+                (HOUR, floor_time(now - timedelta(days=3), HOUR)),
+                (MINUTE, floor_time(now - timedelta(days=1), MINUTE)),
+            ],
+        )
+
+
+class AuctionConsumerRefusalTests(SimpleTestCase):
+    """Bids on an auction the consumer knows has ended never reach the database"""
+
+    def consumer(self):
+        consumer = AuctionConsumer()
+        consumer.auction_id = 1
+        consumer.user = mock.Mock(is_authenticated=True, id=1)
+        consumer.auction_state = 'active'
+        consumer.end_time = timezone.now() + timedelta(hours=1)
+        consumer.frames = []
+
+        async def send(text_data):
+            consumer.frames.append(json.loads(text_data))
+
+        consumer.send = send
+        return consumer
+
+    async def assert_refused(self, consumer):
+        # SimpleTestCase also fails any query
+        with mock.patch.object(AuctionConsumer, 'create_bid') as create_bid, \
+                mock.patch('apps.bidding.consumers.acheck_bid_rate') as check_rate:
+            await consumer.receive(json.dumps({'type': 'place_bid', 'amount': 50}))
+        create_bid.assert_not_called()
+        check_rate.assert_not_called()
+        self.assertEqual(consumer.frames[-1], {'type': 'error', 'message': 'Auction is not active'})
+
+    async def test_refuses_bids_after_auction_closed(self):
+        consumer = self.consumer()
+        await consumer.auction_closed({
+            'auction': {'id': 1, 'status': 'closed'},
+            'frame': json.dumps({'type': 'auction_closed'}),
+        })
+        await self.assert_refused(consumer)
+
+    async def test_refuses_bids_past_end_time(self):
+        consumer = self.consumer()
+        await consumer.auction_updated({
+            'auction': {'id': 1, 'status': 'active', 'end_time': timezone.now().isoformat()},
+            'frame': json.dumps({'type': 'auction_updated'}),
+        })
+        await self.assert_refused(consumer)
+
+
+def parse_frame(chunk):
+    """{field: value} of one SSE frame"""
+    fields = {}
+    for line in chunk.decode().strip().splitlines():
+        name, _, value = line.partition(': ')
+        fields[name] = value
+    return fields
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, SSE_HEARTBEAT_SECONDS=60)
+class AuctionEventStreamTests(TestCase):
+    """GET /api/v1/bidding/auction/{id}/events/"""
+
+    def setUp(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        bidder = User.objects.create_user('bidder', 'bidder@example.com', 'pw')
+        self.auction = Auction.objects.create(
+            title='Lamp', description='Lot', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        self.bids = [place_bid(self.auction.id, bidder, Decimal(amount)) for amount in (20, 25, 30)]
+        self.url = f'/api/v1/bidding/auction/{self.auction.id}/events/'
+
+    @asynccontextmanager
+    async def open_stream(self, **headers):
+        response = await AsyncClient().get(self.url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+            yield stream
+        finally:
+            # Disconnect as the ASGI handler does: cancel the pending read
+            read = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            read.cancel()
+            with suppress(asyncio.CancelledError):
+                await read
+        self.assertEqual(sse._fanouts, {})
+
+    async def test_new_stream_starts_with_a_snapshot(self):
+        async with self.open_stream() as stream:
+            frame = parse_frame(await anext(stream))
+            self.assertEqual(frame['event'], 'auction_status')
+            self.assertNotIn('id', frame)
+            snapshot = json.loads(frame['data'])['auction']
+            self.assertEqual((snapshot['current_price'], snapshot['total_bids']), ('30.00', 3))
+
+    async def test_replays_missed_bids_then_streams_live_ones(self):
+        first, second, third = self.bids
+        async with self.open_stream(**{'Last-Event-ID': str(first.id)}) as stream:
+            for bid in (second, third):
+                frame = parse_frame(await anext(stream))
+                self.assertEqual((frame['id'], frame['event']), (str(bid.id), 'bid_placed'))
+                self.assertEqual(Decimal(json.loads(frame['data'])['bid']['amount']), bid.amount)
+
+            # A replayed bid relayed live as well is not sent twice
+            layer = get_channel_layer()
+            for bid_id in (third.id, third.id + 1):
+                await layer.group_send(auction_group(self.auction.id), with_frame({
+                    'type': 'bid_placed', 'bid': {'id': bid_id}, 'auction': {'id': self.auction.id},
+                }))
+            frame = parse_frame(await anext(stream))
+            self.assertEqual(frame['id'], str(third.id + 1))
+
+    @override_settings(SSE_REPLAY_LIMIT=1)
+    async def test_resyncs_when_too_many_bids_were_missed(self):
+        async with self.open_stream(**{'Last-Event-ID': str(self.bids[0].id)}) as stream:
+            frame = parse_frame(await anext(stream))
+            self.assertEqual(frame['event'], 'resync')
+            self.assertEqual(json.loads(frame['data'])['auction']['current_price'], '30.00')
+
+    @override_settings(SSE_HEARTBEAT_SECONDS=0.01)
+    async def test_sends_heartbeat_comments_when_idle(self):
+        async with self.open_stream() as stream:
+            await anext(stream)  # Snapshot
+
+            self.assertEqual(await anext(stream), b': heartbeat\n\n')
+            self.assertEqual(await anext(stream), b': heartbeat\n\n')
+
+    async def test_unknown_auction_is_404(self):
+        response = await AsyncClient().get('/api/v1/bidding/auction/999999/events/')
+        self.assertEqual(response.status_code, 404)
+
+
+class BidRollupFixture:
+    """Two bidders on two auctions; the lamp is closed (alice wins)"""
+
+    def setUp(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        self.lamp, self.vase = [
+            Auction.objects.create(
+                title=title, description='Lot', starting_price=10, current_price=10,
+                owner=owner, end_time=timezone.now() + timedelta(hours=1),
+            )
+            for title in ('Lamp', 'Vase')
+        ]
+        for auction, bidder, amount in [
+            (self.lamp, self.alice, 20),
+            (self.lamp, self.bob, 25),
+            (self.lamp, self.alice, 30),
+            (self.vase, self.alice, 15),
+        ]:
+            place_bid(auction.id, bidder, Decimal(amount))
+        close_auction(self.lamp.id)
+
+    def values(self, queryset, fields):
+        return list(queryset.order_by('pk').values(*fields))
+
+
+class AuctionBidAnalyticsTests(BidRollupFixture, TestCase):
+    """AuctionBidAnalytics, kept up to date per bid"""
+
+    FIELDS = ['total_bids', 'bid_sum', 'lowest_bid', 'highest_bid', 'unique_bidders']
+
+    def test_follows_bids(self):
+        lamp = AuctionBidAnalytics.objects.get(auction=self.lamp)
+        self.assertEqual(
+            [lamp.total_bids, lamp.bid_sum, lamp.lowest_bid, lamp.highest_bid, lamp.unique_bidders],
+            [3, Decimal('75'), Decimal('20'), Decimal('30'), 2],
+        )
+        self.assertEqual([bid['amount'] for bid in lamp.recent_bids], ['30.00', '25.00', '20.00'])
+
+    def test_matches_a_rebuild(self):
+        analytics = self.values(AuctionBidAnalytics.objects, self.FIELDS)
+        for auction in (self.lamp, self.vase):
+            rebuild_auction_analytics(auction)
+        self.assertEqual(self.values(AuctionBidAnalytics.objects, self.FIELDS), analytics)
+
+
+class UserBidStatisticsTests(BidRollupFixture, TestCase):
+    """UserBidStatistics, kept up to date per bid and win"""
+
+    FIELDS = ['user_id', 'total_bids', 'bid_sum', 'highest_bid', 'unique_auctions', 'auctions_won']
+
+    def test_follows_bids_and_wins(self):
+        alice = UserBidStatistics.objects.get(user=self.alice)
+        self.assertEqual(
+            [alice.total_bids, alice.bid_sum, alice.highest_bid, alice.unique_auctions, alice.auctions_won],
+            [3, Decimal('65'), Decimal('30'), 2, 1],
+        )
+        self.assertEqual(UserBidStatistics.objects.get(user=self.bob).auctions_won, 0)
+
+    def test_matches_a_rebuild(self):
+        statistics = self.values(UserBidStatistics.objects, self.FIELDS)
+        rebuild_user_statistics([self.alice.id, self.bob.id])
+        self.assertEqual(self.values(UserBidStatistics.objects, self.FIELDS), statistics)
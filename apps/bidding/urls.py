@@ -15,7 +15,7 @@ urlpatterns = [
     # Place bid via REST API (alternative to WebSocket)
     path(
         'place-bid/',
-        views.PlaceBidAPIView.as_view(),
+        views.PlaceBidAsyncAPIView.as_view(),
         name='place-bid'
     ),
     
@@ -26,6 +26,18 @@ urlpatterns = [
         name='bid-history'
     ),
     
+    # Streaming exports (NDJSON/CSV, resumable, optional gzip)
+    path(
+        'history/export/',
+        views.BidHistoryExportAPIView.as_view(),
+        name='bid-history-export'
+    ),
+    path(
+        'export/',
+        views.BidExportAPIView.as_view(),
+        name='bid-export'
+    ),
+    
     # User's bidding statistics
     path(
         'statistics/',
@@ -39,4 +51,30 @@ urlpatterns = [
         views.AuctionBidAnalyticsAPIView.as_view(),
         name='auction-analytics'
     ),
+    
+    # Time-bucketed bid activity (platform-wide and per auction)
+    path(
+        'activity/',
+        views.BidActivityAPIView.as_view(),
+        name='bid-activity'
+    ),
+    path(
+        'auction/<int:pk>/activity/',
+        views.BidActivityAPIView.as_view(),
+        name='auction-activity'
+    ),
+    
+    # Server-Sent Events stream for clients without WebSockets
+    path(
+        'auction/<int:pk>/events/',
+        views.AuctionEventStreamAPIView.as_view(),
+        name='auction-events'
+    ),
+    
+    # WebSocket database pool metrics (staff only)
+    path(
+        'executors/',
+        views.ExecutorMetricsAPIView.as_view(),
+        name='executor-metrics'
+    ),
 ]
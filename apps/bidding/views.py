@@ -1,6 +1,3 @@
-from django.shortcuts import render
-
-# Create your views here.
 """
 Bidding Views
 =============
@@ -13,36 +10,81 @@ These views provide REST endpoints for bid history and statistics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from rest_framework.pagination import PageNumberPagination
-from django.shortcuts import get_object_or_404
-from django.db.models import Count, Max, Avg
-from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+import math
 
-from apps.auctions.models import Auction, Bid
+from apps.auctions.archive import user_bid_history
+from apps.auctions.models import ArchivedBid, Auction, Bid
+from apps.auctions.services import BidRejected, place_bid
 from apps.auctions.serializers import BidSerializer
+from apps.auctions.views import BaseBidExportAPIView
+from apps.utils.counting import CountingPageNumberPagination
+from apps.utils.executors import executor_metrics
+from apps.utils.ratelimit import RateLimited, acheck_bid_rate
+from apps.utils.views import AsyncAPIView, ReplicaReadMixin
+from .events import auction_group, auction_status, bid_placed_event
+from .sse import EVENT_STREAM, encode_event, event_stream
+from .models import AuctionBidAnalytics, BidActivityBucket, UserBidStatistics
+
+
+def rate_limited_response(error):
+    """429 with the limit that was hit and when to retry"""
+    return Response(
+        {
+            'error': 'Too many bids, please slow down',
+            'code': 'rate_limited',
+            'scope': error.scope,
+            'retry_after': error.retry_after,
+        },
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': error.retry_after_header}
+    )
+
 
+def bid_placed_response(bid, auction):
+    serializer = BidSerializer(bid)
+    return Response(
+        {
+            'message': 'Bid placed successfully',
+            'bid': serializer.data,
+            'auction': {
+                'id': auction.id,
+                'current_price': str(auction.current_price),
+            }
+        },
+        status=status.HTTP_201_CREATED
+    )
 
-class PlaceBidAPIView(APIView):
+
+class PlaceBidAsyncAPIView(AsyncAPIView):
     """
     POST /api/bidding/place-bid/ - Place a bid via REST (alternative to WebSocket)
     
-    This is a REST alternative to WebSocket bidding.
-    WebSocket is preferred for real-time updates, but this can be used
-    for clients that don't support WebSocket.
+    For clients that don't support WebSocket. Authentication uses the
+    async ORM; only place_bid (the locked validation and insert, whose
+    signals update the price and rollups in the same transaction) runs in
+    a worker thread. The outbox relay pushes the bid to the auction's
+    WebSocket and SSE listeners.
+    
+    Required fields:
+    - auction_id: ID of the auction
+    - amount: Bid amount (must be higher than current price)
     """
     
     permission_classes = [permissions.IsAuthenticated]
     
-    def post(self, request):
-        """
-        Place a bid on an auction
-        
-        Required fields:
-        - auction_id: ID of the auction
-        - amount: Bid amount (must be higher than current price)
-        """
-        auction_id = request.data.get('auction_id')
-        amount = request.data.get('amount')
+    async def post(self, request):
+        data = self.parse_body(request)
+        auction_id = data.get('auction_id')
+        amount = data.get('amount')
         
         if not auction_id or not amount:
             return Response(
@@ -50,81 +92,61 @@ class PlaceBidAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            amount = Decimal(str(amount))
-        except (ValueError, TypeError):
+        # "5", "05" and 5 are the same auction, and share its rate-limit bucket
+        auction_id = str(auction_id).strip()
+        if not auction_id.isdecimal():
             return Response(
-                {'error': 'Invalid amount format'},
+                {'error': 'Invalid auction_id'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        auction_id = int(auction_id)
         
-        # Get auction
-        auction = get_object_or_404(Auction, pk=auction_id)
-        
-        # Validate auction is active
-        if not auction.is_active:
-            return Response(
-                {'error': 'Auction is not active'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Validate bid amount
-        if amount <= auction.current_price:
+        try:
+            amount = Decimal(str(amount))
+        except (ValueError, TypeError, InvalidOperation):
             return Response(
-                {'error': f'Bid must be higher than current price (${auction.current_price})'},
+                {'error': 'Invalid amount format'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate user is not the owner
-        if auction.owner == request.user:
-            return Response(
-                {'error': 'You cannot bid on your own auction'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        # Throttle before touching the database
+        try:
+            await acheck_bid_rate(request.user.id, request.META.get('REMOTE_ADDR'), auction_id)
+        except RateLimited as e:
+            return rate_limited_response(e)
         
-        # Create bid
-        bid = Bid.objects.create(
-            auction=auction,
-            bidder=request.user,
-            amount=amount
-        )
+        try:
+            bid = await sync_to_async(place_bid)(auction_id, request.user, amount)
+        except Auction.DoesNotExist:
+            raise Http404
+        except BidRejected as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = BidSerializer(bid)
-        return Response(
-            {
-                'message': 'Bid placed successfully',
-                'bid': serializer.data,
-                'auction': {
-                    'id': auction.id,
-                    'current_price': str(auction.current_price),
-                }
-            },
-            status=status.HTTP_201_CREATED
-        )
+        return bid_placed_response(bid, bid.auction)
 
 
-class BidHistoryAPIView(APIView):
+class BidHistoryAPIView(ReplicaReadMixin, APIView):
     """
     GET /api/bidding/history/ - Get user's bid history
     """
     
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = PageNumberPagination
+    pagination_class = CountingPageNumberPagination
     
     def get(self, request):
         """
         Get all bids placed by the authenticated user
         with auction details
         """
-        bids = Bid.objects.filter(
-            bidder=request.user
-        ).select_related('auction', 'auction__owner').order_by('-created_at')
+        # Hot and archived bids combined
+        bids = user_bid_history(request.user)
         
         # Pagination
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(bids, request)
         
         if page is not None:
+            prefetch_related_objects(page, 'bidder')
             serializer = BidSerializer(page, many=True)
             return paginator.get_paginated_response(serializer.data)
         
@@ -132,7 +154,32 @@ class BidHistoryAPIView(APIView):
         return Response(serializer.data)
 
 
-class BidStatisticsAPIView(APIView):
+class BidHistoryExportAPIView(BaseBidExportAPIView):
+    """
+    GET /api/bidding/history/export/ - Stream the current user's full bid history
+    
+    Supports the since/until/after/output/gzip params of BaseBidExportAPIView
+    """
+    
+    filename = 'my-bids'
+    querysets = (Bid.objects.all(), ArchivedBid.objects.all())
+    
+    def get_querysets(self, request):
+        return [queryset.filter(bidder=request.user) for queryset in super().get_querysets(request)]
+
+
+class BidExportAPIView(BaseBidExportAPIView):
+    """
+    GET /api/bidding/export/ - Stream all bids in a time range (staff only)
+    
+    Intended for reconciliation jobs: page with ?after= instead of OFFSET
+    """
+    
+    permission_classes = [permissions.IsAdminUser]
+    querysets = (Bid.objects.all(), ArchivedBid.objects.all())
+
+
+class BidStatisticsAPIView(ReplicaReadMixin, APIView):
     """
     GET /api/bidding/statistics/ - Get bidding statistics for current user
     """
@@ -142,35 +189,24 @@ class BidStatisticsAPIView(APIView):
     def get(self, request):
         """
         Get statistics about user's bidding activity
+        Served from the UserBidStatistics rollup (single primary-key read)
         """
-        user_bids = Bid.objects.filter(bidder=request.user)
+        stats = UserBidStatistics.objects.filter(user=request.user).first()
+        if stats is None:
+            stats = UserBidStatistics(user=request.user)
         
-        # Calculate statistics
-        stats = user_bids.aggregate(
-            total_bids=Count('id'),
-            highest_bid=Max('amount'),
-            average_bid=Avg('amount'),
-        )
-        
-        # Count auctions won
-        auctions_won = Auction.objects.filter(
-            winner=request.user,
-            status='closed'
-        ).count()
-        
-        # Get unique auctions user has bid on
-        unique_auctions = user_bids.values('auction').distinct().count()
+        average_bid = stats.average_bid
         
         return Response({
-            'total_bids': stats['total_bids'] or 0,
-            'highest_bid': str(stats['highest_bid']) if stats['highest_bid'] else '0.00',
-            'average_bid': str(round(stats['average_bid'], 2)) if stats['average_bid'] else '0.00',
-            'auctions_won': auctions_won,
-            'unique_auctions_bid_on': unique_auctions,
+            'total_bids': stats.total_bids,
+            'highest_bid': str(stats.highest_bid) if stats.highest_bid else '0.00',
+            'average_bid': str(round(average_bid, 2)) if average_bid else '0.00',
+            'auctions_won': stats.auctions_won,
+            'unique_auctions_bid_on': stats.unique_auctions,
         })
 
 
-class AuctionBidAnalyticsAPIView(APIView):
+class AuctionBidAnalyticsAPIView(ReplicaReadMixin, APIView):
     """
     GET /api/bidding/auction/{id}/analytics/ - Get bid analytics for specific auction
     """
@@ -180,26 +216,22 @@ class AuctionBidAnalyticsAPIView(APIView):
     def get(self, request, pk):
         """
         Get bid analytics for a specific auction
-        Shows bid distribution, average bid, etc.
+        Served from the AuctionBidAnalytics rollup (single primary-key read)
         """
-        auction = get_object_or_404(Auction, pk=pk)
-        
-        bids = auction.bids.all()
-        
-        # Calculate analytics
-        analytics = bids.aggregate(
-            total_bids=Count('id'),
-            highest_bid=Max('amount'),
-            lowest_bid=Max('amount'),  # First bid is typically lowest
-            average_bid=Avg('amount'),
+        analytics = (
+            AuctionBidAnalytics.objects
+            .select_related('auction')
+            .filter(auction_id=pk)
+            .first()
         )
         
-        # Count unique bidders
-        unique_bidders = bids.values('bidder').distinct().count()
+        if analytics is None:
+            # No bids yet, so there is no rollup row
+            auction = get_object_or_404(Auction, pk=pk)
+            analytics = AuctionBidAnalytics(auction=auction)
         
-        # Get bid progression (last 5 bids)
-        recent_bids = bids.order_by('-created_at')[:5]
-        recent_bids_data = BidSerializer(recent_bids, many=True).data
+        auction = analytics.auction
+        average_bid = analytics.average_bid
         
         return Response({
             'auction_id': auction.id,
@@ -207,10 +239,180 @@ class AuctionBidAnalyticsAPIView(APIView):
             'current_price': str(auction.current_price),
             'starting_price': str(auction.starting_price),
             'analytics': {
-                'total_bids': analytics['total_bids'] or 0,
-                'unique_bidders': unique_bidders,
-                'highest_bid': str(analytics['highest_bid']) if analytics['highest_bid'] else str(auction.starting_price),
-                'average_bid': str(round(analytics['average_bid'], 2)) if analytics['average_bid'] else '0.00',
+                'total_bids': analytics.total_bids,
+                'unique_bidders': analytics.unique_bidders,
+                'highest_bid': str(analytics.highest_bid) if analytics.highest_bid else str(auction.starting_price),
+                'lowest_bid': str(analytics.lowest_bid) if analytics.lowest_bid else str(auction.starting_price),
+                'average_bid': str(round(average_bid, 2)) if average_bid else '0.00',
             },
-            'recent_bids': recent_bids_data,
+            'recent_bids': analytics.recent_bids,
+        })
+
+
+class BidActivityAPIView(ReplicaReadMixin, APIView):
+    """
+    GET /api/bidding/activity/ - Platform-wide bid activity buckets
+    GET /api/bidding/auction/{id}/activity/ - Bid activity buckets for one auction
+    
+    Query params:
+    - resolution: minute (default) or hour
+    - start, end: ISO 8601 datetimes (default: last hour / last 24 hours)
+    
+    A range spanning more than MAX_BUCKETS buckets is refused (400)
+    rather than cut short; page through it with consecutive ranges.
+    Buckets are written by the compact_bid_activity task, so the
+    current minute appears once it has elapsed
+    """
+    
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    
+    # Default window per resolution
+    DEFAULT_WINDOWS = {
+        BidActivityBucket.RESOLUTION_MINUTE: timedelta(hours=1),
+        BidActivityBucket.RESOLUTION_HOUR: timedelta(days=1),
+    }
+    BUCKET_WIDTHS = {
+        BidActivityBucket.RESOLUTION_MINUTE: timedelta(minutes=1),
+        BidActivityBucket.RESOLUTION_HOUR: timedelta(hours=1),
+    }
+    MAX_BUCKETS = 2000
+    
+    def get(self, request, pk=None):
+        """
+        Return the buckets in the requested range (one indexed query)
+        """
+        resolution = request.query_params.get('resolution', BidActivityBucket.RESOLUTION_MINUTE)
+        if resolution not in self.DEFAULT_WINDOWS:
+            return Response(
+                {'error': 'resolution must be one of: minute, hour'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        end = request.query_params.get('end')
+        start = request.query_params.get('start')
+        try:
+            end = parse_datetime(end) if end else timezone.now()
+            start = parse_datetime(start) if start else end - self.DEFAULT_WINDOWS[resolution]
+        except (ValueError, TypeError):
+            start = end = None
+        if start is None or end is None:
+            return Response(
+                {'error': 'start and end must be ISO 8601 datetimes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        
+        # Bucket starts are aligned, so [start, end) holds at most this many
+        span = math.ceil((end - start) / self.BUCKET_WIDTHS[resolution])
+        if span > self.MAX_BUCKETS:
+            return Response(
+                {
+                    'error': f'The range spans {span} {resolution} buckets, at most '
+                             f'{self.MAX_BUCKETS} can be requested; narrow start and end',
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        buckets = BidActivityBucket.objects.filter(
+            auction_id=pk,
+            resolution=resolution,
+            bucket_start__gte=start,
+            bucket_start__lt=end,
+        ).order_by('bucket_start').values(
+            'bucket_start',
+            'bid_count',
+            'unique_bidders',
+            'min_price',
+            'max_price',
+            'last_price',
+        )
+        
+        return Response({
+            'auction_id': pk,
+            'resolution': resolution,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'buckets': [
+                {
+                    'bucket_start': bucket['bucket_start'].isoformat(),
+                    'bid_count': bucket['bid_count'],
+                    'unique_bidders': bucket['unique_bidders'],
+                    'min_price': str(bucket['min_price']) if bucket['min_price'] is not None else None,
+                    'max_price': str(bucket['max_price']) if bucket['max_price'] is not None else None,
+                    'last_price': str(bucket['last_price']) if bucket['last_price'] is not None else None,
+                }
+                for bucket in buckets
+            ],
         })
+
+
+class ExecutorMetricsAPIView(APIView):
+    """
+    GET /api/bidding/executors/ - WebSocket database pool metrics (staff only)
+    
+    Queue depth, rejections and wait times of this process's consumer
+    database pools (see apps/utils/executors.py)
+    """
+    
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response({'executors': executor_metrics()})
+
+
+class AuctionEventStreamAPIView(AsyncAPIView):
+    """
+    GET /api/bidding/auction/{id}/events/ - Server-Sent Events stream of an auction
+    
+    For clients without WebSockets: the auction's bid_placed messages (and
+    any other message sent to its group) as they happen, instead of
+    polling the detail endpoint. See apps/bidding/sse.py.
+    
+    - New streams start with an auction_status event (the WebSocket
+      connect snapshot)
+    - Last-Event-ID (header, or ?last_event_id= for EventSource polyfills)
+      replays the bids placed after that bid id instead; when more than
+      SSE_REPLAY_LIMIT were missed a `resync` event with a fresh snapshot
+      is sent and the client should reload the auction
+    """
+    
+    permission_classes = [permissions.AllowAny]
+    
+    async def get(self, request, pk):
+        await aget_object_or_404(Auction, pk=pk)
+        last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+        
+        async def initial():
+            # Runs once subscribed: nothing between these reads and the live stream is lost
+            auction = await Auction.objects.with_total_bids().aget(pk=pk)
+            try:
+                after = int(last_event_id)
+            except (TypeError, ValueError):
+                return [(None, encode_event({'type': 'auction_status', 'auction': auction_status(auction)}))]
+            
+            limit = getattr(settings, 'SSE_REPLAY_LIMIT', 500)
+            missed = auction.bid_history().filter(id__gt=after).select_related('bidder').order_by('id')
+            bids = [bid async for bid in missed[:limit + 1]]
+            if len(bids) > limit:
+                return [(None, encode_event({'type': 'resync', 'auction': auction_status(auction)}))]
+            
+            frames = []
+            for bid in bids:
+                bid.auction = auction
+                event = bid_placed_event(bid)
+                # current_price as it was right after this bid
+                event['auction']['current_price'] = str(bid.amount)
+                frames.append((bid.id, encode_event(event, bid.id)))
+            return frames
+        
+        response = StreamingHttpResponse(
+            event_stream(auction_group(pk), initial),
+            content_type=EVENT_STREAM,
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
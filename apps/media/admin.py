@@ -0,0 +1,23 @@
+from django.contrib import admin, messages
+
+from .models import MediaBlob
+from .tasks import generate_thumbnails
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'sha256', 'content_type', 'size', 'width', 'height', 'thumbnail_status', 'created_at']
+    list_filter = ['thumbnail_status', 'content_type']
+    search_fields = ['=sha256']
+    ordering = ['-id']
+    readonly_fields = [field.name for field in MediaBlob._meta.fields]
+    actions = ['regenerate_thumbnails']
+
+    @admin.action(description='Regenerate thumbnails of selected blobs')
+    def regenerate_thumbnails(self, request, queryset):
+        """Mark pending and queue one thumbnail task per blob"""
+        ids = list(queryset.values_list('id', flat=True))
+        queryset.update(thumbnail_status=MediaBlob.THUMBNAILS_PENDING, thumbnail_error='')
+        for blob_id in ids:
+            generate_thumbnails.delay(blob_id)
+        self.message_user(request, f"Queued thumbnails for {len(ids)} blobs.", messages.SUCCESS)
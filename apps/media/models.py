@@ -0,0 +1,50 @@
+from django.db import models
+
+
+class MediaBlob(models.Model):
+    """
+    One stored image, identified by the SHA-256 of its bytes
+
+    Identical uploads share a blob, its storage object and its thumbnails
+    (see storage.py)
+    """
+
+    THUMBNAILS_PENDING = 'pending'
+    THUMBNAILS_READY = 'ready'
+    THUMBNAILS_FAILED = 'failed'
+    THUMBNAIL_STATUS_CHOICES = [
+        (THUMBNAILS_PENDING, 'Pending'),
+        (THUMBNAILS_READY, 'Ready'),
+        (THUMBNAILS_FAILED, 'Failed'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    content_type = models.CharField(max_length=50)
+    size = models.PositiveBigIntegerField()
+    # Set once thumbnails are generated
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+
+    # {size name: {'key', 'width', 'height'}}
+    thumbnails = models.JSONField(default=dict, blank=True)
+    thumbnail_status = models.CharField(
+        max_length=10,
+        choices=THUMBNAIL_STATUS_CHOICES,
+        default=THUMBNAILS_PENDING
+    )
+    thumbnail_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'media_blobs'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.content_type}, {self.size} bytes)"
+
+    @property
+    def key(self):
+        """Storage key of the original"""
+        from .storage import blob_key
+
+        return blob_key(self.sha256, self.content_type)
@@ -0,0 +1,110 @@
+"""
+Media Serving
+=============
+File responses with conditional and Range request support
+
+- Keys are content-addressed, so the ETag is strong and derived from the
+  key alone (no database read), and responses are cacheable for a year
+  (immutable)
+- If-None-Match answers 304
+- A single "Range: bytes=..." answers 206 with that slice, streamed in
+  chunks; If-Range with another ETag falls back to the whole file, and a
+  range past the end answers 416. Multi-range requests get the whole file
+  (allowed by RFC 9110)
+"""
+
+import mimetypes
+import posixpath
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+CHUNK_SIZE = 64 * 1024
+CACHE_SECONDS = 365 * 24 * 3600
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def key_etag(key):
+    """Strong ETag of a content-addressed key: its file name"""
+    return f'"{posixpath.splitext(posixpath.basename(key))[0]}"'
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive of a single byte range, None to send the whole
+    file, or False when the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        start, end = max(0, size - length), size - 1
+    if start >= size:
+        return False
+    return start, end
+
+
+def iter_range(f, start, length):
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _finish(response, etag, content_type):
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    if content_type:
+        response['Content-Type'] = content_type
+    patch_cache_control(response, public=True, max_age=CACHE_SECONDS, immutable=True)
+    return response
+
+
+def serve_file(request, storage, key):
+    """Response for GET/HEAD of a stored key (raises FileNotFoundError)"""
+    etag = key_etag(key)
+    content_type = mimetypes.guess_type(key)[0] or 'application/octet-stream'
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _finish(not_modified, etag, None)
+
+    size = storage.size(key)
+    byte_range = None
+    header = request.headers.get('Range')
+    if header and request.headers.get('If-Range', etag) == etag:
+        byte_range = parse_range(header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return _finish(response, etag, None)
+
+    f = storage.open(key, 'rb')
+    if byte_range is None:
+        return _finish(FileResponse(f), etag, content_type)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(iter_range(f, start, length), status=206)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    return _finish(response, etag, content_type)
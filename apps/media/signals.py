@@ -0,0 +1,11 @@
+"""
+Media Signals
+=============
+
+- blob_ready: sent by the generate_thumbnails task once a blob's
+  thumbnails are stored; receivers get the MediaBlob as `blob`
+"""
+
+from django.dispatch import Signal
+
+blob_ready = Signal()
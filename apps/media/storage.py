@@ -0,0 +1,112 @@
+"""
+Media Storage
+=============
+Content-addressed image storage on Django's default storage
+
+WHY CONTENT ADDRESSING:
+- A key derived from the bytes never changes meaning, so files and
+  thumbnails can be cached forever (immutable) and served with a strong
+  ETag, and the same photo uploaded twice (or to several auctions) is
+  stored and thumbnailed once
+
+HOW IT WORKS:
+- Django's upload handlers stream the request body to a temporary file
+  (beyond FILE_UPLOAD_MAX_MEMORY_SIZE), so no upload is held in memory
+- store_upload() reads it chunk by chunk to hash it and sniff the image
+  type from its first bytes (the client's Content-Type is not trusted)
+- A known hash returns the existing MediaBlob without writing anything;
+  otherwise the file is streamed to blobs/<aa>/<bb>/<sha256>.<ext>
+- Thumbnails live next to it under thumbs/ (thumbnails.py)
+
+The default storage is the local filesystem (MEDIA_ROOT, served by
+views.MediaFileView); an object-storage backend (STORAGES['default'])
+works unchanged since only open/save/exists/url are used.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import MediaBlob
+
+EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+
+class UploadError(Exception):
+    """The upload is not an acceptable image"""
+
+
+def sniff_content_type(head):
+    """Image type from the file's magic bytes, or None"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def _shard(sha256):
+    return f'{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def blob_key(sha256, content_type):
+    return f'blobs/{_shard(sha256)}.{EXTENSIONS[content_type]}'
+
+
+def thumbnail_key(sha256, name):
+    return f'thumbs/{_shard(sha256)}-{name}.jpg'
+
+
+def media_url(key):
+    return default_storage.url(key)
+
+
+def store_upload(upload):
+    """
+    Store an uploaded image once per distinct content
+
+    Returns (blob, created); raises UploadError for oversized or
+    non-image files
+    """
+    max_bytes = getattr(settings, 'MEDIA_MAX_UPLOAD_BYTES', 10 * 1024 * 1024)
+    if upload.size > max_bytes:
+        raise UploadError(f"Images are limited to {max_bytes // (1024 * 1024)} MB")
+
+    hasher = hashlib.sha256()
+    content_type = None
+    for chunk in upload.chunks():
+        if content_type is None:
+            content_type = sniff_content_type(chunk[:16])
+            if content_type is None:
+                raise UploadError("Unsupported image type (use JPEG, PNG, GIF or WebP)")
+        hasher.update(chunk)
+    if content_type is None:
+        raise UploadError("Empty file")
+    sha256 = hasher.hexdigest()
+
+    blob = MediaBlob.objects.filter(sha256=sha256).first()
+    if blob is not None:
+        return blob, False
+
+    key = blob_key(sha256, content_type)
+    if not default_storage.exists(key):
+        upload.seek(0)
+        saved = default_storage.save(key, upload)
+        if saved != key:
+            # A concurrent upload of the same bytes stored it first
+            default_storage.delete(saved)
+
+    return MediaBlob.objects.get_or_create(
+        sha256=sha256,
+        defaults={'content_type': content_type, 'size': upload.size},
+    )
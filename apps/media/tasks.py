@@ -0,0 +1,57 @@
+"""
+Celery Tasks
+============
+Background tasks for media processing
+
+TASKS IN THIS FILE:
+1. generate_thumbnails - Queued when a new image is uploaded
+"""
+
+import logging
+
+from celery import shared_task
+
+from . import thumbnails
+from .models import MediaBlob
+from .signals import blob_ready
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def generate_thumbnails(self, blob_id):
+    """
+    Generate and store a blob's thumbnails, then send blob_ready
+
+    Storage errors are retried; undecodable images are marked failed
+    (their originals are still served)
+    """
+    blob = MediaBlob.objects.filter(pk=blob_id).first()
+    if blob is None or blob.thumbnail_status == MediaBlob.THUMBNAILS_READY:
+        return f"Blob {blob_id} has nothing to do."
+
+    try:
+        width, height, sizes = thumbnails.generate_thumbnails(blob)
+    except thumbnails.ThumbnailError as e:
+        return _fail(blob, e)
+    except OSError as e:
+        if self.request.retries >= self.max_retries:
+            return _fail(blob, e)
+        raise self.retry(exc=e)
+
+    blob.width, blob.height = width, height
+    blob.thumbnails = sizes
+    blob.thumbnail_status = MediaBlob.THUMBNAILS_READY
+    blob.thumbnail_error = ''
+    blob.save(update_fields=['width', 'height', 'thumbnails', 'thumbnail_status', 'thumbnail_error'])
+
+    blob_ready.send(sender=MediaBlob, blob=blob)
+    return f"Generated {len(sizes)} thumbnails for blob {blob_id}."
+
+
+def _fail(blob, error):
+    logger.error(f"Thumbnails of blob {blob.id} failed: {error}")
+    blob.thumbnail_status = MediaBlob.THUMBNAILS_FAILED
+    blob.thumbnail_error = str(error)[:1000]
+    blob.save(update_fields=['thumbnail_status', 'thumbnail_error'])
+    return f"Thumbnails of blob {blob.id} failed."
@@ -0,0 +1,71 @@
+"""
+Thumbnails
+==========
+Resized JPEG copies of a blob, one per MEDIA_THUMBNAIL_SIZES entry
+
+- Runs in the generate_thumbnails task, never in a request
+- Decodes the original once: JPEGs are decoded at the smallest scale
+  that still covers the largest thumbnail (Image.draft), then every size
+  is resized from that copy
+- Needs Pillow; without it thumbnailing fails and originals are still served
+"""
+
+import io
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .storage import thumbnail_key
+
+# EXIF tag of the camera orientation
+ORIENTATION = 0x0112
+
+
+class ThumbnailError(Exception):
+    """The blob cannot be thumbnailed (retrying will not help)"""
+
+
+def generate_thumbnails(blob):
+    """
+    Store every thumbnail size of a blob
+
+    Returns (width, height, {name: {'key', 'width', 'height'}}), width and
+    height being the original's
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise ThumbnailError("Pillow is not installed")
+
+    sizes = settings.MEDIA_THUMBNAIL_SIZES
+    largest = max(sizes.values())
+
+    with default_storage.open(blob.key, 'rb') as f:
+        try:
+            image = Image.open(f)
+            width, height = image.size
+            # EXIF orientations 5-8 rotate by 90 degrees
+            if image.getexif().get(ORIENTATION) in (5, 6, 7, 8):
+                width, height = height, width
+            image.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(image)
+        except (Image.UnidentifiedImageError, Image.DecompressionBombError) as e:
+            raise ThumbnailError(str(e))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+    thumbnails = {}
+    for name, edge in sizes.items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail((edge, edge))
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, 'JPEG', quality=85, optimize=True, progressive=True)
+
+        key = thumbnail_key(blob.sha256, name)
+        # A retried run may have stored it already; same bytes either way
+        if not default_storage.exists(key):
+            default_storage.save(key, ContentFile(buffer.getvalue()))
+        thumbnails[name] = {'key': key, 'width': thumbnail.width, 'height': thumbnail.height}
+
+    return width, height, thumbnails
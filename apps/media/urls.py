@@ -0,0 +1,15 @@
+"""
+Media URLs
+==========
+Serves stored files under MEDIA_URL when the local storage is used
+(object storage serves its own URLs)
+"""
+
+from django.urls import path
+from . import views
+
+app_name = 'media'
+
+urlpatterns = [
+    path('<path:key>', views.MediaFileView.as_view(), name='media-file'),
+]
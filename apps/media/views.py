@@ -0,0 +1,25 @@
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.views import View
+
+from .serving import serve_file
+
+
+class MediaFileView(View):
+    """
+    GET /media/{key} - A stored original or thumbnail
+
+    Public and cacheable forever: keys are content hashes. Supports
+    If-None-Match and Range (see serving.py)
+    """
+
+    http_method_names = ['get', 'head']
+
+    def get(self, request, key):
+        if not key.startswith(('blobs/', 'thumbs/')):
+            raise Http404
+        try:
+            return serve_file(request, default_storage, key)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            raise Http404
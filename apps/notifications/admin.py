@@ -0,0 +1,23 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'email', 'auction', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['=email', '=auction__id']
+    ordering = ['-id']
+    raw_id_fields = ['recipient', 'auction']
+    readonly_fields = ['created_at', 'sent_at', 'last_error']
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected dead notifications')
+    def requeue(self, request, queryset):
+        """Give dead-lettered notifications a fresh set of attempts"""
+        requeued = queryset.filter(status=Notification.STATUS_DEAD).update(
+            status=Notification.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f"Requeued {requeued} notifications.", messages.SUCCESS)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class NotificationsConfig(AppConfig):
+    name = 'apps.notifications'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,73 @@
+"""
+Notification Backends
+=====================
+Deliver rendered messages (settings.NOTIFICATION_BACKEND)
+
+A backend implements send_messages(messages): every message is a dict
+with id, to, subject and body. It returns {id: error} for the messages
+it could not deliver; raising marks the whole batch as failed.
+
+BACKENDS:
+- ConsoleBackend: writes the batch to stdout (development)
+- FileBackend: appends one JSON line per message to NOTIFICATION_FILE_PATH
+- MemoryBackend: keeps messages in MemoryBackend.outbox (benchmarks)
+
+A real email or push backend would send the batch in one provider call.
+"""
+
+import json
+import sys
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseBackend:
+    def send_messages(self, messages):
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+    """Write messages to a stream, one write per batch"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send_messages(self, messages):
+        self.stream.write(''.join(
+            f"To: {message['to']}\nSubject: {message['subject']}\n\n{message['body']}\n{'-' * 40}\n"
+            for message in messages
+        ))
+        self.stream.flush()
+        return {}
+
+
+class FileBackend(BaseBackend):
+    """Append messages as JSON lines, one write per batch"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = path or settings.NOTIFICATION_FILE_PATH
+
+    def send_messages(self, messages):
+        lines = ''.join(json.dumps(message) + '\n' for message in messages)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+        return {}
+
+
+class MemoryBackend(BaseBackend):
+    """Collect messages in a class-level list"""
+
+    outbox = []
+
+    def send_messages(self, messages):
+        self.outbox.extend(messages)
+        return {}
+
+
+def get_backend():
+    """Instance of the configured backend"""
+    return import_string(settings.NOTIFICATION_BACKEND)()
@@ -0,0 +1,64 @@
+"""
+WebSocket Consumer
+==================
+Per-user notification socket: ws://localhost:8000/ws/notifications/
+
+HOW IT WORKS:
+1. An authenticated user connects (anonymous sockets are refused)
+2. The socket joins the user's group (user_<id>) and is counted as
+   present (presence.py), so senders know the user is reachable here
+3. Messages sent to the group are forwarded as JSON frames:
+   - outbid: {'type': 'outbid', 'auctions': [{id, title, current_price, end_time}]}
+   - watchlist_update: {'type': 'watchlist_update', 'auction': <watchlist entry>}
+     when a watched auction changes (apps/auctions/watchlist.py)
+
+The same group is also served over SSE (views.UserEventStreamAPIView).
+"""
+
+import json
+import logging
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .presence import amark_connected, amark_disconnected, user_group
+
+logger = logging.getLogger(__name__)
+
+
+class UserConsumer(AsyncWebsocketConsumer):
+    """WebSocket consumer for one user's notifications"""
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+        if self.user is None or not self.user.is_authenticated:
+            await self.close()
+            return
+
+        self.group_name = user_group(self.user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        # Present before accepting: a push sent once the client sees the
+        # socket open must not be diverted to the backend
+        await amark_connected(self.user.id)
+        await self.accept()
+
+        logger.info(f"User {self.user.username} connected to notifications")
+
+    async def disconnect(self, close_code):
+        if not getattr(self, 'group_name', None):
+            return
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await amark_disconnected(self.user.id)
+
+    async def outbid(self, event):
+        """Outbid digest from outbid.send_outbid_digests()"""
+        await self.send(text_data=json.dumps({
+            'type': 'outbid',
+            'auctions': event['auctions'],
+        }))
+
+    async def watchlist_update(self, event):
+        """Watched auction changed, from auctions.watchlist.push_watchlist_update()"""
+        await self.send(text_data=json.dumps({
+            'type': 'watchlist_update',
+            'auction': event['auction'],
+        }))
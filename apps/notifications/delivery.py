@@ -0,0 +1,266 @@
+"""
+Notification Delivery
+=====================
+Queue notifications in bulk, deliver them in batches
+
+WHY:
+- notify_auction_participants ran once per closed auction: re-fetch the
+  auction, load winner and owner lazily, read bidder emails and "send"
+  recipient by recipient
+- When thousands of auctions close together that is thousands of tasks
+  and N x M queries
+
+HOW IT WORKS:
+1. queue_auction_results(auction_ids) turns closed auctions into
+   Notification rows: one query for the auctions (with owner and winner),
+   one for their participants (AuctionParticipant rollup) and one bulk
+   insert, however many auctions are passed
+2. deliver_pending() claims up to NOTIFICATION_BATCH_SIZE due rows,
+   across all auctions, renders them with one template per kind and hands
+   the batch to the backend in a single send_messages() call
+3. A failed message is retried after NOTIFICATION_RETRY_BACKOFF * 2^n
+   seconds; after NOTIFICATION_MAX_ATTEMPTS it is dead (dead-letter
+   queue) until requeued from the admin
+4. Every run logs its delivery throughput
+
+Claimed rows get next_attempt_at pushed NOTIFICATION_CLAIM_SECONDS ahead,
+so concurrent workers skip them and a crashed worker's batch is retried.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .backends import get_backend
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+def queue_auction_results(auction_ids):
+    """
+    Queue the result notifications of closed auctions
+
+    - Winner: auction_won; other bidders: auction_lost
+    - Owner: auction_sold, or auction_unsold when there is no winner
+
+    Safe to call twice for an auction (duplicates are ignored).
+    Returns the number of notifications built
+    """
+    from apps.auctions.models import Auction
+    from apps.bidding.models import AuctionParticipant
+
+    auctions = list(
+        Auction.objects.filter(id__in=auction_ids, status='closed')
+        .select_related('owner', 'winner')
+    )
+
+    participants = defaultdict(list)
+    rows = AuctionParticipant.objects.filter(
+        auction_id__in=[auction.id for auction in auctions]
+    ).values_list('auction_id', 'bidder_id', 'bidder__email')
+    for auction_id, bidder_id, email in rows:
+        participants[auction_id].append((bidder_id, email))
+
+    notifications = []
+    for auction in auctions:
+        context = {
+            'auction_id': auction.id,
+            'title': auction.title,
+            'price': str(auction.current_price),
+        }
+
+        def notify(kind, user_id, email):
+            notifications.append(Notification(
+                kind=kind, recipient_id=user_id, email=email,
+                auction=auction, context=context,
+            ))
+
+        if auction.winner_id:
+            notify(Notification.KIND_AUCTION_WON, auction.winner_id, auction.winner.email)
+            for bidder_id, email in participants[auction.id]:
+                if bidder_id != auction.winner_id:
+                    notify(Notification.KIND_AUCTION_LOST, bidder_id, email)
+            notify(Notification.KIND_AUCTION_SOLD, auction.owner_id, auction.owner.email)
+        else:
+            notify(Notification.KIND_AUCTION_UNSOLD, auction.owner_id, auction.owner.email)
+
+    Notification.objects.bulk_create(notifications, batch_size=1000, ignore_conflicts=True)
+    return len(notifications)
+
+
+def queue_auction_cancellations(auction_ids):
+    """
+    Queue auction_cancelled notifications to the bidders of cancelled
+    auctions
+
+    Safe to call twice for an auction (duplicates are ignored).
+    Returns the number of notifications built
+    """
+    from apps.bidding.models import AuctionParticipant
+
+    rows = AuctionParticipant.objects.filter(
+        auction_id__in=auction_ids, auction__status='cancelled'
+    ).values_list('auction_id', 'auction__title', 'bidder_id', 'bidder__email')
+
+    notifications = [
+        Notification(
+            kind=Notification.KIND_AUCTION_CANCELLED, recipient_id=bidder_id, email=email,
+            auction_id=auction_id, context={'auction_id': auction_id, 'title': title},
+        )
+        for auction_id, title, bidder_id, email in rows
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=1000, ignore_conflicts=True)
+    return len(notifications)
+
+
+def claim_batch(batch_size):
+    """Reserve up to batch_size due notifications for this worker"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status=Notification.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        Notification.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timedelta(seconds=settings.NOTIFICATION_CLAIM_SECONDS)
+        )
+    return list(
+        Notification.objects.filter(id__in=ids)
+        .only('id', 'kind', 'email', 'context', 'attempts')
+    )
+
+
+def render_messages(notifications):
+    """
+    Render a batch, loading each kind's template once
+
+    The first line of a template is the subject, the rest the body.
+    Returns (messages, {notification id: error}) for unrenderable ones
+    """
+    templates = {}
+    messages, failures = [], {}
+    for notification in notifications:
+        try:
+            template = templates.get(notification.kind)
+            if template is None:
+                template = templates[notification.kind] = get_template(
+                    f'notifications/{notification.kind}.txt'
+                )
+            subject, _, body = template.render(notification.context).partition('\n')
+        except TemplateDoesNotExist as e:
+            failures[notification.id] = f"Template not found: {e}"
+            continue
+        messages.append({
+            'id': notification.id,
+            'to': notification.email,
+            'subject': subject.strip(),
+            'body': body.strip(),
+        })
+    return messages, failures
+
+
+def record_results(notifications, failures):
+    """Mark a delivered batch: sent, retry later, or dead"""
+    now = timezone.now()
+    sent_ids = [n.id for n in notifications if n.id not in failures]
+    Notification.objects.filter(id__in=sent_ids).update(
+        status=Notification.STATUS_SENT,
+        sent_at=now,
+        attempts=F('attempts') + 1,
+        last_error='',
+    )
+
+    failed = [n for n in notifications if n.id in failures]
+    dead = 0
+    for notification in failed:
+        notification.attempts += 1
+        notification.last_error = str(failures[notification.id])[:1000]
+        if notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            notification.status = Notification.STATUS_DEAD
+            dead += 1
+        else:
+            # Exponential backoff: base, 2 x base, 4 x base, ...
+            backoff = settings.NOTIFICATION_RETRY_BACKOFF * 2 ** (notification.attempts - 1)
+            notification.next_attempt_at = now + timedelta(seconds=backoff)
+    Notification.objects.bulk_update(
+        failed, ['status', 'attempts', 'last_error', 'next_attempt_at'], batch_size=1000
+    )
+    return len(sent_ids), len(failed) - dead, dead
+
+
+def deliver_batch(backend, batch_size):
+    """Claim, render and send one batch; returns (sent, retried, dead)"""
+    notifications = claim_batch(batch_size)
+    if not notifications:
+        return 0, 0, 0
+
+    messages, failures = render_messages(notifications)
+    if messages:
+        try:
+            failures.update(backend.send_messages(messages))
+        except Exception as e:
+            logger.error(f"Notification backend failed for {len(messages)} messages: {e}")
+            failures.update({message['id']: str(e) for message in messages})
+
+    return record_results(notifications, failures)
+
+
+def deliver_pending(batch_size=None, max_batches=None):
+    """
+    Deliver due notifications batch by batch until none are left
+
+    Returns totals and throughput:
+        {'sent', 'retried', 'dead', 'batches', 'seconds', 'per_second'}
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    backend = get_backend()
+    totals = {'sent': 0, 'retried': 0, 'dead': 0, 'batches': 0}
+
+    start = time.perf_counter()
+    while max_batches is None or totals['batches'] < max_batches:
+        sent, retried, dead = deliver_batch(backend, batch_size)
+        if not (sent or retried or dead):
+            break
+        totals['sent'] += sent
+        totals['retried'] += retried
+        totals['dead'] += dead
+        totals['batches'] += 1
+    elapsed = time.perf_counter() - start
+
+    totals['seconds'] = round(elapsed, 3)
+    totals['per_second'] = round(totals['sent'] / elapsed, 1) if elapsed else 0.0
+    if totals['batches']:
+        logger.info(
+            f"Delivered {totals['sent']} notifications in {elapsed:.2f}s "
+            f"({totals['per_second']}/s, {totals['batches']} batches); "
+            f"{totals['retried']} to retry, {totals['dead']} dead"
+        )
+    return totals
+
+
+def notification_backlog():
+    """Queue size per status and how late the oldest due notification is"""
+    now = timezone.now()
+    by_status = dict(
+        Notification.objects.values_list('status').annotate(count=Count('id')).order_by()
+    )
+    oldest_due = Notification.objects.filter(
+        status=Notification.STATUS_PENDING, next_attempt_at__lte=now
+    ).aggregate(oldest=Min('next_attempt_at'))['oldest']
+    return {
+        'pending': by_status.get(Notification.STATUS_PENDING, 0),
+        'sent': by_status.get(Notification.STATUS_SENT, 0),
+        'dead': by_status.get(Notification.STATUS_DEAD, 0),
+        'oldest_due_seconds': round((now - oldest_due).total_seconds(), 1) if oldest_due else None,
+    }
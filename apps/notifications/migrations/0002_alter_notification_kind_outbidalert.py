@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-19 11:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0003_bid_archive'),
+        ('notifications', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('auction_won', 'Auction won'), ('auction_lost', 'Auction lost'), ('auction_sold', 'Auction sold'), ('auction_unsold', 'Auction unsold'), ('outbid_digest', 'Outbid digest')], max_length=30),
+        ),
+        migrations.CreateModel(
+            name='OutbidAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outbid_at', models.DateTimeField()),
+                ('due_at', models.DateTimeField()),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbid_alerts', to='auctions.auction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbid_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'outbid_alerts',
+                'indexes': [models.Index(fields=['due_at'], name='outbid_aler_due_at_db4deb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'auction'), name='unique_outbid_alert')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_alter_notification_kind_outbidalert'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('auction_won', 'Auction won'), ('auction_lost', 'Auction lost'), ('auction_sold', 'Auction sold'), ('auction_unsold', 'Auction unsold'), ('outbid_digest', 'Outbid digest'), ('auction_cancelled', 'Auction cancelled')], max_length=30),
+        ),
+    ]
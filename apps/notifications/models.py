@@ -0,0 +1,126 @@
+"""
+Notification Models
+===================
+Queue of outgoing messages, delivered in batches (see delivery.py), and
+the pending outbid alerts they are digested from (see outbid.py)
+
+LIFECYCLE:
+- pending: waiting for delivery; next_attempt_at is when it may be tried
+- sent: delivered by the backend
+- dead: failed NOTIFICATION_MAX_ATTEMPTS times (the dead-letter queue);
+  kept with its last error until an admin requeues it
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Notification(models.Model):
+    """One message of one kind to one recipient"""
+
+    KIND_AUCTION_WON = 'auction_won'
+    KIND_AUCTION_LOST = 'auction_lost'
+    KIND_AUCTION_SOLD = 'auction_sold'
+    KIND_AUCTION_UNSOLD = 'auction_unsold'
+    KIND_OUTBID_DIGEST = 'outbid_digest'
+    KIND_AUCTION_CANCELLED = 'auction_cancelled'
+    KIND_CHOICES = [
+        (KIND_AUCTION_WON, 'Auction won'),
+        (KIND_AUCTION_LOST, 'Auction lost'),
+        (KIND_AUCTION_SOLD, 'Auction sold'),
+        (KIND_AUCTION_UNSOLD, 'Auction unsold'),
+        (KIND_OUTBID_DIGEST, 'Outbid digest'),
+        (KIND_AUCTION_CANCELLED, 'Auction cancelled'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    # Copied at queue time so delivery needs no join
+    email = models.EmailField()
+    auction = models.ForeignKey(
+        'auctions.Auction',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+    # Template context (JSON-safe values only)
+    context = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notifications'
+        ordering = ['-created_at']
+        constraints = [
+            # Queuing an auction's results twice does not notify twice
+            models.UniqueConstraint(
+                fields=['kind', 'recipient', 'auction'],
+                name='unique_notification_per_auction'
+            ),
+        ]
+        indexes = [
+            # The delivery task's claim query
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.email} ({self.status})"
+
+
+class OutbidAlert(models.Model):
+    """
+    A user lost the lead on an auction and has not been told yet
+
+    At most one row per (user, auction): later outbids keep the first
+    due_at, and the row is deleted when the user bids again
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='outbid_alerts'
+    )
+    auction = models.ForeignKey(
+        'auctions.Auction',
+        on_delete=models.CASCADE,
+        related_name='outbid_alerts'
+    )
+    outbid_at = models.DateTimeField()
+    # Digested once due if the user is still outbid then
+    due_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'outbid_alerts'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'auction'],
+                name='unique_outbid_alert'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['due_at']),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} outbid on auction {self.auction_id}"
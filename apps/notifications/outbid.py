@@ -0,0 +1,182 @@
+"""
+Outbid Notifications
+====================
+Tell users they lost the lead, without a message per lead change
+
+WHY DEBOUNCE:
+- On a hot auction the lead can change every second; one message per
+  outbid event would flood users and the delivery queue
+
+HOW IT WORKS:
+1. Bid acceptance (signals.py) calls record_outbid(): the previous
+   leader gets an OutbidAlert due OUTBID_DEBOUNCE_SECONDS later (kept
+   if one is already pending) and the new bidder's pending alert for
+   that auction is dropped. Cost per bid: one indexed read, one insert
+   and one delete, whatever the number of lead changes
+2. send_outbid_digests() (periodic task) takes the due alerts, drops those
+   whose user leads again or whose auction has ended, and groups the
+   rest per user: one digest listing every auction they were outbid on
+3. Digests go over the user's notification WebSocket (group user_<id>)
+   when one is open (presence.py), else into the Notification queue
+   (kind outbid_digest) for the configured backend
+
+Alerts are removed when taken, so a crash mid-run loses those digests;
+outbid alerts are best-effort by design.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .models import Notification, OutbidAlert
+from .presence import connected_users, user_group
+
+logger = logging.getLogger(__name__)
+
+
+def record_outbid(bid):
+    """Schedule an alert for the leader this bid displaced"""
+    from apps.auctions.models import Bid
+
+    previous_leader = (
+        Bid.objects.filter(auction_id=bid.auction_id)
+        .exclude(pk=bid.pk)
+        .order_by('-amount')
+        .values_list('bidder_id', flat=True)
+        .first()
+    )
+
+    # The bidder leads again: nothing to tell them about this auction
+    OutbidAlert.objects.filter(user_id=bid.bidder_id, auction_id=bid.auction_id).delete()
+
+    if previous_leader is None or previous_leader == bid.bidder_id:
+        return
+
+    debounce = timedelta(seconds=settings.OUTBID_DEBOUNCE_SECONDS)
+    # Keeps the first due_at when the user is already waiting for an alert
+    OutbidAlert.objects.bulk_create(
+        [OutbidAlert(
+            user_id=previous_leader,
+            auction_id=bid.auction_id,
+            outbid_at=bid.created_at,
+            due_at=bid.created_at + debounce,
+        )],
+        ignore_conflicts=True,
+    )
+
+
+def take_due_alerts(batch_size):
+    """Remove and return up to batch_size due alerts"""
+    now = timezone.now()
+    with transaction.atomic():
+        alerts = list(
+            OutbidAlert.objects.select_for_update(skip_locked=True)
+            .filter(due_at__lte=now)
+            .order_by('due_at')[:batch_size]
+        )
+        OutbidAlert.objects.filter(id__in=[alert.id for alert in alerts]).delete()
+    return alerts
+
+
+def build_digests(alerts):
+    """{user_id: [auction dict, ...]} for alerts whose user is still outbid"""
+    from apps.auctions.models import Auction
+    from apps.bidding.models import AuctionParticipant
+
+    auction_ids = {alert.auction_id for alert in alerts}
+    auctions = Auction.objects.filter(
+        id__in=auction_ids, status='active', end_time__gt=timezone.now()
+    ).only('id', 'title', 'current_price', 'end_time').in_bulk()
+    # Bids must beat current_price, so exactly one participant holds it
+    leaders = dict(
+        AuctionParticipant.objects.filter(
+            auction_id__in=auctions, highest_bid=F('auction__current_price')
+        ).values_list('auction_id', 'bidder_id')
+    )
+
+    digests = defaultdict(list)
+    for alert in alerts:
+        auction = auctions.get(alert.auction_id)
+        # Ended (the result notification covers it) or lead retaken
+        if auction is None or leaders.get(alert.auction_id) == alert.user_id:
+            continue
+        digests[alert.user_id].append({
+            'id': auction.id,
+            'title': auction.title,
+            'current_price': str(auction.current_price),
+            'end_time': auction.end_time.isoformat(),
+        })
+    return digests
+
+
+def send_outbid_digests(batch_size=1000):
+    """
+    Digest and deliver every due outbid alert
+
+    Returns {'alerts', 'digests', 'websocket', 'queued'}
+    """
+    from apps.users.models import User
+
+    totals = {'alerts': 0, 'digests': 0, 'websocket': 0, 'queued': 0}
+    while True:
+        alerts = take_due_alerts(batch_size)
+        if not alerts:
+            break
+        totals['alerts'] += len(alerts)
+
+        digests = build_digests(alerts)
+        totals['digests'] += len(digests)
+
+        offline = set(digests) - connected_users(digests)
+        channel_layer = get_channel_layer()
+        for user_id in set(digests) - offline:
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    user_group(user_id),
+                    {'type': 'outbid', 'auctions': digests[user_id]},
+                )
+                totals['websocket'] += 1
+            except Exception as e:
+                logger.error(f"Outbid push to user {user_id} failed, queuing instead: {e}")
+                offline.add(user_id)
+
+        emails = dict(User.objects.filter(id__in=offline).values_list('id', 'email'))
+        Notification.objects.bulk_create([
+            Notification(
+                kind=Notification.KIND_OUTBID_DIGEST,
+                recipient_id=user_id,
+                email=email,
+                context={'auctions': digests[user_id]},
+            )
+            for user_id, email in emails.items()
+        ], batch_size=1000)
+        totals['queued'] += len(emails)
+
+        if len(alerts) < batch_size:
+            break
+
+    if totals['alerts']:
+        logger.info(
+            f"Outbid: {totals['alerts']} alerts -> {totals['digests']} digests "
+            f"({totals['websocket']} over WebSocket, {totals['queued']} queued)"
+        )
+    return totals
+
+
+def outbid_backlog():
+    """Pending outbid alerts and how late the oldest due one is"""
+    now = timezone.now()
+    pending = OutbidAlert.objects.count()
+    due = OutbidAlert.objects.filter(due_at__lte=now).aggregate(count=Count('id'), oldest=Min('due_at'))
+    return {
+        'pending': pending,
+        'due': due['count'],
+        'oldest_due_seconds': round((now - due['oldest']).total_seconds(), 1) if due['oldest'] else None,
+    }
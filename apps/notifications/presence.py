@@ -0,0 +1,61 @@
+"""
+WebSocket Presence
+==================
+Which users have a notification WebSocket open (UserConsumer)
+
+- Every user's sockets join the channel-layer group user_<id>
+- A per-user connection counter in the cache tells senders whether a
+  group_send will reach anyone, or the message should go through the
+  notification backend instead
+- Counters expire after WS_PRESENCE_TTL seconds, so a crashed process
+  cannot leave a user marked online forever
+
+REQUIRES a cache shared by every process (CACHE_URL, Redis by default):
+the ASGI processes write the counters and the Celery worker reads them
+(outbid digests, watchlist pushes). With a per-process cache the worker
+sees nobody online and everything goes through the backend.
+
+The counter is best-effort: a user wrongly seen as offline gets the
+message through the backend, which is the safe side.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def user_group(user_id):
+    """Channel-layer group of a user's notification sockets"""
+    return f'user_{user_id}'
+
+
+def _presence_key(user_id):
+    return f'ws-presence:{user_id}'
+
+
+async def amark_connected(user_id):
+    key = _presence_key(user_id)
+    ttl = getattr(settings, 'WS_PRESENCE_TTL', 3600)
+    await cache.aadd(key, 0, ttl)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        # Expired between add and incr
+        await cache.aset(key, 1, ttl)
+    await cache.atouch(key, ttl)
+
+
+async def amark_disconnected(user_id):
+    key = _presence_key(user_id)
+    try:
+        remaining = await cache.adecr(key)
+    except ValueError:
+        return
+    if remaining <= 0:
+        await cache.adelete(key)
+
+
+def connected_users(user_ids):
+    """The subset of user_ids with an open notification socket"""
+    keys = {_presence_key(user_id): user_id for user_id in user_ids}
+    online = cache.get_many(list(keys))
+    return {keys[key] for key, count in online.items() if count and count > 0}
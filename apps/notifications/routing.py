@@ -0,0 +1,16 @@
+"""
+WebSocket Routing
+=================
+URL routing for notification WebSocket connections
+"""
+
+from django.urls import re_path
+from . import consumers
+
+# ws://localhost:8000/ws/notifications/
+websocket_urlpatterns = [
+    re_path(
+        r'ws/notifications/$',
+        consumers.UserConsumer.as_asgi()
+    ),
+]
@@ -0,0 +1,24 @@
+"""
+Django Signals
+==============
+
+SIGNALS IN THIS FILE:
+- When a bid is placed, schedule an outbid alert for the previous leader
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.auctions.models import Bid
+from .outbid import record_outbid
+
+
+@receiver(post_save, sender=Bid)
+def schedule_outbid_alert(sender, instance, created, **kwargs):
+    """
+    Signal: Debounced outbid alert (see outbid.py)
+
+    Runs in the bid's transaction, so a rolled back bid leaves no alert
+    """
+    if created:
+        record_outbid(instance)
@@ -0,0 +1,40 @@
+"""
+Celery Tasks
+============
+Background tasks for notification delivery
+
+TASKS IN THIS FILE:
+1. deliver_notifications - Periodic task (runs every 10 seconds)
+2. send_outbid_digests - Periodic task (runs every 10 seconds)
+"""
+
+from celery import shared_task
+
+from . import outbid
+from .delivery import deliver_pending
+
+
+@shared_task
+def deliver_notifications():
+    """
+    Deliver every due notification in batches (across auctions)
+
+    Concurrent runs claim disjoint batches
+    """
+    totals = deliver_pending()
+    return (
+        f"Delivered {totals['sent']} notifications ({totals['per_second']}/s); "
+        f"{totals['retried']} to retry, {totals['dead']} dead."
+    )
+
+
+@shared_task
+def send_outbid_digests():
+    """
+    Digest due outbid alerts per user and push or queue them
+    """
+    totals = outbid.send_outbid_digests()
+    return (
+        f"Sent {totals['digests']} outbid digests for {totals['alerts']} alerts "
+        f"({totals['websocket']} over WebSocket, {totals['queued']} queued)."
+    )
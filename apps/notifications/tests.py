@@ -0,0 +1,249 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.auctions.models import Auction
+from apps.auctions.services import close_auction, place_bid
+from apps.users.models import User
+from .backends import BaseBackend
+from .delivery import claim_batch, deliver_pending
+from .models import Notification, OutbidAlert
+from .outbid import send_outbid_digests
+from .presence import amark_connected, amark_disconnected, connected_users, user_group
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, OUTBID_DEBOUNCE_SECONDS=30)
+class OutbidDigestTests(TestCase):
+    """outbid.record_outbid (on every bid) and send_outbid_digests"""
+
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        self.lamp, self.vase = [
+            Auction.objects.create(
+                title=title, description='Lot', starting_price=10, current_price=10,
+                owner=owner, end_time=timezone.now() + timedelta(hours=1),
+            )
+            for title in ('Lamp', 'Vase')
+        ]
+
+    def outbid_alice(self, *auctions):
+        for auction in auctions:
+            place_bid(auction.id, self.alice, Decimal('20'))
+            place_bid(auction.id, self.bob, Decimal('25'))
+
+    def make_due(self):
+        OutbidAlert.objects.update(due_at=timezone.now() - timedelta(seconds=1))
+
+    def send(self):
+        sent = []
+
+        async def group_send(group, message):
+            sent.append((group, message))
+
+        with mock.patch.object(get_channel_layer(), 'group_send', group_send):
+            totals = send_outbid_digests()
+        return totals, sent
+
+    def test_alert_is_due_after_the_debounce_window(self):
+        place_bid(self.lamp.id, self.alice, Decimal('20'))
+        self.assertFalse(OutbidAlert.objects.exists())
+
+        bid = place_bid(self.lamp.id, self.bob, Decimal('25'))
+        alert = OutbidAlert.objects.get()
+        self.assertEqual(alert.user, self.alice)
+        self.assertEqual(alert.due_at, bid.created_at + timedelta(seconds=30))
+
+        # Not due yet: nothing is taken
+        totals, sent = self.send()
+        self.assertEqual(totals['alerts'], 0)
+        self.assertTrue(OutbidAlert.objects.exists())
+
+    def test_retaking_the_lead_drops_the_pending_alert(self):
+        self.outbid_alice(self.lamp)
+        place_bid(self.lamp.id, self.alice, Decimal('30'))
+        # Bob is outbid now, alice is not
+        self.assertEqual(list(OutbidAlert.objects.values_list('user', flat=True)), [self.bob.id])
+
+    def test_one_digest_per_user_queued_when_offline(self):
+        self.outbid_alice(self.lamp, self.vase)
+        self.make_due()
+
+        totals, sent = self.send()
+
+        self.assertEqual(totals, {'alerts': 2, 'digests': 1, 'websocket': 0, 'queued': 1})
+        self.assertEqual(sent, [])
+        notification = Notification.objects.get()
+        self.assertEqual(notification.kind, Notification.KIND_OUTBID_DIGEST)
+        self.assertEqual(notification.recipient, self.alice)
+        self.assertEqual(
+            sorted(auction['title'] for auction in notification.context['auctions']),
+            ['Lamp', 'Vase'],
+        )
+        self.assertFalse(OutbidAlert.objects.exists())
+
+    def test_pushed_over_websocket_when_connected(self):
+        self.outbid_alice(self.lamp, self.vase)
+        self.make_due()
+        async_to_sync(amark_connected)(self.alice.id)
+
+        totals, sent = self.send()
+
+        self.assertEqual(totals, {'alerts': 2, 'digests': 1, 'websocket': 1, 'queued': 0})
+        [(group, message)] = sent
+        self.assertEqual(group, user_group(self.alice.id))
+        self.assertEqual(message['type'], 'outbid')
+        self.assertEqual(len(message['auctions']), 2)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_drops_ended_auctions_and_retaken_leads(self):
+        self.outbid_alice(self.lamp, self.vase)
+        self.make_due()
+        close_auction(self.lamp.id)
+        # Retaken after the alert was due
+        place_bid(self.vase.id, self.alice, Decimal('30'))
+        self.make_due()
+
+        totals, sent = self.send()
+
+        # Bob's alert for the vase is the only digest left
+        self.assertEqual(totals['digests'], 1)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, self.bob)
+        self.assertEqual([a['title'] for a in notification.context['auctions']], ['Vase'])
+
+
+class PresenceTests(TestCase):
+    """presence counters"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_sockets_per_user(self):
+        async_to_sync(amark_connected)(1)
+        async_to_sync(amark_connected)(1)
+        async_to_sync(amark_connected)(2)
+        self.assertEqual(connected_users([1, 2, 3]), {1, 2})
+
+        # Still online until the last socket closes
+        async_to_sync(amark_disconnected)(1)
+        self.assertEqual(connected_users([1, 2, 3]), {1, 2})
+        async_to_sync(amark_disconnected)(1)
+        async_to_sync(amark_disconnected)(2)
+        self.assertEqual(connected_users([1, 2, 3]), set())
+
+
+class FailingBackend(BaseBackend):
+    """Refuses mail to bob; fails the whole batch while `down` is set"""
+
+    down = False
+
+    def send_messages(self, messages):
+        if self.down:
+            raise ConnectionError('Mail server unavailable')
+        return {
+            message['id']: 'Mailbox unavailable'
+            for message in messages if message['to'] == 'bob@example.com'
+        }
+
+
+@override_settings(
+    NOTIFICATION_BACKEND='apps.notifications.tests.FailingBackend',
+    NOTIFICATION_MAX_ATTEMPTS=3,
+    NOTIFICATION_RETRY_BACKOFF=30,
+    NOTIFICATION_CLAIM_SECONDS=300,
+)
+class DeliveryTests(TestCase):
+    """delivery.deliver_pending: retries, backoff, dead letters and claiming"""
+
+    def setUp(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        lamp = Auction.objects.create(
+            title='Lamp', description='Lot', starting_price=10, current_price=10,
+            owner=owner, end_time=timezone.now() + timedelta(hours=1),
+        )
+        self.alice, self.bob = [
+            Notification.objects.create(
+                kind=Notification.KIND_AUCTION_CANCELLED,
+                recipient=User.objects.create_user(name, f'{name}@example.com', 'pw'),
+                email=f'{name}@example.com', auction=lamp,
+                context={'auction_id': lamp.id, 'title': lamp.title},
+            )
+            for name in ('alice', 'bob')
+        ]
+
+    def make_due(self):
+        Notification.objects.filter(status=Notification.STATUS_PENDING).update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def deliver(self):
+        """deliver_pending(), with the time window it ran in"""
+        before = timezone.now()
+        totals = deliver_pending()
+        return totals, before, timezone.now()
+
+    def test_retries_with_exponential_backoff_then_goes_dead(self):
+        totals, before, after = self.deliver()
+        self.assertEqual((totals['sent'], totals['retried'], totals['dead']), (1, 1, 0))
+        self.alice.refresh_from_db()
+        self.assertEqual((self.alice.status, self.alice.attempts), (Notification.STATUS_SENT, 1))
+
+        # Backoff: base, then 2 x base
+        for attempts, backoff in ((1, 30), (2, 60)):
+            with self.subTest(attempts=attempts):
+                self.bob.refresh_from_db()
+                self.assertEqual((self.bob.status, self.bob.attempts), (Notification.STATUS_PENDING, attempts))
+                self.assertEqual(self.bob.last_error, 'Mailbox unavailable')
+                self.assertTrue(
+                    before + timedelta(seconds=backoff) <= self.bob.next_attempt_at
+                    <= after + timedelta(seconds=backoff)
+                )
+                # Not claimed before the backoff elapses
+                self.assertEqual(deliver_pending()['batches'], 0)
+            self.make_due()
+            totals, before, after = self.deliver()
+
+        # Third failure: dead, and never claimed again
+        self.assertEqual((totals['retried'], totals['dead']), (0, 1))
+        self.bob.refresh_from_db()
+        self.assertEqual((self.bob.status, self.bob.attempts), (Notification.STATUS_DEAD, 3))
+        Notification.objects.filter(pk=self.bob.pk).update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(deliver_pending()['batches'], 0)
+
+    def test_backend_error_fails_the_whole_batch(self):
+        with mock.patch.object(FailingBackend, 'down', True):
+            totals, _, _ = self.deliver()
+
+        self.assertEqual((totals['sent'], totals['retried']), (0, 2))
+        for notification in Notification.objects.all():
+            self.assertEqual(notification.status, Notification.STATUS_PENDING)
+            self.assertEqual(notification.attempts, 1)
+            self.assertEqual(notification.last_error, 'Mail server unavailable')
+
+    def test_claimed_rows_are_skipped_by_other_workers(self):
+        with mock.patch.object(
+            QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update,
+        ) as select_for_update:
+            before = timezone.now()
+            claimed = claim_batch(10)
+
+        select_for_update.assert_called_once_with(mock.ANY, skip_locked=True)
+        self.assertEqual({n.id for n in claimed}, {self.alice.id, self.bob.id})
+        # The claim pushes them out of the due window until it expires
+        for notification in Notification.objects.all():
+            self.assertGreaterEqual(notification.next_attempt_at, before + timedelta(seconds=300))
+        self.assertEqual(claim_batch(10), [])
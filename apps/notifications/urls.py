@@ -0,0 +1,27 @@
+"""
+Notification URLs
+=================
+REST API endpoints for notifications
+
+NOTE: The notification WebSocket URL is in routing.py
+"""
+
+from django.urls import path
+from . import views
+
+app_name = 'notifications'
+
+urlpatterns = [
+    # Delivery backlog (staff only)
+    path(
+        'metrics/',
+        views.NotificationMetricsAPIView.as_view(),
+        name='notification-metrics'
+    ),
+    # The user's notifications as Server-Sent Events
+    path(
+        'events/',
+        views.UserEventStreamAPIView.as_view(),
+        name='notification-events'
+    ),
+]
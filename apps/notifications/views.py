@@ -0,0 +1,58 @@
+from django.http import StreamingHttpResponse
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.bidding.sse import EVENT_STREAM, event_stream
+from apps.utils.views import AsyncAPIView
+
+from .delivery import notification_backlog
+from .outbid import outbid_backlog
+from .presence import amark_connected, amark_disconnected, user_group
+
+
+class NotificationMetricsAPIView(APIView):
+    """
+    GET /api/notifications/metrics/ - Delivery backlog (staff only)
+
+    Queue sizes of the notification pipeline and of pending outbid alerts,
+    with how late the oldest due item is
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'notifications': notification_backlog(),
+            'outbid_alerts': outbid_backlog(),
+        })
+
+
+class UserEventStreamAPIView(AsyncAPIView):
+    """
+    GET /api/notifications/events/ - Server-Sent Events stream of the user's notifications
+
+    The notification WebSocket for clients without WebSockets: outbid
+    digests and watchlist_update messages of the user's group. The user is
+    present (outbid digests and watchlist pushes come here) while the
+    stream is open.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        user_id = request.user.id
+
+        async def stream():
+            await amark_connected(user_id)
+            try:
+                async for chunk in event_stream(user_group(user_id)):
+                    yield chunk
+            finally:
+                await amark_disconnected(user_id)
+
+        response = StreamingHttpResponse(stream(), content_type=EVENT_STREAM)
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
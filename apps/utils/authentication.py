@@ -0,0 +1,65 @@
+"""
+Async Authentication
+====================
+JWT authentication for AsyncAPIView (apps/utils/views.py)
+
+Token parsing and validation are pure CPU and reuse simplejwt's
+JWTAuthentication; only the user lookup differs, using the async ORM
+(aget) instead of a blocking query.
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with an awaitable aauthenticate()
+
+    Works on a plain Django HttpRequest (only request.META is read)
+    """
+
+    async def aauthenticate(self, request):
+        """Return (user, token), or None when no bearer token was sent"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Async version of JWTAuthentication.get_user"""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,63 @@
+"""
+Conditional GET
+===============
+ETag / Last-Modified validators for endpoints that clients poll
+
+WHY:
+- Clients poll the auction detail and bid list to stay in sync; most
+  polls see no change, yet each one re-ran every query and re-serialized
+
+HOW IT WORKS:
+- The view first reads a cheap version of the resource (one row by
+  primary key, e.g. updated_at and the bid sequence) and builds the
+  validators from it with make_etag()
+- conditional_response() answers If-None-Match / If-Modified-Since with
+  304 Not Modified (Django's get_conditional_response) before any heavy
+  queries or serialization run
+- Otherwise set_validators() adds ETag and Last-Modified to the full
+  response
+- Anything else that shapes the body (e.g. the page number) is passed
+  to make_etag(), so every page of a list has its own stable tag
+
+ETags are weak: bodies also carry meta.timestamp, so they are equivalent
+rather than byte-identical.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Weak ETag from the parts that identify one version of a body"""
+    key = ':'.join(str(part) for part in parts)
+    return f'W/"{hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    304 (or 412) response when the client's copy is current, else None
+
+    Args:
+        last_modified: Aware datetime of the last change, if known
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add ETag / Last-Modified; clients must revalidate before reuse"""
+    if etag is None:
+        return response
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
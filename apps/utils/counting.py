@@ -0,0 +1,258 @@
+"""
+Counting
+========
+Cheap row counts for very large tables
+
+WHY:
+- COUNT(*) over an unfiltered multi-million-row table scans the whole
+  table (or its smallest index) on every changelist or list page
+- The database already keeps an approximate row count for its planner
+
+HOW IT WORKS:
+- estimated_table_count(model) reads that statistic: pg_class.reltuples
+  on PostgreSQL; on SQLite the row count stored by ANALYZE in
+  sqlite_stat1, else MAX(rowid) (an upper bound read from the index)
+- EstimatedCountPaginator (admin) uses the estimate for unfiltered
+  querysets above a threshold and an exact COUNT(*) otherwise
+- count_queryset() picks a strategy for API list pages and reports it:
+  1. exact: a bounded COUNT finds at most LIST_COUNT_EXACT_LIMIT rows
+  2. estimated: the queryset is a whole large table
+  3. cached: the view passed a cache key for a common filter; an exact
+     COUNT is cached for LIST_COUNT_CACHE_TTL seconds
+  4. exact: anything else
+- CountingPageNumberPagination wires it into DRF pagination and exposes
+  the strategy as count_type
+
+Estimated and cached counts can be off (a stale or low estimate), so
+they never bound the pages: CountingPaginator and AsyncPageNumberPagination
+serve any page with rows and set `next` from one row read past the page.
+Only exact counts reject pages past the end.
+"""
+
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections, router
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+# Below this many rows an exact COUNT(*) is cheap enough
+ESTIMATE_THRESHOLD = 100_000
+
+EXACT = 'exact'
+CACHED = 'cached'
+ESTIMATED = 'estimated'
+
+
+def estimated_table_count(model, using=None):
+    """
+    Approximate number of rows in the model's table
+
+    Returns None when the database has no usable statistic
+    """
+    using = using or router.db_for_read(model)
+    connection = connections[using]
+    table = model._meta.db_table
+
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(table)],
+                )
+                row = cursor.fetchone()
+                # -1 means the table was never analyzed
+                if row and row[0] >= 0:
+                    return row[0]
+                return None
+
+            if connection.vendor == 'sqlite':
+                try:
+                    cursor.execute(
+                        # The first number of every stat row is the table's row count
+                        "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                        [table],
+                    )
+                    row = cursor.fetchone()
+                    if row:
+                        return int(row[0].split()[0])
+                except DatabaseError:
+                    # sqlite_stat1 only exists once ANALYZE has run
+                    pass
+                cursor.execute(f"SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}")
+                row = cursor.fetchone()
+                return row[0] or 0
+    except DatabaseError:
+        return None
+    return None
+
+
+def is_unfiltered(queryset):
+    """True when the queryset selects every row of its table"""
+    query = queryset.query
+    return (
+        not query.where
+        and not query.combinator
+        and not query.distinct
+        and query.low_mark == 0
+        and query.high_mark is None
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that estimates the count of large unfiltered querysets
+
+    Filtered querysets (search, list filters) still get an exact count,
+    since the estimate only describes the whole table
+    """
+    estimate_threshold = ESTIMATE_THRESHOLD
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and is_unfiltered(queryset):
+            estimate = estimated_table_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+def _cache_key(key):
+    return f'list-count:{key}'
+
+
+def count_queryset(queryset, cache_key=None):
+    """
+    Count a list queryset with the cheapest fitting strategy
+
+    Args:
+        cache_key: Identifies a common filter whose count may be cached
+
+    Returns (count, count_type), count_type being EXACT, CACHED or ESTIMATED
+    """
+    limit = getattr(settings, 'LIST_COUNT_EXACT_LIMIT', 1000)
+    # COUNT over at most limit + 1 rows: cheap whatever the table size
+    bounded = queryset.order_by()[:limit + 1].count()
+    if bounded <= limit:
+        return bounded, EXACT
+
+    if is_unfiltered(queryset):
+        estimate = estimated_table_count(queryset.model, using=queryset.db)
+        if estimate is not None:
+            return max(estimate, bounded), ESTIMATED
+
+    if cache_key:
+        count = cache.get(_cache_key(cache_key))
+        if count is None:
+            count = queryset.count()
+            cache.set(_cache_key(cache_key), count, getattr(settings, 'LIST_COUNT_CACHE_TTL', 60))
+        return count, CACHED
+
+    return queryset.count(), EXACT
+
+
+async def acount_queryset(queryset, cache_key=None):
+    """Async version of count_queryset"""
+    limit = getattr(settings, 'LIST_COUNT_EXACT_LIMIT', 1000)
+    bounded = await queryset.order_by()[:limit + 1].acount()
+    if bounded <= limit:
+        return bounded, EXACT
+
+    if is_unfiltered(queryset):
+        estimate = await sync_to_async(estimated_table_count)(queryset.model, using=queryset.db)
+        if estimate is not None:
+            return max(estimate, bounded), ESTIMATED
+
+    if cache_key:
+        count = await cache.aget(_cache_key(cache_key))
+        if count is None:
+            count = await queryset.acount()
+            await cache.aset(_cache_key(cache_key), count, getattr(settings, 'LIST_COUNT_CACHE_TTL', 60))
+        return count, CACHED
+
+    return await queryset.acount(), EXACT
+
+
+class CountingPage(Page):
+    """Page of an inexact count: whether another follows was read, not counted"""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+    def next_page_number(self):
+        return self.number + 1
+
+
+class CountingPaginator(Paginator):
+    """Django Paginator whose count comes from count_queryset()"""
+
+    def __init__(self, object_list, per_page, cache_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.count_type = EXACT
+
+    @cached_property
+    def count(self):
+        count, self.count_type = count_queryset(self.object_list, cache_key=self.cache_key)
+        return count
+
+    def page(self, number):
+        self.count  # Sets count_type
+        if self.count_type == EXACT:
+            return super().page(number)
+
+        # Bounded by the rows, not the count: one extra row tells if a page follows
+        number = self._validate_page_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return CountingPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+    def _validate_page_number(self, number):
+        """validate_number() without the upper bound, which needs an exact count"""
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+
+class CountingPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination using count_queryset()
+
+    Pass count_cache_key to paginate_queryset() for common filters;
+    count_type says how meta.count was obtained
+    """
+    count_cache_key = None
+
+    @property
+    def django_paginator_class(self):
+        return partial(CountingPaginator, cache_key=self.count_cache_key)
+
+    def paginate_queryset(self, queryset, request, view=None, count_cache_key=None):
+        self.count_cache_key = count_cache_key
+        return super().paginate_queryset(queryset, request, view)
+
+    @property
+    def count_type(self):
+        return self.page.paginator.count_type
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_type'] = self.count_type
+        return response
@@ -0,0 +1,97 @@
+"""
+Database Router
+===============
+Send read-only endpoint traffic to a read replica
+
+HOW IT WORKS:
+- Views opt in with ReplicaReadMixin (apps/utils/views.py), which turns on
+  replica reads for the duration of a safe (GET/HEAD/OPTIONS) request
+- Everything else (bid acceptance, auction edits, Celery tasks) never sets
+  the flag, so it always reads and writes the primary
+- After a user places a bid they are pinned to the primary for
+  REPLICA_PIN_SECONDS, so their own history and statistics never look
+  stale because of replication lag (read-your-writes)
+
+The pin is stored in the Django cache keyed by user id, which works the
+same for JWT and session clients; the default cache (CACHE_URL) is
+shared, so a pin set by one process holds in all of them.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_ALIAS = 'replica'
+PRIMARY_ALIAS = 'default'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_configured():
+    """True when a replica database alias exists"""
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def enable_replica_reads():
+    """Route reads in the current context to the replica; returns a reset token"""
+    return _replica_reads.set(True)
+
+
+def reset_replica_reads(token):
+    """Undo enable_replica_reads()"""
+    _replica_reads.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """Context manager form, for code outside views (scripts, shell)"""
+    token = enable_replica_reads()
+    try:
+        yield
+    finally:
+        reset_replica_reads(token)
+
+
+def _pin_key(user_id):
+    return f'db-primary-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Keep this user's reads on the primary for REPLICA_PIN_SECONDS"""
+    if user_id and replica_configured():
+        cache.set(_pin_key(user_id), True, getattr(settings, 'REPLICA_PIN_SECONDS', 10))
+
+
+def is_pinned(user):
+    """True if the user recently wrote and must read from the primary"""
+    if not user or not user.is_authenticated:
+        return False
+    return bool(cache.get(_pin_key(user.pk)))
+
+
+async def ais_pinned(user):
+    """Async version of is_pinned, for AsyncAPIView"""
+    if not user or not user.is_authenticated:
+        return False
+    return bool(await cache.aget(_pin_key(user.pk)))
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads go to the replica only when the current request opted in;
+    writes always go to the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and replica_configured():
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
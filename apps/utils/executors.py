@@ -0,0 +1,171 @@
+"""
+Database Executors
+==================
+Bounded thread pools for database work done by Channels consumers
+
+WHY NOT database_sync_to_async:
+- It runs every call on the one shared thread-sensitive executor, so a
+  bid write waits behind every snapshot read queued before it (e.g.
+  during a reconnect storm)
+- The queue is unbounded: under overload latency just keeps climbing
+
+HOW IT WORKS:
+- Each pool (settings.CONSUMER_DB_EXECUTORS, e.g. 'write' and 'read') has
+  its own threads, so bid acceptance never queues behind reads
+- A pool admits at most max_workers running + max_queue waiting calls;
+  beyond that run() raises ServerBusy immediately
+- A call that waited longer than max_wait seconds for a thread is dropped
+  with ServerBusy instead of running late
+- Queue depth, running calls, rejections and wait times are tracked per
+  pool (executor_metrics())
+
+Usage:
+    @run_in_executor('write')
+    def create_bid(self, amount):
+        ...
+"""
+
+import functools
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from channels.db import DatabaseSyncToAsync
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL = {'max_workers': 4, 'max_queue': 100, 'max_wait': 5.0}
+
+# Wait-time samples kept per pool for the metrics
+WAIT_SAMPLES = 1000
+
+
+class ServerBusy(Exception):
+    """Raised when a pool is saturated; the caller should reject the request"""
+
+    def __init__(self, pool, retry_after):
+        super().__init__(f"Database pool '{pool}' is saturated")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class BoundedDatabaseExecutor:
+    """
+    A named thread pool with admission control and metrics
+
+    run() is called from the event loop thread only, so the admission
+    counters need no lock; counters updated by worker threads use one
+    """
+
+    def __init__(self, name, max_workers, max_queue, max_wait):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'db-{name}')
+
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.wait_times = deque(maxlen=WAIT_SAMPLES)
+
+    @property
+    def queue_depth(self):
+        """Calls admitted but not yet running"""
+        return self.pending - self.running
+
+    async def run(self, func, *args, **kwargs):
+        """Run a sync DB function on this pool; raises ServerBusy when full"""
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ServerBusy(self.name, self.max_wait)
+
+        self.pending += 1
+        try:
+            call = DatabaseSyncToAsync(
+                functools.partial(self._call, func, time.monotonic()),
+                thread_sensitive=False,
+                executor=self.pool,
+            )
+            return await call(*args, **kwargs)
+        finally:
+            self.pending -= 1
+
+    def _call(self, func, enqueued_at, *args, **kwargs):
+        """Worker thread: record the wait, drop stale calls, run func"""
+        waited = time.monotonic() - enqueued_at
+        self.wait_times.append(waited)
+        if waited > self.max_wait:
+            with self._lock:
+                self.expired += 1
+            raise ServerBusy(self.name, self.max_wait)
+
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def metrics(self):
+        """Snapshot of the pool's counters and wait times (ms)"""
+        waits = sorted(self.wait_times)
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'queue_depth': self.queue_depth,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'expired': self.expired,
+            'wait_ms_median': round(statistics.median(waits) * 1000, 3) if waits else None,
+            'wait_ms_p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else None,
+            'wait_ms_max': round(waits[-1] * 1000, 3) if waits else None,
+        }
+
+
+_executors = {}
+
+
+def get_executor(name):
+    """Get (or lazily create) the named pool from settings"""
+    executor = _executors.get(name)
+    if executor is None:
+        config = {
+            **DEFAULT_POOL,
+            **getattr(settings, 'CONSUMER_DB_EXECUTORS', {}).get(name, {}),
+        }
+        executor = _executors[name] = BoundedDatabaseExecutor(name, **config)
+        logger.info(
+            f"Started database pool '{name}' "
+            f"({executor.max_workers} workers, queue {executor.max_queue})"
+        )
+    return executor
+
+
+def executor_metrics():
+    """Metrics of every pool started in this process"""
+    return {name: executor.metrics() for name, executor in _executors.items()}
+
+
+def run_in_executor(name):
+    """
+    Decorator: turn a sync DB function into a coroutine running on a pool
+
+    Drop-in replacement for @database_sync_to_async
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await get_executor(name).run(func, *args, **kwargs)
+        return wrapper
+    return decorator
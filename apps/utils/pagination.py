@@ -0,0 +1,76 @@
+"""
+Async Pagination
+================
+PageNumberPagination for AsyncAPIView
+
+Same query params, page size and next/previous links as DRF's
+PageNumberPagination, but the count and the page slice run through the
+async ORM (acount, async iteration) instead of Django's sync Paginator.
+The count goes through the counting strategies of apps.utils.counting.
+
+Only an exact count bounds the pages. An estimated or cached count can
+be lower than the real one, so then any page with rows is served, and
+`next` is set when one row past the page exists (page_size + 1 rows are
+read), not from the count.
+"""
+
+import math
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from apps.utils.counting import EXACT, acount_queryset
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+
+    async def apaginate_queryset(self, queryset, request, count_cache_key=None):
+        """Return the list of objects on the requested page"""
+        self.request = request
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param) or 1
+
+        try:
+            page_number = int(page_number)
+            if page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='That page number is not a positive integer'
+            ))
+
+        self.count, self.count_type = await acount_queryset(queryset, cache_key=count_cache_key)
+        self.page_number = page_number
+        offset = (page_number - 1) * page_size
+
+        if self.count_type == EXACT:
+            num_pages = max(1, math.ceil(self.count / page_size))
+            if page_number > num_pages:
+                raise NotFound(self.invalid_page_message.format(
+                    page_number=page_number, message='That page contains no results'
+                ))
+            self.has_next = page_number < num_pages
+            return [obj async for obj in queryset[offset:offset + page_size]]
+
+        rows = [obj async for obj in queryset[offset:offset + page_size + 1]]
+        if not rows and page_number > 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='That page contains no results'
+            ))
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
@@ -0,0 +1,223 @@
+"""
+Rate Limiting
+=============
+Token buckets that limit how fast bids can be placed
+
+HOW IT WORKS:
+- Every bid takes one token from up to three buckets: the bidder's, the
+  client IP's and the auction's (settings.BID_RATE_LIMITS)
+- A bucket holds at most `burst` tokens and refills at `per_second`
+- The check is all-or-nothing: if any bucket is empty no token is taken
+  from the others, and RateLimited reports the longest wait
+- Checks run before any database access, so a flooding client costs a
+  dictionary (or Redis) lookup instead of a DB round trip
+
+STORES (settings.RATE_LIMIT_STORE):
+- memory: per-process buckets; enough for a single worker
+- redis: shared buckets updated atomically by a Lua script
+  (RATE_LIMIT_REDIS_URL, requires the redis package)
+"""
+
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # Only needed for RATE_LIMIT_STORE = 'redis'
+    redis = aioredis = None
+
+# Idle buckets are dropped from the memory store once it holds this many
+MEMORY_STORE_MAX_KEYS = 100_000
+
+
+class RateLimited(Exception):
+    """Raised when a bucket has no token left for the request"""
+
+    def __init__(self, scope, retry_after):
+        super().__init__(f"Rate limit exceeded ({scope})")
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self):
+        """Whole seconds for the Retry-After header (never 0)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class MemoryStore:
+    """Buckets in a dict, guarded by a lock (shared by worker threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, buckets, cost=1):
+        """
+        Take `cost` tokens from every bucket or from none
+
+        Args:
+            buckets: List of (key, burst, per_second)
+
+        Returns (None, 0) when allowed, else (blocking key, seconds to wait)
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            blocked, wait = None, 0.0
+            for key, burst, per_second in buckets:
+                tokens, updated = self._buckets.get(key, (burst, now))
+                tokens = min(burst, tokens + (now - updated) * per_second)
+                levels.append(tokens)
+                if tokens < cost and (cost - tokens) / per_second > wait:
+                    blocked, wait = key, (cost - tokens) / per_second
+
+            if blocked is not None:
+                return blocked, wait
+
+            for (key, _, _), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens - cost, now)
+
+            if len(self._buckets) > MEMORY_STORE_MAX_KEYS:
+                self._prune(now)
+        return None, 0.0
+
+    async def aconsume(self, buckets, cost=1):
+        # Never blocks on I/O, so no thread is needed
+        return self.consume(buckets, cost)
+
+    def _prune(self, now):
+        """Drop buckets idle long enough to have refilled completely"""
+        idle_after = max(
+            (burst / per_second for _, burst, per_second in _configured_limits()),
+            default=60,
+        )
+        self._buckets = {
+            key: state for key, state in self._buckets.items()
+            if now - state[1] < idle_after
+        }
+
+
+# KEYS: bucket keys
+# ARGV: cost, then burst and per_second for each key
+# Returns {1, "0", ""} when allowed, else {0, "<seconds>", "<key>"}
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local levels = {}
+local blocked = ''
+local wait = 0
+
+for i, key in ipairs(KEYS) do
+    local burst = tonumber(ARGV[i * 2])
+    local per_second = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * per_second)
+    levels[i] = tokens
+    if tokens < cost and (cost - tokens) / per_second > wait then
+        wait = (cost - tokens) / per_second
+        blocked = key
+    end
+end
+
+if blocked ~= '' then
+    return {0, tostring(wait), blocked}
+end
+
+for i, key in ipairs(KEYS) do
+    local burst = tonumber(ARGV[i * 2])
+    local per_second = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', key, 'tokens', tostring(levels[i] - cost), 'updated', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(burst / per_second * 1000) + 1000)
+end
+return {1, '0', ''}
+"""
+
+
+class RedisStore:
+    """Buckets in Redis hashes, shared by every process"""
+
+    def __init__(self, url):
+        if redis is None:
+            raise ImproperlyConfigured("RATE_LIMIT_STORE = 'redis' requires the redis package")
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._aclient = aioredis.Redis.from_url(url)
+        self._ascript = self._aclient.register_script(TOKEN_BUCKET_SCRIPT)
+
+    @staticmethod
+    def _args(buckets, cost):
+        keys = [f'ratelimit:{key}' for key, _, _ in buckets]
+        args = [cost]
+        for _, burst, per_second in buckets:
+            args += [burst, per_second]
+        return keys, args
+
+    @staticmethod
+    def _result(result):
+        allowed, wait, blocked = result
+        if allowed:
+            return None, 0.0
+        blocked = blocked.decode() if isinstance(blocked, bytes) else blocked
+        return blocked.removeprefix('ratelimit:'), float(wait)
+
+    def consume(self, buckets, cost=1):
+        keys, args = self._args(buckets, cost)
+        return self._result(self._script(keys=keys, args=args))
+
+    async def aconsume(self, buckets, cost=1):
+        keys, args = self._args(buckets, cost)
+        return self._result(await self._ascript(keys=keys, args=args))
+
+
+_store = None
+
+
+def get_store():
+    """The configured bucket store (created on first use)"""
+    global _store
+    if _store is None:
+        backend = getattr(settings, 'RATE_LIMIT_STORE', 'memory')
+        if backend == 'redis':
+            _store = RedisStore(settings.RATE_LIMIT_REDIS_URL)
+        elif backend == 'memory':
+            _store = MemoryStore()
+        else:
+            raise ImproperlyConfigured(f"Unknown RATE_LIMIT_STORE '{backend}'")
+    return _store
+
+
+def _configured_limits():
+    """(scope, burst, per_second) for every enabled scope"""
+    for scope, limit in getattr(settings, 'BID_RATE_LIMITS', {}).items():
+        if limit:
+            yield scope, limit['burst'], limit['per_second']
+
+
+def _bid_buckets(user_id, ip, auction_id):
+    identities = {'user': user_id, 'ip': ip, 'auction': auction_id}
+    return [
+        (f'bid:{scope}:{identities[scope]}', burst, per_second)
+        for scope, burst, per_second in _configured_limits()
+        if identities.get(scope) not in (None, '')
+    ]
+
+
+def _raise_if_blocked(blocked, wait):
+    if blocked is not None:
+        # Key format is bid:<scope>:<identity>
+        raise RateLimited(blocked.split(':')[1], round(wait, 3))
+
+
+async def acheck_bid_rate(user_id, ip, auction_id):
+    """Take a bid token for this user, IP and auction, or raise RateLimited"""
+    buckets = _bid_buckets(user_id, ip, auction_id)
+    if buckets:
+        _raise_if_blocked(*await get_store().aconsume(buckets))
@@ -0,0 +1,249 @@
+"""
+Streaming Helpers
+=================
+NDJSON / CSV parsing and encoding for bulk import and export endpoints
+
+WHY STREAM:
+- Imports are parsed line by line from the request body instead of
+  loading the whole upload into request.data
+- Exports are written from a QuerySet.iterator() cursor through a
+  StreamingHttpResponse, so memory stays flat for millions of rows
+- Exports can be gzip-compressed on the fly, chunk by chunk
+
+ASGI:
+- Django's ASGI handler cannot iterate a sync generator lazily: it reads
+  it whole with sync_to_async(list) before sending the first byte
+- Under ASGI the export is served as an async generator instead; each
+  chunk (ROWS_PER_CHUNK rows, read, encoded and compressed) is pulled in
+  the thread-sensitive executor, so the cursor stays on one connection
+  and one chunk is in memory at a time
+- Under WSGI the sync generator is streamed as is
+"""
+
+import codecs
+import csv
+import json
+import zlib
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.negotiation import BaseContentNegotiation
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv',
+}
+
+# Rows encoded into one chunk of the streamed response
+ROWS_PER_CHUNK = 500
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    Always use the first renderer
+
+    Export views return a StreamingHttpResponse themselves, so a client
+    sending "Accept: text/csv" must not be rejected with 406; error
+    responses still render as JSON
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+def detect_format(request, default=NDJSON):
+    """
+    Pick NDJSON or CSV for an import body from ?input= or Content-Type
+    """
+    requested = request.query_params.get('input')
+    if requested:
+        return requested.lower()
+    if 'csv' in (request.content_type or ''):
+        return CSV
+    return default
+
+
+def is_chunked(request):
+    """True when the body is sent with Transfer-Encoding: chunked"""
+    return 'chunked' in request.META.get('HTTP_TRANSFER_ENCODING', '').lower()
+
+
+def body_stream(request):
+    """
+    The request body as a file-like object, or None when there is none
+
+    DRF's request.stream is None without a Content-Length. Under ASGI,
+    Django has already spooled a chunked body and the HttpRequest reads
+    it; under WSGI, Django reads nothing without a Content-Length, so
+    chunked bodies are lost (callers answer 411)
+    """
+    if request.stream is not None:
+        return request.stream
+    if is_chunked(request) and is_asgi(request):
+        return request._request
+    return None
+
+
+def iter_rows(stream, input_format):
+    """
+    Parse a body stream (body_stream()) as NDJSON or CSV, one record at a time
+
+    Yields (row_number, data, error) tuples: data is a dict when the row
+    parsed, error a message when it did not. Blank lines are skipped.
+    """
+    lines = codecs.iterdecode(iter(stream.readline, b''), 'utf-8')
+
+    if input_format == CSV:
+        reader = csv.DictReader(lines)
+        for row_number, row in enumerate(reader, start=1):
+            # Empty cells become missing fields so optional fields validate
+            yield row_number, {key: value for key, value in row.items() if value not in ('', None)}, None
+        return
+
+    row_number = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, data, None
+
+
+class _Echo:
+    """File-like object whose write() returns the value (for csv.writer)"""
+
+    def write(self, value):
+        return value
+
+
+def _to_text(value):
+    """
+    Render datetimes and decimals exactly
+
+    Datetimes keep full microsecond precision so a row's created_at can be
+    used as a resume cursor
+    """
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_ndjson(rows):
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps({key: _to_text(value) for key, value in row.items()}))
+        if len(buffer) >= ROWS_PER_CHUNK:
+            yield ('\n'.join(buffer) + '\n').encode()
+            buffer = []
+    if buffer:
+        yield ('\n'.join(buffer) + '\n').encode()
+
+
+def _encode_csv(rows, fieldnames):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fieldnames).encode()
+
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow([_to_text(row.get(field)) for field in fieldnames]))
+        if len(buffer) >= ROWS_PER_CHUNK:
+            yield ''.join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def wants_gzip(request):
+    """True when the client asked for gzip via ?gzip=true or Accept-Encoding"""
+    requested = request.query_params.get('gzip')
+    if requested is not None:
+        return requested.lower() in ('1', 'true', 'yes')
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def _gzip(chunks):
+    """Compress a stream of byte chunks into one gzip stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+_END = object()
+
+
+async def _pull_in_thread(chunks):
+    """
+    Async iterator over a sync iterator, one next() per executor call
+
+    Closing it (client gone) closes the sync generator, and with it the
+    database cursor, in the same thread
+    """
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await pull(chunks, _END)
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def is_asgi(request):
+    """True when the request came through Django's ASGI handler"""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def streaming_export_response(request, rows, fieldnames, output_format, filename, compress=False):
+    """
+    Build a StreamingHttpResponse that encodes rows lazily
+
+    Args:
+        request: The export request; decides sync or async streaming
+        rows: Iterable of dicts, typically queryset.values().iterator()
+        fieldnames: Column order for CSV output
+        output_format: NDJSON or CSV
+        filename: Download name without extension
+        compress: gzip the body on the fly (sets Content-Encoding)
+    """
+    if output_format == CSV:
+        content = _encode_csv(rows, fieldnames)
+    else:
+        content = _encode_ndjson(rows)
+
+    if compress:
+        content = _gzip(content)
+
+    if is_asgi(request):
+        content = _pull_in_thread(content)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[output_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output_format}"'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -1,3 +1,254 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.auctions.models import Auction
+from apps.bidding.consumers import AuctionConsumer
+from apps.users.models import User
+from . import executors
+from .counting import CACHED, ESTIMATED, EXACT, CountingPageNumberPagination
+from .pagination import AsyncPageNumberPagination
+from .ratelimit import MemoryStore
+from .transactions import write_atomic
+
+
+class WriteAtomicTests(TransactionTestCase):
+    """transactions.write_atomic"""
+
+    def begins(self, block):
+        """BEGIN statements the block issues"""
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            if sql.startswith('BEGIN'):
+                statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            block()
+        return statements
+
+    @override_settings(SQLITE_IMMEDIATE_WRITES=True)
+    def test_only_write_blocks_begin_immediate(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+
+        def write():
+            with write_atomic():
+                pass
+
+        def read():
+            with transaction.atomic():
+                pass
+
+        self.assertEqual(self.begins(write), ['BEGIN IMMEDIATE'])
+        self.assertEqual(self.begins(read), ['BEGIN'])
+
+    @override_settings(SQLITE_IMMEDIATE_WRITES=True)
+    def test_nested_block_keeps_outer_mode(self):
+        def nested():
+            with transaction.atomic():
+                with write_atomic():
+                    pass
+
+        self.assertNotIn('BEGIN IMMEDIATE', self.begins(nested))
+
+    @override_settings(SQLITE_IMMEDIATE_WRITES=False)
+    def test_disabled(self):
+        def write():
+            with write_atomic():
+                pass
+
+        self.assertNotIn('BEGIN IMMEDIATE', self.begins(write))
+
+
+class MemoryStoreTests(SimpleTestCase):
+    """ratelimit.MemoryStore token buckets"""
+
+    def test_takes_from_every_bucket_or_none_and_refills(self):
+        store = MemoryStore()
+        user = ('bid:user:1', 2, 1.0)
+        auction = ('bid:auction:7', 1, 0.5)
+
+        with mock.patch('apps.utils.ratelimit.time.monotonic', return_value=100.0):
+            self.assertEqual(store.consume([user, auction]), (None, 0.0))
+            # The auction bucket is empty: the user keeps its second token
+            self.assertEqual(store.consume([user, auction]), ('bid:auction:7', 2.0))
+            self.assertEqual(store.consume([user]), (None, 0.0))
+            self.assertEqual(store.consume([user]), ('bid:user:1', 1.0))
+
+        with mock.patch('apps.utils.ratelimit.time.monotonic', return_value=102.0):
+            self.assertEqual(store.consume([user, auction]), (None, 0.0))
+
+
+@override_settings(LIST_COUNT_EXACT_LIMIT=5)
+class CountingPaginationTests(TestCase):
+    """
+    Pages under each count strategy (counting.py), sync and async
+
+    12 rows, 5 per page: pages 1-3 exist whatever the count says
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        Auction.objects.bulk_create([
+            Auction(
+                title=f'Lot {i}', description='Lot', starting_price=10, current_price=10,
+                owner=owner, end_time=timezone.now() + timedelta(hours=1),
+            )
+            for i in range(12)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def request(self, page):
+        return Request(APIRequestFactory().get('/api/v1/auctions/', {'page': page}))
+
+    def paginate(self, queryset, page, cache_key=None):
+        """(titles, next link, count, count_type) of the sync paginator"""
+        pagination = CountingPageNumberPagination()
+        pagination.page_size = 5
+        rows = pagination.paginate_queryset(queryset, self.request(page), count_cache_key=cache_key)
+        return (
+            [auction.title for auction in rows], pagination.get_next_link(),
+            pagination.page.paginator.count, pagination.count_type,
+        )
+
+    async def apaginate(self, queryset, page, cache_key=None):
+        """Same for the async paginator"""
+        pagination = AsyncPageNumberPagination()
+        pagination.page_size = 5
+        rows = await pagination.apaginate_queryset(queryset, self.request(page), count_cache_key=cache_key)
+        return (
+            [auction.title for auction in rows], pagination.get_next_link(),
+            pagination.count, pagination.count_type,
+        )
+
+    def check_pages(self, pages, count, count_type):
+        """pages: {page number: paginate() result or NotFound}"""
+        titles, next_link, got_count, got_type = pages[1]
+        self.assertEqual((got_count, got_type), (count, count_type))
+        self.assertEqual(titles, [f'Lot {i}' for i in range(5)])
+        self.assertIn('page=2', next_link)
+        self.assertIn('page=3', pages[2][1])
+        self.assertEqual(pages[3][:2], (['Lot 10', 'Lot 11'], None))
+        self.assertIs(pages[4], NotFound)
+
+    def sync_pages(self, queryset, cache_key=None):
+        pages = {}
+        for page in (1, 2, 3, 4):
+            try:
+                pages[page] = self.paginate(queryset, page, cache_key)
+            except NotFound:
+                pages[page] = NotFound
+        return pages
+
+    async def async_pages(self, queryset, cache_key=None):
+        pages = {}
+        for page in (1, 2, 3, 4):
+            try:
+                pages[page] = await self.apaginate(queryset, page, cache_key)
+            except NotFound:
+                pages[page] = NotFound
+        return pages
+
+    @override_settings(LIST_COUNT_EXACT_LIMIT=1000)
+    def test_exact(self):
+        self.check_pages(self.sync_pages(Auction.objects.order_by('id')), 12, EXACT)
+
+    @override_settings(LIST_COUNT_EXACT_LIMIT=1000)
+    async def test_exact_async(self):
+        self.check_pages(await self.async_pages(Auction.objects.order_by('id')), 12, EXACT)
+
+    def test_estimate_too_low(self):
+        # The bounded COUNT already saw 6 rows, so that is the floor
+        with mock.patch('apps.utils.counting.estimated_table_count', return_value=3):
+            self.check_pages(self.sync_pages(Auction.objects.order_by('id')), 6, ESTIMATED)
+
+    async def test_estimate_too_low_async(self):
+        with mock.patch('apps.utils.counting.estimated_table_count', return_value=3):
+            self.check_pages(await self.async_pages(Auction.objects.order_by('id')), 6, ESTIMATED)
+
+    def test_stale_cached_count(self):
+        cache.set('list-count:active', 4)
+        queryset = Auction.objects.filter(status='active').order_by('id')
+        self.check_pages(self.sync_pages(queryset, cache_key='active'), 4, CACHED)
+
+    async def test_stale_cached_count_async(self):
+        await cache.aset('list-count:active', 4)
+        queryset = Auction.objects.filter(status='active').order_by('id')
+        self.check_pages(await self.async_pages(queryset, cache_key='active'), 4, CACHED)
+
+
+@override_settings(CONSUMER_DB_EXECUTORS={'write': {'max_workers': 1, 'max_queue': 1, 'max_wait': 5.0}})
+class BoundedExecutorTests(SimpleTestCase):
+    """executors: a full pool rejects calls instead of queueing them"""
+
+    def setUp(self):
+        # A fresh 'write' pool built from the settings above
+        patcher = mock.patch.dict(executors._executors, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    async def fill_pool(self):
+        """One call running and one queued on the 'write' pool"""
+        executor = executors.get_executor('write')
+        self.addCleanup(executor.pool.shutdown, wait=False)
+        calls = [asyncio.ensure_future(executor.run(self.release.wait, 5)) for _ in range(2)]
+        while executor.running < 1:
+            await asyncio.sleep(0.01)
+        self.assertEqual((executor.running, executor.queue_depth), (1, 1))
+        return executor, calls
+
+    async def test_rejects_calls_beyond_the_queue(self):
+        executor, calls = await self.fill_pool()
+
+        with self.assertRaises(executors.ServerBusy) as raised:
+            await executor.run(lambda: None)
+        self.assertEqual(raised.exception.retry_after, 5.0)
+
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*calls), [True, True])
+        self.assertEqual(
+            {key: executor.metrics()[key] for key in ('completed', 'rejected', 'queue_depth')},
+            {'completed': 2, 'rejected': 1, 'queue_depth': 0},
+        )
+
+    async def test_consumer_replies_server_busy(self):
+        executor, calls = await self.fill_pool()
+        consumer = AuctionConsumer()
+        consumer.auction_id = 1
+        consumer.user = mock.Mock(is_authenticated=True, id=1)
+        consumer.auction_state = 'active'
+        consumer.end_time = timezone.now() + timedelta(hours=1)
+        consumer.scope = {'client': ['127.0.0.1', 5000]}
+        frames = []
+
+        async def send(text_data):
+            frames.append(json.loads(text_data))
+
+        consumer.send = send
+        with mock.patch('apps.bidding.consumers.acheck_bid_rate', mock.AsyncMock()):
+            await consumer.receive(json.dumps({'type': 'place_bid', 'amount': 50}))
+
+        self.assertEqual(frames, [{
+            'type': 'server_busy', 'message': 'Server is busy, please retry', 'retry_after': 5.0,
+        }])
+        # Refused at admission: nothing was queued behind the running call
+        self.assertEqual((executor.rejected, executor.queue_depth), (1, 1))
+        self.release.set()
+        await asyncio.gather(*calls)
@@ -0,0 +1,59 @@
+"""
+Write Transactions
+==================
+transaction.atomic() for code that locks rows, then writes them
+
+WHY:
+- SQLite ignores select_for_update(). A deferred transaction (plain
+  BEGIN) takes the write lock only at its first write, so two bids that
+  both read the auction first cannot both upgrade: one fails with
+  "database is locked" at once, without waiting out the busy timeout
+- BEGIN IMMEDIATE takes the write lock up front, so the second bid
+  waits instead. Making it the connection's transaction_mode would apply
+  it to every atomic block, and the read-mostly ones (outbox relay,
+  bid archive, activity compaction) would queue on the single writer
+  lock too, so only the auction state changes use it
+
+HOW IT WORKS:
+- write_atomic() is transaction.atomic(). On SQLite with
+  SQLITE_IMMEDIATE_WRITES, the outermost block begins with
+  BEGIN IMMEDIATE; other databases take row locks as usual
+- Nested in another atomic block it is a savepoint, and the outer
+  block's mode applies
+
+Usage:
+    with write_atomic():
+        auction = Auction.objects.select_for_update().get(pk=pk)
+"""
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+
+@contextmanager
+def write_atomic(using=None):
+    """transaction.atomic() that takes SQLite's write lock when it begins"""
+    connection = transaction.get_connection(using)
+    immediate = (
+        connection.vendor == 'sqlite'
+        and not connection.in_atomic_block
+        and getattr(settings, 'SQLITE_IMMEDIATE_WRITES', False)
+    )
+    if not immediate:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # Connecting resets transaction_mode from the OPTIONS
+    connection.ensure_connection()
+    mode = connection.transaction_mode
+    connection.transaction_mode = 'IMMEDIATE'
+    try:
+        with transaction.atomic(using=using):
+            # Only the BEGIN reads it
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
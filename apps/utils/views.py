@@ -1,8 +1,46 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import exceptions, permissions, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import exception_handler
 from django.utils import timezone
 
+from .authentication import AsyncJWTAuthentication
+from .db_router import ais_pinned, enable_replica_reads, is_pinned, reset_replica_reads
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests of this view from the read replica
+
+    Put it first in the bases of read-only endpoints. Users who just placed
+    a bid are pinned to the primary (see apps/utils/db_router.py).
+    Streaming views must bind their querysets with .using(qs.db) because
+    the body is produced after the view returns.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            self._replica_token = enable_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            reset_replica_reads(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
 class APIResponse:
     @staticmethod
     def success_response(
@@ -43,3 +81,137 @@ class APIResponse:
         }
 
         return Response(response_data, status=status_code)
+
+
+class AsyncAPIView(APIResponse, View):
+    """
+    Minimal async counterpart of DRF's APIView for hot endpoints
+
+    DRF views are sync, so under ASGI every request holds a worker thread
+    for its whole lifetime. Subclasses of this view write `async def`
+    handlers using the async ORM (aget, acount, async for): Django still
+    runs each query in a thread, but authentication, serialization and
+    rendering happen on the event loop, so a thread is only held while a
+    query (or a write transaction, via sync_to_async) runs.
+
+    What it keeps from APIView:
+    - JWT authentication (AsyncJWTAuthentication) and DRF permission
+      classes; has_permission() must not query the database
+    - The APIResponse envelope and DRF's error format
+    - Methods without an async handler are served by `sync_view`, the
+      existing DRF view, so writes keep their serializers and permissions
+    """
+    authentication_class = AsyncJWTAuthentication
+    permission_classes = [permissions.IsAuthenticated]
+    # DRF view handling the methods this view does not implement
+    sync_view = None
+    # Serve safe requests from the read replica (see db_router.py)
+    replica_reads = False
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token authentication only, like the DRF views
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def get_async_handler(self, request):
+        method = request.method.lower()
+        if method not in self.http_method_names or method == 'options':
+            return None
+        return getattr(self, method, None)
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = self.get_async_handler(request)
+        if handler is None:
+            if self.sync_view is not None:
+                return await sync_to_async(self.call_sync_view)(request, *args, **kwargs)
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+
+        # DRF's name for it, so pagination and shared helpers work unchanged
+        request.query_params = request.GET
+
+        token = None
+        try:
+            await self.initial(request)
+            if self.replica_reads and request.method in SAFE_METHODS and not await ais_pinned(request.user):
+                token = enable_replica_reads()
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(request, exc)
+        finally:
+            if token is not None:
+                reset_replica_reads(token)
+
+        return self.finalize_response(request, response)
+
+    def call_sync_view(self, request, *args, **kwargs):
+        """Run the sync DRF view and render it in the same worker thread"""
+        response = self.sync_view.as_view()(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    async def initial(self, request):
+        """Authenticate, then check permissions"""
+        # Test clients (APIClient.force_authenticate) set this, as for DRF's Request
+        forced_user = getattr(request, '_force_auth_user', None)
+        if forced_user is not None:
+            request.user = forced_user
+        else:
+            result = await self.authentication_class().aauthenticate(request)
+            request.user = result[0] if result else AnonymousUser()
+
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(detail=getattr(permission, 'message', None))
+
+    def check_object_permissions(self, request, obj):
+        """Same as APIView.check_object_permissions"""
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_object_permission(request, self, obj):
+                raise exceptions.PermissionDenied(detail=getattr(permission, 'message', None))
+
+    def parse_body(self, request):
+        """Parse a JSON or form request body into a dict"""
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError as e:
+                raise exceptions.ParseError(f'JSON parse error - {e}')
+            if not isinstance(data, dict):
+                raise exceptions.ParseError('Expected a JSON object')
+            return data
+        return request.POST
+
+    def handle_exception(self, request, exc):
+        """Turn auth, 404 and API errors into DRF-style responses"""
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            exc.auth_header = self.authentication_class().authenticate_header(request)
+
+        response = exception_handler(exc, {'view': self, 'request': request})
+        if response is None:
+            raise exc
+        return response
+
+    def finalize_response(self, request, response):
+        """
+        Render DRF Responses here
+
+        Django renders deferred responses in a worker thread, which would
+        cost the thread hop these views avoid
+        """
+        if not isinstance(response, Response):
+            return response
+
+        rendered = HttpResponse(
+            JSONRenderer().render(response.data),
+            status=response.status_code,
+            content_type='application/json',
+        )
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                rendered[header] = value
+        # Test clients read response.data, as on DRF responses
+        rendered.data = response.data
+        return rendered
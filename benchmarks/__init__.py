@@ -0,0 +1,10 @@
+"""
+Benchmarks
+==========
+Standalone performance scripts, run from the project root:
+
+    python -m benchmarks.<name>
+
+Each script boots Django against a throwaway test database,
+so db.sqlite3 is never touched.
+"""
@@ -0,0 +1,189 @@
+"""
+Concurrent requests per worker on the async views
+
+Drives Django's ASGI application in-process (no server or network), so
+the numbers show what one ASGI worker can serve. N concurrent clients each
+send requests back to back with a real JWT. The sync DRF implementations
+these views replaced have been removed; compare against an older checkout
+to reproduce the sync baseline.
+
+Usage:
+    python -m benchmarks.async_views
+    python -m benchmarks.async_views --concurrency 1 16 64 --requests 50
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.urls import path
+
+from benchmarks.common import setup_django, summarize
+
+urlpatterns = []
+
+ENDPOINTS = ['detail', 'list', 'place-bid']
+
+
+def mount_views():
+    """Mount the endpoints at short paths"""
+    from apps.auctions import views as auction_views
+    from apps.bidding import views as bidding_views
+
+    urlpatterns.extend([
+        path('auctions/', auction_views.AuctionListCreateAsyncAPIView.as_view()),
+        path('auctions/<int:pk>/', auction_views.AuctionDetailAsyncAPIView.as_view()),
+        path('place-bid/', bidding_views.PlaceBidAsyncAPIView.as_view()),
+    ])
+
+
+async def request(app, method, url, token, body=None):
+    """Send one request through the ASGI app, return (status, elapsed ms)"""
+    path_, _, query = url.partition('?')
+    payload = json.dumps(body).encode() if body else b''
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path_,
+        'raw_path': path_.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode()),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode()),
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': payload}]
+    never = asyncio.Event()
+    status = None
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # No disconnect: Django cancels its listener once the response is sent
+        await never.wait()
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, (time.perf_counter() - start) * 1000
+
+
+async def run_load(app, endpoint, clients, requests_per_client):
+    """Run `clients` concurrent clients, return (requests/s, latencies, errors)"""
+
+    async def client(token, auction_id, offset):
+        latencies, errors = [], 0
+        for n in range(requests_per_client):
+            if endpoint == 'detail':
+                status, ms = await request(app, 'GET', f'/auctions/{auction_id}/', token)
+            elif endpoint == 'list':
+                status, ms = await request(app, 'GET', '/auctions/?page=2', token)
+            else:
+                amount = str(offset + n + 2)
+                status, ms = await request(
+                    app, 'POST', '/place-bid/', token,
+                    {'auction_id': auction_id, 'amount': amount},
+                )
+            latencies.append(ms)
+            errors += status >= 400
+        return latencies, errors
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        client(token, auction_id, offset) for token, auction_id, offset in clients
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies = [ms for result in results for ms in result[0]]
+    errors = sum(result[1] for result in results)
+    return len(latencies) / elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 16, 64])
+    parser.add_argument('--requests', type=int, default=30, help='Requests per client')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=ENDPOINTS)
+    args = parser.parse_args()
+
+    database_file = Path(tempfile.gettempdir()) / 'bench_async_views.sqlite3'
+    setup_django(database_file=database_file)
+
+    import logging
+
+    from datetime import timedelta
+
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from apps.auctions.models import Auction
+    from apps.users.models import User
+
+    settings.ROOT_URLCONF = __name__
+    # Measure the request path, not the bid rate limits
+    settings.BID_RATE_LIMITS = {}
+    mount_views()
+
+    max_clients = max(args.concurrency)
+    owner = User.objects.create_user('bench-owner', 'bench-owner@example.com', 'pw')
+    bidders = [
+        User.objects.create_user(f'bench-{i}', f'bench-{i}@example.com', 'pw')
+        for i in range(max_clients)
+    ]
+    auctions = [
+        Auction.objects.create(
+            title=f'Lot {i}',
+            description='Benchmark lot',
+            starting_price=1,
+            current_price=1,
+            owner=owner,
+            end_time=timezone.now() + timedelta(hours=1),
+        )
+        for i in range(max_clients)
+    ]
+    tokens = [str(AccessToken.for_user(user)) for user in bidders]
+
+    app = get_asgi_application()
+    # get_asgi_application() reconfigures logging; per-request logs would
+    # dominate the timings
+    logging.getLogger('apps').setLevel(logging.WARNING)
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    # Bid amounts keep increasing across runs so every bid is accepted
+    next_amount = 0
+
+    print(f"{'endpoint':<10} {'clients':>7} {'req/s':>9} {'median ms':>10} {'p95 ms':>9} {'errors':>7}")
+    for endpoint in args.endpoints:
+        for clients in args.concurrency:
+            workers = [
+                (tokens[i], auctions[i].id, next_amount)
+                for i in range(clients)
+            ]
+            next_amount += args.requests
+            rate, latencies, errors = asyncio.run(
+                run_load(app, endpoint, workers, args.requests)
+            )
+            median, p95 = summarize(latencies)
+            print(
+                f"{endpoint:<10} {clients:>7} {rate:>9.1f} "
+                f"{median:>10.2f} {p95:>9.2f} {errors:>7}"
+            )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Hot bids table insert speed before and after archiving
+
+Fills the bids table with closed-auction history, times single-row bid
+inserts, archives the closed auctions and times the same inserts again.
+
+Usage:
+    python -m benchmarks.bid_archive
+    python -m benchmarks.bid_archive --history 500000 --inserts 5000
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import timedelta
+
+from benchmarks.common import print_row, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--history', type=int, default=200000, help='Closed-auction bids to preload')
+    parser.add_argument('--inserts', type=int, default=2000, help='Live bids inserted per measurement')
+    parser.add_argument(
+        '--db-file',
+        default=os.path.join(tempfile.gettempdir(), 'bench_bid_archive.sqlite3'),
+        help='SQLite file for the run (on disk, so index I/O is included)',
+    )
+    args = parser.parse_args()
+
+    setup_django(database_file=args.db_file)
+
+    import time
+
+    from django.db import transaction
+    from django.utils import timezone
+
+    from apps.auctions.archive import archivable_auctions, archive_auction_bids
+    from apps.auctions.models import Auction, Bid
+    from apps.users.models import User
+
+    owner = User.objects.create_user('bench-owner', 'bench-owner@example.com', 'pw')
+    bidders = [
+        User.objects.create_user(f'bench-{i}', f'bench-{i}@example.com', 'pw')
+        for i in range(100)
+    ]
+
+    def make_auction(title, **kwargs):
+        return Auction.objects.create(
+            title=title,
+            description='Benchmark lot',
+            starting_price=1,
+            current_price=1,
+            owner=owner,
+            **kwargs,
+        )
+
+    # Closed auctions well past the archive cutoff
+    old_end = timezone.now() - timedelta(days=365)
+    closed = [
+        make_auction(f'Closed {i}', status='closed', start_time=old_end - timedelta(days=7), end_time=old_end)
+        for i in range(200)
+    ]
+    batch = []
+    for i in range(args.history):
+        batch.append(Bid(auction=closed[i % len(closed)], bidder=bidders[i % len(bidders)], amount=1 + i))
+        if len(batch) >= 10000:
+            Bid.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Bid.objects.bulk_create(batch)
+
+    live = make_auction('Live', end_time=timezone.now() + timedelta(days=1))
+
+    def insert_live_bids():
+        # bulk_create of one row isolates table/index cost from the rollup signals
+        samples = []
+        for i in range(args.inserts):
+            start = time.perf_counter()
+            with transaction.atomic():
+                Bid.objects.bulk_create([Bid(auction=live, bidder=bidders[i % len(bidders)], amount=1 + i)])
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    before = insert_live_bids()
+    print_row(f'hot table {Bid.objects.count()} rows', before, width=32)
+
+    start = time.perf_counter()
+    archived = sum(archive_auction_bids(auction_id) for auction_id in archivable_auctions().values_list('id', flat=True))
+    print(f"archived {archived} bids in {time.perf_counter() - start:.2f} s")
+
+    after = insert_live_bids()
+    print_row(f'hot table {Bid.objects.count()} rows', after, width=32)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+BidStatisticsAPIView latency vs bid history size
+
+Compares the UserBidStatistics rollup read used by the endpoint with the
+previous aggregate-over-all-bids queries, for users with growing history.
+
+Usage:
+    python -m benchmarks.bid_statistics
+    python -m benchmarks.bid_statistics --sizes 1000 10000 100000
+"""
+
+import argparse
+from datetime import timedelta
+
+from benchmarks.common import measure, print_row, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db.models import Avg, Count, Max
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+
+    from apps.auctions.models import Auction, Bid
+    from apps.bidding.analytics import rebuild_user_statistics
+    from apps.users.models import User
+
+    owner = User.objects.create_user('bench-owner', 'bench-owner@example.com', 'pw')
+    auctions = [
+        Auction.objects.create(
+            title=f'Lot {i}',
+            description='Benchmark lot',
+            starting_price=1,
+            current_price=1,
+            owner=owner,
+            end_time=timezone.now() + timedelta(days=1),
+        )
+        for i in range(50)
+    ]
+
+    def legacy_statistics(user):
+        user_bids = Bid.objects.filter(bidder=user)
+        user_bids.aggregate(total_bids=Count('id'), highest_bid=Max('amount'), average_bid=Avg('amount'))
+        Auction.objects.filter(winner=user, status='closed').count()
+        user_bids.values('auction').distinct().count()
+
+    for size in args.sizes:
+        user = User.objects.create_user(f'bench-{size}', f'bench-{size}@example.com', 'pw')
+        # bulk_create skips the post_save rollup signal, so backfill afterwards
+        Bid.objects.bulk_create(
+            [
+                Bid(auction=auctions[i % len(auctions)], bidder=user, amount=1 + i)
+                for i in range(size)
+            ],
+            batch_size=5000,
+        )
+        rebuild_user_statistics([user.id])
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        rollup = measure(lambda: client.get('/api/v1/bidding/statistics/'), repeat=args.repeat)
+        legacy = measure(lambda: legacy_statistics(user), repeat=args.repeat)
+
+        print_row(f'{size} bids: rollup endpoint', rollup, width=36)
+        print_row(f'{size} bids: legacy aggregates', legacy, width=36)
+
+
+if __name__ == '__main__':
+    main()
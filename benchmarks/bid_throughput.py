@@ -0,0 +1,147 @@
+"""
+Concurrent bid throughput per database profile
+
+Each mode runs in a child process configured through the same environment
+variables as settings.py (DB_ENGINE, SQLITE_HARDENED, DB_*). Worker threads
+place bids through the place-bid endpoint, each on its own auction, so every
+rejection counted is a database error rather than a business rule.
+
+Usage:
+    python -m benchmarks.bid_throughput
+    python -m benchmarks.bid_throughput --threads 16 --bids 200
+    DB_NAME=bench DB_USER=... python -m benchmarks.bid_throughput --modes postgres postgres-pool
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+MODES = {
+    'sqlite-default': {'DB_ENGINE': 'sqlite', 'SQLITE_HARDENED': 'False'},
+    'sqlite-hardened': {'DB_ENGINE': 'sqlite', 'SQLITE_HARDENED': 'True'},
+    'postgres': {'DB_ENGINE': 'postgres', 'DB_POOL': 'False'},
+    'postgres-pool': {'DB_ENGINE': 'postgres', 'DB_POOL': 'True'},
+}
+
+
+def run_mode(args):
+    """Child process: run the load against the configured database"""
+    import threading
+    import time
+    from datetime import timedelta
+
+    from benchmarks.common import setup_django
+
+    database_file = None
+    if os.environ.get('DB_ENGINE', 'sqlite') == 'sqlite':
+        database_file = os.path.join(tempfile.gettempdir(), f'bench_throughput_{args.mode}.sqlite3')
+    setup_django(database_file=database_file)
+
+    import logging
+
+    # Failed bids are counted below; their tracebacks would flood the output
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    from django.conf import settings
+    from django.db import connection
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+
+    # Measure the database, not the bid rate limits
+    settings.BID_RATE_LIMITS = {}
+
+    from apps.auctions.models import Auction
+    from apps.users.models import User
+
+    owner = User.objects.create_user('bench-owner', 'bench-owner@example.com', 'pw')
+    workers = []
+    for i in range(args.threads):
+        user = User.objects.create_user(f'bench-{i}', f'bench-{i}@example.com', 'pw')
+        auction = Auction.objects.create(
+            title=f'Lot {i}',
+            description='Benchmark lot',
+            starting_price=1,
+            current_price=1,
+            owner=owner,
+            end_time=timezone.now() + timedelta(hours=1),
+        )
+        workers.append((user, auction))
+
+    results = {'ok': 0, 'failed': 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads + 1)
+
+    def place_bids(user, auction):
+        client = APIClient()
+        client.force_authenticate(user)
+        ok = failed = 0
+        barrier.wait()
+        for n in range(args.bids):
+            try:
+                response = client.post(
+                    '/api/v1/bidding/place-bid/',
+                    {'auction_id': auction.id, 'amount': str(2 + n)},
+                    format='json',
+                )
+                if response.status_code == 201:
+                    ok += 1
+                else:
+                    failed += 1
+            except Exception:
+                failed += 1
+        with lock:
+            results['ok'] += ok
+            results['failed'] += failed
+
+    threads = [threading.Thread(target=place_bids, args=worker) for worker in workers]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.mode:<16} {results['ok'] / elapsed:9.1f} bids/s   "
+        f"ok {results['ok']:6d}   failed {results['failed']:6d}   "
+        f"({connection.vendor}, {args.threads} threads)"
+    )
+
+    if database_file:
+        connection.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(database_file + suffix):
+                os.remove(database_file + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=['sqlite-default', 'sqlite-hardened'])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--bids', type=int, default=100, help='Bids per thread')
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    for mode in args.modes:
+        env = {**os.environ, **MODES[mode]}
+        subprocess.run(
+            [
+                sys.executable, '-m', 'benchmarks.bid_throughput',
+                '--mode', mode,
+                '--threads', str(args.threads),
+                '--bids', str(args.bids),
+            ],
+            env=env,
+            check=False,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+import logging
+import os
+import statistics
+import time
+
+
+def setup_django(database_file=None):
+    """
+    Configure Django and create a throwaway test database
+
+    Args:
+        database_file: SQLite file to use instead of the in-memory test
+            database (needed when disk I/O matters to the measurement)
+
+    Returns the test database name so callers can report it
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'live_auction_drf.settings')
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    # Per-operation INFO logs would dominate the timings
+    logging.getLogger('apps').setLevel(logging.WARNING)
+
+    if database_file:
+        connection.settings_dict['TEST']['NAME'] = str(database_file)
+
+    setup_test_environment()
+    return connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def measure(fn, repeat=50, warmup=5):
+    """
+    Call fn repeatedly and return the wall-clock samples in milliseconds
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    """Return (median, p95) of a list of millisecond samples"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return statistics.median(ordered), p95
+
+
+def print_row(label, samples, width=28):
+    """Print one result line: label, median and p95"""
+    median, p95 = summarize(samples)
+    print(f"{label:<{width}} median {median:8.3f} ms   p95 {p95:8.3f} ms")
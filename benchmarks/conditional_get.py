@@ -0,0 +1,104 @@
+"""
+Polling cost of the auction detail and bid list with conditional GET
+
+Simulates clients polling GET /api/v1/auctions/<id>/ and /<id>/bids/
+while bids arrive now and then. Each endpoint is polled twice: plain
+GETs, then GETs revalidating with If-None-Match. Reports CPU time, queries
+and response bytes per poll, and how many polls were answered with 304.
+
+Usage:
+    python -m benchmarks.conditional_get
+    python -m benchmarks.conditional_get --polls 2000 --bid-every 50
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks.common import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--polls', type=int, default=1000)
+    parser.add_argument('--bid-every', type=int, default=20, help='Polls between two bids')
+    parser.add_argument('--history', type=int, default=200, help='Bids placed before polling')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+
+    from apps.auctions.models import Auction, Bid
+    from apps.users.models import User
+
+    settings.BID_RATE_LIMITS = {}
+
+    owner = User.objects.create_user('bench-owner', 'bench-owner@example.com', 'pw')
+    bidder = User.objects.create_user('bench-bidder', 'bench-bidder@example.com', 'pw')
+    poller = APIClient()
+    poller.force_authenticate(User.objects.create_user('bench-poller', 'bench-poller@example.com', 'pw'))
+
+    amount = 1
+    executed = 0
+
+    def count_queries(execute, sql, params, many, context):
+        # Counted here: connection.queries stops growing after 9000 entries
+        nonlocal executed
+        executed += 1
+        return execute(sql, params, many, context)
+
+    def place_bid(auction):
+        nonlocal amount
+        amount += 1
+        Bid.objects.create(auction=auction, bidder=bidder, amount=amount)
+
+    print(f"{'endpoint':<8} {'mode':<12} {'cpu ms/poll':>12} {'queries/poll':>13} {'bytes/poll':>11} {'304s':>6}")
+    for endpoint in ('detail', 'bids'):
+        for conditional in (False, True):
+            auction = Auction.objects.create(
+                title='Polled lot',
+                description='Benchmark lot',
+                starting_price=1,
+                current_price=1,
+                owner=owner,
+                end_time=timezone.now() + timedelta(days=1),
+            )
+            for _ in range(args.history):
+                place_bid(auction)
+
+            url = f'/api/v1/auctions/{auction.id}/'
+            if endpoint == 'bids':
+                url += 'bids/'
+
+            etag = None
+            cpu = 0.0
+            queries = size = not_modified = 0
+            for n in range(args.polls):
+                if n and n % args.bid_every == 0:
+                    place_bid(auction)
+
+                headers = {'HTTP_IF_NONE_MATCH': etag} if conditional and etag else {}
+                before = executed
+                start = time.process_time()
+                with connection.execute_wrapper(count_queries):
+                    response = poller.get(url, **headers)
+                cpu += time.process_time() - start
+
+                queries += executed - before
+                size += len(response.content)
+                not_modified += response.status_code == 304
+                etag = response.get('ETag', etag)
+
+            mode = 'conditional' if conditional else 'plain'
+            print(
+                f"{endpoint:<8} {mode:<12} {cpu / args.polls * 1000:>12.3f} "
+                f"{queries / args.polls:>13.2f} {size / args.polls:>11.0f} {not_modified:>6}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Auction result notifications: per-auction sending vs the batched pipeline
+
+Closes many auctions at once, then delivers their result notifications
+- legacy: the previous notify_auction_participants, once per auction
+  (re-fetch, lazy winner/owner, one send per recipient)
+- batched: queue_auction_results() for all auctions, then deliver_pending()
+Both send through MemoryBackend; reports messages/s and queries.
+
+Usage:
+    python -m benchmarks.notifications
+    python -m benchmarks.notifications --auctions 1000 --bidders 10
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks.common import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--auctions', type=int, default=300)
+    parser.add_argument('--bidders', type=int, default=8, help='Bidders per auction')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.utils import timezone
+
+    from apps.auctions.models import Auction, Bid
+    from apps.notifications.backends import MemoryBackend
+    from apps.notifications.delivery import deliver_pending, queue_auction_results
+    from apps.users.models import User
+
+    settings.NOTIFICATION_BACKEND = 'apps.notifications.backends.MemoryBackend'
+
+    owner = User.objects.create_user('bench-owner', 'bench-owner@example.com', 'pw')
+    bidders = [
+        User.objects.create_user(f'bench-{i}', f'bench-{i}@example.com', 'pw')
+        for i in range(args.bidders)
+    ]
+    auction_ids = []
+    for i in range(args.auctions):
+        auction = Auction.objects.create(
+            title=f'Lot {i}',
+            description='Benchmark lot',
+            starting_price=1,
+            current_price=1,
+            owner=owner,
+            end_time=timezone.now() + timedelta(hours=1),
+        )
+        for n, bidder in enumerate(bidders):
+            Bid.objects.create(auction=auction, bidder=bidder, amount=n + 2)
+        auction_ids.append(auction.id)
+    Auction.objects.filter(id__in=auction_ids).update(status='closed', winner=bidders[-1])
+
+    backend = MemoryBackend()
+
+    def legacy_notify(auction_id):
+        # The per-auction task this pipeline replaced, sending one by one
+        auction = Auction.objects.get(id=auction_id)
+        bidder_emails = auction.bids.values_list('bidder__email', flat=True).distinct()
+        send = lambda to, subject: backend.send_messages([{'to': to, 'subject': subject, 'body': ''}])
+        if auction.winner:
+            send(auction.winner.email, f"You won '{auction.title}'")
+            for email in bidder_emails:
+                if email != auction.winner.email:
+                    send(email, f"Auction '{auction.title}' has ended")
+        else:
+            send(auction.owner.email, f"Your auction '{auction.title}' ended")
+        if auction.winner and auction.owner.email != auction.winner.email:
+            send(auction.owner.email, f"Your auction '{auction.title}' sold")
+
+    executed = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal executed
+        executed += 1
+        return execute(sql, params, many, context)
+
+    print(f"{'mode':<8} {'messages':>9} {'seconds':>8} {'msg/s':>9} {'queries':>8}")
+    with connection.execute_wrapper(count_queries):
+        MemoryBackend.outbox.clear()
+        executed = 0
+        start = time.perf_counter()
+        for auction_id in auction_ids:
+            legacy_notify(auction_id)
+        elapsed = time.perf_counter() - start
+        sent = len(MemoryBackend.outbox)
+        print(f"{'legacy':<8} {sent:>9} {elapsed:>8.3f} {sent / elapsed:>9.0f} {executed:>8}")
+
+        MemoryBackend.outbox.clear()
+        executed = 0
+        start = time.perf_counter()
+        queue_auction_results(auction_ids)
+        totals = deliver_pending()
+        elapsed = time.perf_counter() - start
+        sent = totals['sent']
+        print(f"{'batched':<8} {sent:>9} {elapsed:>8.3f} {sent / elapsed:>9.0f} {executed:>8}")
+
+
+if __name__ == '__main__':
+    main()
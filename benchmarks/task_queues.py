@@ -0,0 +1,130 @@
+"""
+Close latency during a notification flood: one shared queue vs routed queues
+
+Replays a flood of notification tasks with a steady stream of
+close_auction tasks through an in-memory broker stand-in (a FIFO per
+queue, worker threads that reserve prefetch_multiplier messages each)
+- shared: every task on one queue, served by as many workers as all
+  profiles together (the setup before task routing)
+- routed: tasks go where TASK_ROUTES sends them, each queue served by
+  its WORKER_PROFILES entry
+Task bodies sleep for a fixed service time, so only queueing is measured.
+Reports close latency (queued to done) without and with the flood.
+
+Usage:
+    python -m benchmarks.task_queues
+    python -m benchmarks.task_queues --flood 3000 --notify-ms 10
+"""
+
+import argparse
+import collections
+import os
+import queue
+import threading
+import time
+
+from benchmarks.common import summarize
+
+CLOSE = 'apps.auctions.tasks.close_auction'
+NOTIFY = 'apps.notifications.tasks.deliver_notifications'
+
+
+class Worker(threading.Thread):
+    """A worker process: reserves up to prefetch messages, runs them in order"""
+
+    def __init__(self, inbox, prefetch, service_ms, done):
+        super().__init__(daemon=True)
+        self.inbox = inbox
+        self.prefetch = prefetch
+        self.service_ms = service_ms
+        self.done = done
+        self.reserved = collections.deque()
+
+    def run(self):
+        while True:
+            if not self.reserved:
+                self.reserved.append(self.inbox.get())
+            while len(self.reserved) < self.prefetch:
+                try:
+                    self.reserved.append(self.inbox.get_nowait())
+                except queue.Empty:
+                    break
+            message = self.reserved.popleft()
+            if message is None:
+                return
+            name, queued_at = message
+            time.sleep(self.service_ms[name] / 1000)
+            self.done.append((name, time.perf_counter() - queued_at))
+
+
+def run(mode, flood, closes, close_interval_ms, service_ms):
+    """Close latencies (ms) of one run"""
+    from live_auction_drf.celery import WORKER_PROFILES, app
+
+    done = []
+    if mode == 'shared':
+        inbox = queue.Queue()
+        inboxes = {None: inbox}
+        size = sum(p['concurrency'] for name, p in WORKER_PROFILES.items() if name != 'all')
+        workers = [Worker(inbox, 1, service_ms, done) for _ in range(size)]
+    else:
+        inboxes, workers = {}, []
+        for name, profile in WORKER_PROFILES.items():
+            if name == 'all':
+                continue
+            # Every queue a profile consumes shares its workers
+            inbox = queue.Queue()
+            for queue_name in profile['queues']:
+                inboxes[queue_name] = inbox
+            workers += [
+                Worker(inbox, profile['prefetch_multiplier'], service_ms, done)
+                for _ in range(profile['concurrency'])
+            ]
+
+    def publish(name):
+        key = None if mode == 'shared' else app.amqp.router.route({}, name)['queue'].name
+        inboxes[key].put((name, time.perf_counter()))
+
+    for worker in workers:
+        worker.start()
+    for _ in range(flood):
+        publish(NOTIFY)
+    for _ in range(closes):
+        publish(CLOSE)
+        time.sleep(close_interval_ms / 1000)
+
+    while sum(1 for name, _ in done if name == CLOSE) < closes:
+        time.sleep(0.01)
+    for inbox in set(inboxes.values()):
+        for _ in workers:
+            inbox.put(None)
+
+    return [latency * 1000 for name, latency in list(done) if name == CLOSE]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--flood', type=int, default=1500, help='Notification tasks queued at once')
+    parser.add_argument('--closes', type=int, default=50)
+    parser.add_argument('--close-interval-ms', type=float, default=20)
+    parser.add_argument('--close-ms', type=float, default=5, help='Service time of close_auction')
+    parser.add_argument('--notify-ms', type=float, default=10, help='Service time of a notification task')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'live_auction_drf.settings')
+    import django
+    django.setup()
+
+    service_ms = {CLOSE: args.close_ms, NOTIFY: args.notify_ms}
+    print(f"{args.closes} closes every {args.close_interval_ms:g} ms, "
+          f"flood of {args.flood} notification tasks\n")
+    print(f"{'mode':<10}{'flood':>8}{'median ms':>12}{'p95 ms':>10}{'max ms':>10}")
+    for mode in ('shared', 'routed'):
+        for flood in (0, args.flood):
+            latencies = run(mode, flood, args.closes, args.close_interval_ms, service_ms)
+            median, p95 = summarize(latencies)
+            print(f"{mode:<10}{flood:>8}{median:>12.1f}{p95:>10.1f}{max(latencies):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,7 @@ django_asgi_app = get_asgi_application()
 
 # Import after django_asgi_app to avoid AppRegistryNotReady error
 from apps.bidding.routing import websocket_urlpatterns
+from apps.notifications.routing import websocket_urlpatterns as notification_urlpatterns
 
 
 # ProtocolTypeRouter decides what to do based on protocol type
@@ -32,7 +33,7 @@ application = ProtocolTypeRouter({
     # WebSocket requests go to Channels
     "websocket": AllowedHostsOriginValidator(
         AuthMiddlewareStack(  # Provides user authentication for WebSockets
-            URLRouter(websocket_urlpatterns)
+            URLRouter(websocket_urlpatterns + notification_urlpatterns)
         )
     ),
 })
@@ -13,14 +13,36 @@ KEY CONCEPTS:
 - Worker: Process that executes tasks
 - Beat: Scheduler that triggers periodic tasks
 - Broker: Message queue (we use Redis)
+
+QUEUES AND WORKER PROFILES:
+- Tasks are routed by workload to their own queue (TASK_ROUTES), so a
+  flood of notifications or analytics work never delays closing auctions
+- closing: close_auction, the expiry sweep and the outbox relay. Late ack: a close that
+  dies with its worker is redelivered, and closing is idempotent
+- notifications: result/outbid delivery and watchlist pushes (bursty)
+- analytics: rollups, feed ranking, archiving (batch, latency-tolerant)
+- media: thumbnailing (CPU-bound)
+- default: anything unrouted
+- Each profile in WORKER_PROFILES is a worker's queues, concurrency and
+  prefetch; pick one with CELERY_WORKER_PROFILE (flags on the command
+  line still win):
+
+    CELERY_WORKER_PROFILE=closing celery -A live_auction_drf worker
+    CELERY_WORKER_PROFILE=notifications celery -A live_auction_drf worker
+    CELERY_WORKER_PROFILE=background celery -A live_auction_drf worker
+
+- Without a profile a worker consumes every queue, closing first
+  (queue_order_strategy=priority), which is the development setup
 """
 
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import celeryd_init
+from kombu import Queue
 
 # Set default Django settings module
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'live_auction_drf.settings')
 
 # Create Celery app
 app = Celery('auction_project')
@@ -34,6 +56,65 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 
+# Queues in priority order: a worker consuming several drains them in
+# this order (see broker_transport_options below)
+QUEUE_NAMES = ('closing', 'notifications', 'analytics', 'media', 'default')
+
+TASK_ROUTES = {
+    'apps.auctions.tasks.close_auction': {'queue': 'closing'},
+    'apps.auctions.tasks.check_and_close_expired_auctions': {'queue': 'closing'},
+    'apps.auctions.tasks.relay_outbox': {'queue': 'closing'},
+    'apps.auctions.tasks.notify_auction_participants': {'queue': 'notifications'},
+    'apps.auctions.tasks.push_watchlist_update': {'queue': 'notifications'},
+    'apps.notifications.tasks.deliver_notifications': {'queue': 'notifications'},
+    'apps.notifications.tasks.send_outbid_digests': {'queue': 'notifications'},
+    'apps.auctions.tasks.warm_auction_feeds': {'queue': 'analytics'},
+    'apps.auctions.tasks.archive_closed_auction_bids': {'queue': 'analytics'},
+    'apps.auctions.tasks.prune_outbox_events': {'queue': 'analytics'},
+    'apps.bidding.tasks.compact_bid_activity': {'queue': 'analytics'},
+    'apps.bidding.tasks.prune_bid_activity': {'queue': 'analytics'},
+    'apps.media.tasks.generate_thumbnails': {'queue': 'media'},
+}
+
+# Worker profiles (one per deployment of workers)
+# - prefetch_multiplier 1 where tasks are slow or must not wait behind
+#   others reserved by a busy process (closing, thumbnails); higher for
+#   short, numerous tasks (notifications)
+# - concurrency None: one process per CPU
+WORKER_PROFILES = {
+    'closing': {'queues': ['closing'], 'concurrency': 4, 'prefetch_multiplier': 1},
+    'notifications': {'queues': ['notifications'], 'concurrency': 8, 'prefetch_multiplier': 4},
+    'background': {'queues': ['analytics', 'media', 'default'], 'concurrency': 2, 'prefetch_multiplier': 1},
+    'all': {'queues': list(QUEUE_NAMES), 'concurrency': None, 'prefetch_multiplier': 1},
+}
+
+app.conf.task_queues = [Queue(name, routing_key=name) for name in QUEUE_NAMES]
+app.conf.task_default_queue = 'default'
+app.conf.task_routes = TASK_ROUTES
+# Redis: poll queues in the order above instead of round-robin, and keep
+# unacknowledged (late ack) messages an hour before redelivering them
+app.conf.broker_transport_options = {
+    'queue_order_strategy': 'priority',
+    'visibility_timeout': 3600,
+}
+# A worker reserves one message per process unless its profile says otherwise
+app.conf.worker_prefetch_multiplier = 1
+
+
+@celeryd_init.connect
+def apply_worker_profile(sender=None, instance=None, conf=None, **kwargs):
+    """Apply CELERY_WORKER_PROFILE to a starting worker"""
+    name = os.environ.get('CELERY_WORKER_PROFILE')
+    if not name:
+        return
+    profile = WORKER_PROFILES[name]
+    # Selected before the worker applies -Q, which still overrides it
+    instance.app.amqp.queues.select(profile['queues'])
+    if profile['concurrency']:
+        conf.worker_concurrency = profile['concurrency']
+    conf.worker_prefetch_multiplier = profile['prefetch_multiplier']
+
+
 # Periodic tasks configuration (Celery Beat)
 app.conf.beat_schedule = {
     # Check every minute for expired auctions
@@ -41,6 +122,46 @@ app.conf.beat_schedule = {
         'task': 'apps.auctions.tasks.check_and_close_expired_auctions',
         'schedule': 60.0,  # Run every 60 seconds
     },
+    # Publish outbox events whose relay failed or was never queued
+    'relay-outbox': {
+        'task': 'apps.auctions.tasks.relay_outbox',
+        'schedule': 5.0,
+    },
+    # Roll elapsed minutes of bids into activity buckets
+    'compact-bid-activity': {
+        'task': 'apps.bidding.tasks.compact_bid_activity',
+        'schedule': 60.0,
+    },
+    # Re-rank the trending feed from the latest activity buckets
+    'warm-auction-feeds': {
+        'task': 'apps.auctions.tasks.warm_auction_feeds',
+        'schedule': 60.0,
+    },
+    # Send queued notifications in batches
+    'deliver-notifications': {
+        'task': 'apps.notifications.tasks.deliver_notifications',
+        'schedule': 10.0,
+    },
+    # Digest outbid alerts whose debounce period is over
+    'send-outbid-digests': {
+        'task': 'apps.notifications.tasks.send_outbid_digests',
+        'schedule': 10.0,
+    },
+    # Move bids of long-closed auctions to the archive table
+    'archive-closed-auction-bids': {
+        'task': 'apps.auctions.tasks.archive_closed_auction_bids',
+        'schedule': crontab(hour=3, minute=0),  # Daily at 03:00
+    },
+    # Drop published outbox events past their retention
+    'prune-outbox-events': {
+        'task': 'apps.auctions.tasks.prune_outbox_events',
+        'schedule': crontab(minute=15),  # Hourly, at :15
+    },
+    # Drop activity buckets past their retention
+    'prune-bid-activity': {
+        'task': 'apps.bidding.tasks.prune_bid_activity',
+        'schedule': crontab(minute=5),  # Hourly, at :05
+    },
 }
 
 
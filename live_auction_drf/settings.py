@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 from decouple import config
 
@@ -56,6 +57,8 @@ INSTALLED_APPS = [
     'apps.users',
     'apps.auctions',
     'apps.bidding',
+    'apps.notifications',
+    'apps.media',
     'apps.utils',
 ]
 
@@ -95,13 +98,114 @@ WSGI_APPLICATION = 'live_auction_drf.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# DB_ENGINE selects the profile:
+# - sqlite (default): single-node deployments. Hardened unless
+#   SQLITE_HARDENED=False: WAL journal, synchronous=NORMAL, a busy timeout
+#   instead of failing with "database is locked", and IMMEDIATE
+#   transactions for bids and other auction state changes, so they take
+#   the write lock up front (SQLITE_IMMEDIATE_WRITES, see
+#   apps/utils/transactions.py); every other transaction stays DEFERRED
+# - postgres: persistent connections (DB_CONN_MAX_AGE) or, with
+#   DB_POOL=True, a psycopg connection pool (requires psycopg[pool])
+
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+# Turned on by the hardened sqlite profile
+SQLITE_IMMEDIATE_WRITES = False
+
+if DB_ENGINE == 'postgres':
+    DB_POOL = config('DB_POOL', default=False, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='live_auction'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # Pooled connections are returned to the pool after each request
+            'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                    'max_size': config('DB_POOL_MAX_SIZE', default=20, cast=int),
+                    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+                },
+            } if DB_POOL else {},
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+    if config('SQLITE_HARDENED', default=True, cast=bool):
+        SQLITE_IMMEDIATE_WRITES = True
+        DATABASES['default']['OPTIONS'] = {
+            # Seconds to wait on a locked database (sqlite busy_timeout)
+            'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+            ),
+        }
+
+# Read replica (optional)
+# Set DB_REPLICA_HOST (postgres) and/or DB_REPLICA_NAME (database name, or
+# file path for sqlite) to add a 'replica' alias with the same settings as
+# the primary. Read-only list, history and analytics endpoints read from
+# it; writes, bid acceptance and Celery tasks always use the primary.
+# Locally, a copy of db.sqlite3 works as a replica for testing the routing.
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+
+if DB_REPLICA_HOST or DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        # Tests run against the primary only
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_REPLICA_HOST:
+        DATABASES['replica']['HOST'] = DB_REPLICA_HOST
+    if DB_REPLICA_NAME:
+        DATABASES['replica']['NAME'] = DB_REPLICA_NAME
+
+DATABASE_ROUTERS = ['apps.utils.db_router.PrimaryReplicaRouter']
+
+# Seconds a user keeps reading from the primary after placing a bid
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
+# Cache
+# Shared by the web and worker processes, so it defaults to the Redis that
+# Channels and Celery use: the outbox relay's queued/backoff flags,
+# presence counters, warmed feeds, watchlist push throttles, replica pins
+# and cached counts are written by one process and read by another.
+# CACHE_URL=locmem:// keeps it in process memory, which is only correct
+# when a single process serves everything; the test runner always does
+CACHE_URL = config('CACHE_URL', default=config('REDIS_URL', default='redis://localhost:6379/0'))
+TESTING = sys.argv[1:2] == ['test']
+
+if CACHE_URL == 'locmem://' or TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+
+# List page counts (apps.utils.counting): exact up to this many rows,
+# above it common filters are cached and whole tables estimated
+LIST_COUNT_EXACT_LIMIT = config('LIST_COUNT_EXACT_LIMIT', default=1000, cast=int)
+LIST_COUNT_CACHE_TTL = config('LIST_COUNT_CACHE_TTL', default=60, cast=int)
 
 AUTH_USER_MODEL = 'users.User'
 
@@ -142,6 +246,21 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Uploaded images (apps/media). The default storage is MEDIA_ROOT, served
+# by apps.media.views under MEDIA_URL; point STORAGES['default'] at an
+# object-storage backend to serve them from a bucket/CDN instead
+MEDIA_URL = '/media/'
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+MEDIA_MAX_UPLOAD_BYTES = config('MEDIA_MAX_UPLOAD_BYTES', default=10 * 1024 * 1024, cast=int)
+MEDIA_MAX_IMAGES_PER_AUCTION = 10
+# Longest edge in pixels per thumbnail name. Thumbnails are cached
+# forever under their name: rename a size when changing its edge
+MEDIA_THUMBNAIL_SIZES = {
+    'small': 160,
+    'medium': 480,
+    'large': 1280,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -177,6 +296,54 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Thread pools for WebSocket consumer database work (apps/utils/executors.py)
+# - max_workers: threads (and database connections) of the pool
+# - max_queue: calls allowed to wait; more are rejected with server_busy
+# - max_wait: seconds a call may wait for a thread before it is dropped
+# SQLite allows one writer at a time, so more write threads only add lock waits
+CONSUMER_DB_EXECUTORS = {
+    'write': {
+        'max_workers': config('CONSUMER_DB_WRITE_WORKERS', default=1 if DB_ENGINE == 'sqlite' else 4, cast=int),
+        'max_queue': config('CONSUMER_DB_WRITE_QUEUE', default=50, cast=int),
+        'max_wait': config('CONSUMER_DB_WRITE_MAX_WAIT', default=2.0, cast=float),
+    },
+    'read': {
+        'max_workers': config('CONSUMER_DB_READ_WORKERS', default=4, cast=int),
+        'max_queue': config('CONSUMER_DB_READ_QUEUE', default=200, cast=int),
+        'max_wait': config('CONSUMER_DB_READ_MAX_WAIT', default=5.0, cast=float),
+    },
+}
+
+# Bid rate limits (apps/utils/ratelimit.py): token buckets per bidder, per
+# client IP and per auction. `burst` bids at once, refilled at `per_second`;
+# set a scope to None to disable it
+BID_RATE_LIMITS = {
+    'user': {
+        'burst': config('BID_RATE_USER_BURST', default=10, cast=int),
+        'per_second': config('BID_RATE_USER_PER_SECOND', default=2.0, cast=float),
+    },
+    'ip': {
+        'burst': config('BID_RATE_IP_BURST', default=30, cast=int),
+        'per_second': config('BID_RATE_IP_PER_SECOND', default=5.0, cast=float),
+    },
+    'auction': {
+        'burst': config('BID_RATE_AUCTION_BURST', default=50, cast=int),
+        'per_second': config('BID_RATE_AUCTION_PER_SECOND', default=20.0, cast=float),
+    },
+}
+
+# memory: per-process buckets; redis: shared between processes
+RATE_LIMIT_STORE = config('RATE_LIMIT_STORE', default='memory')
+RATE_LIMIT_REDIS_URL = config('RATE_LIMIT_REDIS_URL', default=config('REDIS_URL', default='redis://localhost:6379/0'))
+
+# Server-Sent Events streams (apps/bidding/sse.py)
+# - SSE_HEARTBEAT_SECONDS: idle time before a keep-alive comment is sent
+# - SSE_QUEUE_SIZE: frames buffered per client before it is disconnected
+# - SSE_REPLAY_LIMIT: most missed bids replayed on reconnect (else resync)
+SSE_HEARTBEAT_SECONDS = config('SSE_HEARTBEAT_SECONDS', default=15, cast=int)
+SSE_QUEUE_SIZE = 100
+SSE_REPLAY_LIMIT = 500
+
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
 
@@ -189,6 +356,63 @@ CELERY_TIMEZONE = TIME_ZONE
 
 CELERY_RESULT_EXPIRES = 3600  # 1 hour
 
+# Notification delivery (apps/notifications/delivery.py)
+# - NOTIFICATION_BACKEND: console, file (NOTIFICATION_FILE_PATH) or memory
+# - Failed messages are retried after RETRY_BACKOFF * 2^n seconds, then
+#   dead-lettered after MAX_ATTEMPTS
+NOTIFICATION_BACKEND = config('NOTIFICATION_BACKEND', default='apps.notifications.backends.ConsoleBackend')
+NOTIFICATION_FILE_PATH = config('NOTIFICATION_FILE_PATH', default=str(BASE_DIR / 'notifications.log'))
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=500, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_BACKOFF = 30
+NOTIFICATION_CLAIM_SECONDS = 300
+
+# Outbid alerts are sent only if the user is still outbid this long after
+# losing the lead (apps/notifications/outbid.py)
+OUTBID_DEBOUNCE_SECONDS = config('OUTBID_DEBOUNCE_SECONDS', default=30, cast=int)
+# Lifetime of a user's WebSocket presence counter (refreshed on connect)
+WS_PRESENCE_TTL = 3600
+
+# A watched auction's changes are pushed to its connected watchers at most
+# once per this many seconds (apps/auctions/watchlist.py)
+WATCHLIST_PUSH_INTERVAL = config('WATCHLIST_PUSH_INTERVAL', default=1, cast=int)
+# Auctions a user can watch
+WATCHLIST_MAX_ITEMS = config('WATCHLIST_MAX_ITEMS', default=5000, cast=int)
+
+# Transactional outbox (apps/auctions/outbox.py)
+# - OUTBOX_RELAY_ON_COMMIT: queue a relay_outbox task after each commit
+#   that records events; turn off when `manage.py relay_outbox` runs
+# - OUTBOX_POLL_INTERVAL: seconds the relay_outbox command sleeps when idle
+# - OUTBOX_BATCH_SIZE: events claimed and published per relay batch
+# - OUTBOX_CLAIM_SECONDS: lease of a claimed batch; a relay that dies
+#   mid-batch leaves it to others once it expires
+# - An event failing OUTBOX_MAX_ATTEMPTS times is given up
+# - Published events are deleted after OUTBOX_RETENTION_HOURS
+OUTBOX_RELAY_ON_COMMIT = config('OUTBOX_RELAY_ON_COMMIT', default=True, cast=bool)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=0.05, cast=float)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=200, cast=int)
+OUTBOX_CLAIM_SECONDS = config('OUTBOX_CLAIM_SECONDS', default=60, cast=int)
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_RETENTION_HOURS = 24
+
+# Days after an auction ends before its bids move to bids_archive
+BID_ARCHIVE_AFTER_DAYS = config('BID_ARCHIVE_AFTER_DAYS', default=30, cast=int)
+
+# Bid activity rollups (apps/bidding/activity.py)
+BID_ACTIVITY_MINUTE_RETENTION_DAYS = config('BID_ACTIVITY_MINUTE_RETENTION_DAYS', default=2, cast=int)
+BID_ACTIVITY_HOUR_RETENTION_DAYS = config('BID_ACTIVITY_HOUR_RETENTION_DAYS', default=90, cast=int)
+BID_ACTIVITY_MAX_LOOKBACK_HOURS = 24  # Furthest back a compaction run will catch up
+# How long after a minute ends before it is compacted: bids still committing
+# then (created_at is set before the commit) would otherwise be missed
+BID_ACTIVITY_COMPACTION_LAG_SECONDS = config('BID_ACTIVITY_COMPACTION_LAG_SECONDS', default=60, cast=int)
+
+# Discovery feeds (apps/auctions/feeds.py): trending ranks auctions by bids
+# over the last TRENDING_WINDOW_MINUTES and keeps the top TRENDING_FEED_SIZE;
+# the ranking is rebuilt every minute and cached for FEED_CACHE_TTL seconds
+TRENDING_WINDOW_MINUTES = config('TRENDING_WINDOW_MINUTES', default=15, cast=int)
+TRENDING_FEED_SIZE = config('TRENDING_FEED_SIZE', default=100, cast=int)
+FEED_CACHE_TTL = 300
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Live Auction API',
     'DESCRIPTION': 'Real-time auction system with WebSocket bidding',
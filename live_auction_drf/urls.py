@@ -4,6 +4,7 @@ Main URL Configuration
 Routes all API endpoints and serves API documentation
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import (
@@ -21,4 +22,8 @@ urlpatterns = [
     path('api/v1/auth/', include('apps.users.urls')),
     path('api/v1/auctions/', include('apps.auctions.urls')),
     path('api/v1/bidding/', include('apps.bidding.urls')),
+    path('api/v1/notifications/', include('apps.notifications.urls')),
+
+    # Uploaded images on the local storage (see apps/media/storage.py)
+    path(settings.MEDIA_URL.lstrip('/'), include('apps.media.urls')),
 ]